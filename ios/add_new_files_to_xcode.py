@@ -1,112 +1,86 @@
 #!/usr/bin/env python3
 """
-Script to add TrialBannerView.swift to Xcode project.pbxproj
+Script to add new Swift files to Xcode project.pbxproj
+
+Usage (from the ios/ directory):
+    python3 add_new_files_to_xcode.py
+    python3 add_new_files_to_xcode.py add --files a.swift b.swift --group Services --target Nestling
 """
 
-import re
-import random
-import string
+import argparse
 import sys
 import os
 
-def gen_xcode_id():
-    """Generate Xcode-style 24-character hex ID"""
-    return ''.join(random.choices('0123456789ABCDEF', k=24))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+from nestling_xcode import DEFAULT_PROJECT_PATH, PBXProject, add_files
+
+PROJECT_PATH = DEFAULT_PROJECT_PATH
+
+# Files added when the script is run without arguments
+DEFAULT_FILES = {
+    'Services': ['CaregiverSyncService.swift'],
+}
+
+def add_new_files(project_path, files_by_group=DEFAULT_FILES, target=None, dry_run=False):
+    """Add new Swift files to Xcode project: one read, one merge pass, one write.
+
+    With ``dry_run`` the project is left alone and a diff of the touched lines is printed.
+    """
 
-def add_new_files(project_path):
-    """Add new Swift files to Xcode project"""
-    
     print(f"Reading project file: {project_path}")
-    with open(project_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Files to add
-    files_to_add = [
-        {
-            'name': 'CaregiverSyncService.swift',
-            'path': 'Nestling/Services/CaregiverSyncService.swift',
-            'group': 'Services'
-        }
-    ]
-    
-    for file_info in files_to_add:
-        # Check if file already exists in project
-        if file_info['name'] in content:
-            print(f"⚠️  {file_info['name']} already in project, skipping")
-            continue
-        
-        print(f"Adding {file_info['name']}...")
-        
-        # Generate IDs
-        file_ref_id = gen_xcode_id()
-        build_file_id = gen_xcode_id()
-        
-        print(f"  File ref ID: {file_ref_id}")
-        print(f"  Build ID: {build_file_id}")
-        
-        # 1. Add to PBXBuildFile section (Sources)
-        build_file_entry = f'\t\t{build_file_id} /* {file_info["name"]} in Sources */ = {{isa = PBXBuildFile; fileRef = {file_ref_id} /* {file_info["name"]} */; }};\n'
-        
-        # Find PBXBuildFile section and add entry
-        match = re.search(r'(/\* Begin PBXBuildFile section \*/\n)', content)
-        if match:
-            insert_pos = match.end()
-            content = content[:insert_pos] + build_file_entry + content[insert_pos:]
-            print(f"  ✅ Added to PBXBuildFile section")
-        
-        # 2. Add to PBXFileReference section
-        file_ref_entry = f'\t\t{file_ref_id} /* {file_info["name"]} */ = {{isa = PBXFileReference; includeInIndex = 1; lastKnownFileType = sourcecode.swift; path = {file_info["name"]}; sourceTree = "<group>"; }};\n'
-        
-        match = re.search(r'(/\* Begin PBXFileReference section \*/\n)', content)
-        if match:
-            insert_pos = match.end()
-            content = content[:insert_pos] + file_ref_entry + content[insert_pos:]
-            print(f"  ✅ Added to PBXFileReference section")
-        
-        # 3. Add to appropriate PBXGroup (Components)
-        group_pattern = rf'(/\* {file_info["group"]} \*/.*?children = \(\n)(.*?)(\n\t\t\t\);)'
-        match = re.search(group_pattern, content, re.DOTALL)
-        
-        if match:
-            group_children = match.group(2)
-            new_child_entry = f'\t\t\t\t{file_ref_id} /* {file_info["name"]} */,\n'
-            updated_children = group_children + new_child_entry
-            content = content[:match.start(2)] + updated_children + content[match.end(2):]
-            print(f"  ✅ Added to {file_info['group']} group")
-        else:
-            print(f"  ⚠️  Could not find {file_info['group']} group, file may need manual addition")
-        
-        # 4. Add to PBXSourcesBuildPhase (compile step)
-        sources_pattern = r'(/\* Sources \*/.*?files = \(\n)(.*?)(\n\t\t\t\);)'
-        match = re.search(sources_pattern, content, re.DOTALL)
-        
-        if match:
-            sources_files = match.group(2)
-            new_source_entry = f'\t\t\t\t{build_file_id} /* {file_info["name"]} in Sources */,\n'
-            updated_sources = sources_files + new_source_entry
-            content = content[:match.start(2)] + updated_sources + content[match.end(2):]
-            print(f"  ✅ Added to Sources build phase")
-        
-        print(f"  ✅ {file_info['name']} successfully added!\n")
-    
-    # Write back
-    backup_path = project_path + '.backup_caregiversync'
-    print(f"\nCreating backup: {backup_path}")
-    with open(backup_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
+    project = PBXProject.load(project_path)
+
+    total = 0
+    for group, paths in files_by_group.items():
+        added = add_files(project, paths, group=group, target=target)
+        for path, file_ref_id, build_file_id in added:
+            print(f"  ✅ {path} (file ref {file_ref_id}, build {build_file_id}) → {group}")
+        for path in set(paths) - {path for path, _, _ in added}:
+            print(f"⚠️  {path} already in {group}, skipping")
+        total += len(added)
+
+    if not total:
+        print("\nNothing to add.")
+        return 0
+
+    if dry_run:
+        print()
+        project.save(dry_run=True)
+        return total
+
+    # Only the touched objects are re-emitted; git keeps the previous version
     print(f"Writing updated project file...")
-    with open(project_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    print("\n✅ All files added successfully!")
+    project.save()
 
-if __name__ == '__main__':
-    project_path = 'Nuzzle/Nestling.xcodeproj/project.pbxproj'
-    
-    if not os.path.exists(project_path):
-        print(f"Error: Could not find {project_path}")
+    print(f"\n✅ {total} file(s) added successfully!")
+    return total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add files to Nestling.xcodeproj")
+    parser.add_argument('--project', default=PROJECT_PATH, help="Path to project.pbxproj")
+    parser.add_argument('--dry-run', action='store_true', help="Print a diff instead of writing")
+    commands = parser.add_subparsers(dest='command')
+    add = commands.add_parser('add', help="Add files to a group and target in one pass")
+    add.add_argument('--files', nargs='+', required=True, help="Paths relative to the group")
+    add.add_argument('--group', required=True, help="Group name, path or UUID")
+    add.add_argument('--target', help="Target name (default: the app target)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.project):
+        print(f"Error: Could not find {args.project}")
         print("Make sure you run this script from the ios/ directory")
-        sys.exit(1)
-    
-    add_new_files(project_path)
+        return 1
+
+    try:
+        if args.command == 'add':
+            add_new_files(args.project, {args.group: args.files}, target=args.target, dry_run=args.dry_run)
+        else:
+            add_new_files(args.project, dry_run=args.dry_run)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pbxproj tooling on synthetic projects.
+Generates projects shaped like Nestling.xcodeproj at 1k, 10k, 50k and 200k
+objects, then times parse, batch add, dedupe, gc, validate and serialize
+on each and records their peak memory. Results are written as JSON and
+compared against a stored baseline; a time or memory regression beyond
+the threshold makes the run fail.
+
+Times are compared in units of a calibration loop timed throughout the
+run, not in seconds, so the checked-in baseline holds on other machines;
+re-record it with --update-baseline when the tools get faster. The median
+of the repeats is compared, and a slowdown only counts once it exceeds the
+threshold plus the spread its repeats showed in both runs, and beyond
+the run's overall drift from the calibration (the median slowdown of all
+operations). Against a baseline from this machine it must also be slower
+in plain seconds. An operation that looks slower is measured again
+(--retries) and must be slow every time, since one busy moment is not a
+regression.
+
+Usage:
+    python3 benchmark_pbxproj.py [--sizes 1000,10000] [--only parse,validate]
+                                 [--repeat 5] [--no-memory] [--output results.json]
+                                 [--baseline FILE] [--threshold 0.25] [--retries 2]
+                                 [--update-baseline]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from nestling_xcode.bench import OPERATIONS, SIZES, compare, remeasure, run_benchmarks, scaling
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'pbxproj_baseline.json')
+
+def _print_result(size, name, result):
+    peak = result.get('peak_bytes')
+    memory = f"{peak / 1e6:8.1f} MB" if peak is not None else ''
+    print(f"   {size:>7} {name:<15} {result['seconds'] * 1000:10.1f} ms  ±{result['noise'] * 100:3.0f}% {memory}",
+          flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pbxproj tooling on synthetic projects")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in SIZES),
+                        help="comma-separated object counts (default: %(default)s)")
+    parser.add_argument('--only', help=f"comma-separated operations ({', '.join(OPERATIONS)})")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timed runs per operation; their median is compared (default: %(default)s)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced run that measures peak memory")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown or memory growth as a fraction (default: %(default)s)")
+    parser.add_argument('--retries', type=int, default=2,
+                        help="times a slow operation is measured again before it counts (default: %(default)s)")
+    parser.add_argument('--update-baseline', action='store_true', help="store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    operations = args.only.split(',') if args.only else None
+    for name in operations or ():
+        if name not in OPERATIONS:
+            parser.error(f"unknown operation {name!r}")
+
+    print(f"⏱  Benchmarking {', '.join(operations or OPERATIONS)} at {', '.join(map(str, sizes))} objects")
+    report = run_benchmarks(sizes, operations, repeat=args.repeat, memory=not args.no_memory,
+                            progress=_print_result)
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, threshold=args.threshold)
+        for _ in range(args.retries):
+            slow = sorted({(found.size, found.operation) for found in regressions if found.kind == 'time'})
+            if not slow:
+                break
+            print(f"   Measuring {len(slow)} slow operation(s) again...")
+            remeasure(report, slow, repeat=args.repeat)
+            regressions = compare(report, baseline, threshold=args.threshold)
+
+    report['scaling'] = scaling(report)
+    for name, exponents in report['scaling'].items():
+        print(f"   {name:<15} growth exponent per size step: {', '.join(map(str, exponents))}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Wrote {args.output}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"📌 Stored baseline {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"⚠️  No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    if 'calibration_seconds' not in baseline:
+        print("⚠️  Baseline has no calibration; comparing seconds, which only holds on the machine that recorded it")
+    elif baseline.get('python') != report['python']:
+        print(f"⚠️  Baseline was recorded on Python {baseline.get('python')}; relative timings may shift")
+    print(f"   Calibration: {report['calibration_seconds'] * 1000:.1f} ms here, "
+          f"{baseline.get('calibration_seconds', 0) * 1000:.1f} ms for the baseline")
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for found in regressions:
+            print(f"   {found.message}")
+        return 1
+    print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
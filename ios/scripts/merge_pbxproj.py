@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Git merge driver for project.pbxproj.
+Merges base, ours and theirs per object UUID and per list member (group
+children, build phase files, package products, ...), so branches that each
+add files or packages merge cleanly. Only a key both sides changed to
+different values is left as a conflict, marked around the whole object.
+
+Install once per clone (writes .git/config; .gitattributes already maps
+*.pbxproj to this driver):
+    python3 ios/scripts/merge_pbxproj.py --install
+
+Git then runs it as:
+    python3 ios/scripts/merge_pbxproj.py %O %A %B %P
+writing the result to %A and exiting 1 when conflicts remain.
+"""
+
+import os
+import subprocess
+import sys
+
+from nestling_xcode import PBXParseError
+from nestling_xcode.merge import format_conflict, merge
+from nestling_xcode.validate import format_issue, validate
+
+DRIVER = 'python3 ios/scripts/merge_pbxproj.py %O %A %B %P'
+
+def install():
+    subprocess.check_call(['git', 'config', 'merge.pbxproj.name', 'Xcode project object-level merge'])
+    subprocess.check_call(['git', 'config', 'merge.pbxproj.driver', DRIVER])
+    print(f"✅ Configured merge.pbxproj.driver = {DRIVER}")
+    return 0
+
+def merge_files(base_path, ours_path, theirs_path, name=None):
+    """Merge into ``ours_path``. Returns 0 when clean, 1 when conflicts remain."""
+    name = name or ours_path
+    texts = []
+    for path in (base_path, ours_path, theirs_path):
+        with open(path, 'r', encoding='utf-8') as f:
+            texts.append(f.read())
+
+    try:
+        text, conflicts = merge(*texts, path=name)
+    except PBXParseError as e:
+        # Not something we can parse (already conflicted, hand-edited, ...): merge as text
+        print(f"⚠️  {name}: {e}; falling back to a line-based merge", file=sys.stderr)
+        return 1 if subprocess.call(['git', 'merge-file', '-L', 'ours', '-L', 'base', '-L', 'theirs',
+                                     ours_path, base_path, theirs_path]) else 0
+
+    tmp_path = ours_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, ours_path)
+
+    if conflicts:
+        print(f"❌ {name}: {len(conflicts)} conflict(s) both branches changed differently:", file=sys.stderr)
+        for conflict in conflicts:
+            print(f"   {format_conflict(conflict)}", file=sys.stderr)
+        return 1
+    errors = [issue for issue in validate(text) if issue.severity == 'error']
+    if errors:
+        print(f"❌ {name}: merged project does not validate:", file=sys.stderr)
+        for issue in errors:
+            print(f"   {format_issue(issue, name)}", file=sys.stderr)
+        return 1
+    print(f"✅ {name}: merged objects cleanly", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args == ['--install']:
+        sys.exit(install())
+    if len(args) not in (3, 4):
+        print(__doc__)
+        sys.exit(2)
+    sys.exit(merge_files(*args))
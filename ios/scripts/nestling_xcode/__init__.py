@@ -0,0 +1,26 @@
+"""
+Shared tooling for reading and editing Nestling.xcodeproj/project.pbxproj.
+
+    from nestling_xcode import PBXProject
+
+    project = PBXProject.load()
+    for uuid, obj in project.iter_section('PBXFileReference'):
+        ...
+    project.save()
+"""
+
+from .files import add_files
+from .parser import Annotated, PBXParseError, parse, tokenize
+from .project import DEFAULT_PROJECT_PATH, PBXProject
+from .serializer import dumps
+
+__all__ = [
+    'Annotated',
+    'DEFAULT_PROJECT_PATH',
+    'PBXParseError',
+    'PBXProject',
+    'add_files',
+    'dumps',
+    'parse',
+    'tokenize',
+]
@@ -0,0 +1,180 @@
+"""
+Header-only audit of the ``.xcassets`` catalogs.
+
+Every set's Contents.json is compared with the files beside it: a
+referenced file that is missing, or a file no entry references, is
+reported. PNGs are never decoded -- the first 33 bytes hold the signature
+and the IHDR chunk with the dimensions and colour type, and for images
+without an alpha channel the chunk headers are skipped through (by
+seeking) up to the first IDAT to see whether a ``tRNS`` chunk adds
+transparency. That is enough to check that each app icon slot has exactly
+the pixels its ``size`` and ``scale`` ask for, that the App Store icon has
+no alpha channel, and that an image set's 1x/2x/3x files describe the same
+point size, so thousands of images are audited in a fraction of a second.
+"""
+
+import json
+import os
+import struct
+from collections import namedtuple
+
+Issue = namedtuple('Issue', 'severity path message')
+PNGHeader = namedtuple('PNGHeader', 'width height depth color_type alpha')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Colour types with an alpha channel of their own (grey + alpha, RGBA)
+ALPHA_COLOR_TYPES = frozenset({4, 6})
+
+# Contents.json lists that name files, per kind of set
+FILE_LISTS = ('images', 'data', 'symbols', 'colors')
+
+SKIP_DIRS = frozenset({'build', 'DerivedData', 'Pods', 'node_modules'})
+
+
+def read_png_header(path):
+    """``PNGHeader`` from the IHDR chunk (plus the tRNS check); None if not a PNG."""
+    with open(path, 'rb') as f:
+        head = f.read(33)
+        if len(head) < 33 or not head.startswith(PNG_SIGNATURE) or head[12:16] != b'IHDR':
+            return None
+        width, height, depth, color_type = struct.unpack_from('>IIBB', head, 16)
+        alpha = color_type in ALPHA_COLOR_TYPES
+        if not alpha:
+            # tRNS sits between IHDR and the first IDAT; step over chunk bodies without reading them
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    break
+                length, kind = struct.unpack('>I4s', header)
+                if kind == b'tRNS':
+                    alpha = True
+                    break
+                if kind in (b'IDAT', b'IEND'):
+                    break
+                f.seek(length + 4, os.SEEK_CUR)
+    return PNGHeader(width, height, depth, color_type, alpha)
+
+
+def find_catalogs(root):
+    """Every ``*.xcassets`` directory under ``root``."""
+    found = []
+    for directory, subdirs, _ in os.walk(root):
+        subdirs[:] = sorted(name for name in subdirs if name not in SKIP_DIRS and not name.startswith('.'))
+        found.extend(os.path.join(directory, name) for name in subdirs if name.endswith('.xcassets'))
+        subdirs[:] = [name for name in subdirs if not name.endswith('.xcassets')]
+    return found
+
+
+def _scale(entry):
+    return float(entry.get('scale', '1x').rstrip('x'))
+
+
+def _points(entry):
+    width, _, height = entry['size'].partition('x')
+    return float(width), float(height or width)
+
+
+def _check_app_icon(set_path, entries, headers, issues):
+    alpha_checked = set()
+    for entry in entries:
+        filename = entry.get('filename')
+        header = headers.get(filename)
+        if header is None or 'size' not in entry:
+            continue
+        path = os.path.join(set_path, filename)
+        width, height = _points(entry)
+        scale = _scale(entry)
+        expected = (int(round(width * scale)), int(round(height * scale)))
+        if (header.width, header.height) != expected:
+            issues.append(Issue('error', path, f"{header.width}x{header.height} px, but {entry['size']} at "
+                                               f"{entry.get('scale', '1x')} needs {expected[0]}x{expected[1]}"))
+        if header.alpha and not entry.get('appearances') and filename not in alpha_checked:
+            # The App Store rejects a marketing icon with alpha; on device it only wastes bytes
+            alpha_checked.add(filename)
+            severity = 'error' if entry.get('idiom') == 'ios-marketing' else 'warning'
+            issues.append(Issue(severity, path, "app icon has an alpha channel"))
+
+
+def _check_image_set(set_path, entries, headers, issues):
+    # Every scale of one appearance/idiom must describe the same point size
+    variants = {}
+    for entry in entries:
+        header = headers.get(entry.get('filename'))
+        if header is None:
+            continue
+        key = (entry.get('idiom'), json.dumps(entry.get('appearances'), sort_keys=True))
+        variants.setdefault(key, []).append((entry, header))
+    for variant in variants.values():
+        if len(variant) < 2:
+            continue
+        first, first_header = min(variant, key=lambda item: _scale(item[0]))
+        base = (first_header.width / _scale(first), first_header.height / _scale(first))
+        for entry, header in variant:
+            scale = _scale(entry)
+            expected = (round(base[0] * scale), round(base[1] * scale))
+            if abs(header.width - expected[0]) > 1 or abs(header.height - expected[1]) > 1:
+                issues.append(Issue('warning', os.path.join(set_path, entry['filename']),
+                                    f"{header.width}x{header.height} px at {entry.get('scale', '1x')}, but "
+                                    f"{first['filename']} implies {expected[0]}x{expected[1]}"))
+
+
+def audit_set(set_path, issues):
+    """Check one ``*.imageset``/``*.appiconset``/... directory. Returns the number of files checked."""
+    contents_path = os.path.join(set_path, 'Contents.json')
+    try:
+        with open(contents_path, 'rb') as f:
+            contents = json.load(f)
+    except FileNotFoundError:
+        issues.append(Issue('error', set_path, "no Contents.json"))
+        return 0
+    except ValueError as e:
+        issues.append(Issue('error', contents_path, f"invalid JSON: {e}"))
+        return 0
+
+    on_disk = {entry.name for entry in os.scandir(set_path) if entry.is_file() and not entry.name.startswith('.')}
+    on_disk.discard('Contents.json')
+    entries = [entry for key in FILE_LISTS for entry in contents.get(key, ()) if isinstance(entry, dict)]
+    referenced = set()
+    headers = {}
+    for entry in entries:
+        filename = entry.get('filename')
+        if not filename or filename in referenced:
+            continue
+        referenced.add(filename)
+        if filename not in on_disk:
+            issues.append(Issue('error', os.path.join(set_path, filename), "listed in Contents.json but missing"))
+        elif filename.lower().endswith('.png'):
+            header = read_png_header(os.path.join(set_path, filename))
+            if header is None:
+                issues.append(Issue('error', os.path.join(set_path, filename), "not a PNG file"))
+            else:
+                headers[filename] = header
+    for filename in sorted(on_disk - referenced):
+        issues.append(Issue('warning', os.path.join(set_path, filename), "not referenced by Contents.json"))
+
+    if set_path.endswith('.appiconset'):
+        _check_app_icon(set_path, contents.get('images', ()), headers, issues)
+    elif set_path.endswith('.imageset'):
+        _check_image_set(set_path, contents.get('images', ()), headers, issues)
+    return len(referenced & on_disk)
+
+
+def audit(catalogs):
+    """Audit ``catalogs``. Returns ``(issues, sets, files)``: the issues and how much was checked."""
+    issues = []
+    sets = files = 0
+    for catalog in catalogs:
+        for directory, subdirs, _ in os.walk(catalog):
+            subdirs.sort()
+            for name in subdirs:
+                # Folders (namespaces, groups) have no extension; everything else is a set.
+                # Sets can nest (.brandassets, .imagestack), so the walk goes on into them.
+                if os.path.splitext(name)[1]:
+                    sets += 1
+                    files += audit_set(os.path.join(directory, name), issues)
+    return issues, sets, files
+
+
+def format_issue(issue):
+    return f"{issue.path}: {issue.severity}: {issue.message}"
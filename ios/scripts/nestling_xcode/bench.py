@@ -0,0 +1,468 @@
+"""
+Synthetic projects and timed operations for benchmarking.
+
+``synthetic_project(n)`` builds a project shaped like Nestling.xcodeproj --
+an app target plus unit and UI test targets, three Swift packages, Debug
+and Release configurations, and a Features/<Feature>/<Layer> group tree of
+Swift files -- with about ``n`` objects. A small share of the files is
+duplicated (for dedupe) or orphaned (for gc) so every operation has work to
+do. Output is deterministic: the same ``n`` always gives the same bytes.
+
+``run_benchmarks`` times parse, batch add, dedupe, gc, validate and
+serialize on each size and records the peak memory each one allocates.
+Each time is also stored relative to ``calibrate()``, a fixed workload run
+on the same machine, so a baseline recorded on one machine can be compared
+with runs on another, along with how much the repeats of that operation
+disagreed.
+"""
+
+import gc as _gc
+import math
+import platform
+import re
+import statistics
+import time
+import tracemalloc
+from collections import namedtuple
+
+from .ids import object_id
+from .parser import Annotated
+from .project import PBXProject
+from .serializer import annotate
+
+SIZES = (1_000, 10_000, 50_000, 200_000)
+
+LAYERS = ('Views', 'ViewModels', 'Services', 'Models')
+FILES_PER_GROUP = 8
+DUPLICATE_EVERY = 100    # one file in this many is listed twice
+ORPHAN_EVERY = 100       # one file in this many is in no group or phase
+ADD_BATCH = 200          # files added by the "add" operation
+CALIBRATION_ROUNDS = 20_000
+MIN_DRIFT_SAMPLES = 5    # timed operations needed before compare() trusts their median
+
+Regression = namedtuple('Regression', 'size operation kind message')
+
+PACKAGES = (
+    ('supabase-swift', 'https://github.com/supabase/supabase-swift.git', ('Supabase',)),
+    ('sentry-cocoa', 'https://github.com/getsentry/sentry-cocoa.git', ('Sentry',)),
+    ('firebase-ios-sdk', 'https://github.com/firebase/firebase-ios-sdk.git', ('FirebaseAnalytics', 'FirebaseCore')),
+)
+
+BUILD_SETTINGS = {
+    'ASSETCATALOG_COMPILER_APPICON_NAME': 'AppIcon',
+    'CODE_SIGN_STYLE': 'Automatic',
+    'CURRENT_PROJECT_VERSION': '1',
+    'DEVELOPMENT_TEAM': 'ABCDE12345',
+    'ENABLE_PREVIEWS': 'YES',
+    'GENERATE_INFOPLIST_FILE': 'YES',
+    'INFOPLIST_KEY_UILaunchScreen_Generation': 'YES',
+    'IPHONEOS_DEPLOYMENT_TARGET': '17.0',
+    'LD_RUNPATH_SEARCH_PATHS': ['$(inherited)', '@executable_path/Frameworks'],
+    'MARKETING_VERSION': '1.0',
+    'PRODUCT_BUNDLE_IDENTIFIER': 'com.example.nestling',
+    'PRODUCT_NAME': '$(TARGET_NAME)',
+    'SWIFT_EMIT_LOC_STRINGS': 'YES',
+    'SWIFT_VERSION': '5.0',
+    'TARGETED_DEVICE_FAMILY': '1,2',
+}
+
+
+class _Builder:
+    """Accumulates objects with deterministic IDs and Xcode-style comments."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def add(self, comment, obj, *parts):
+        uuid = Annotated(object_id(obj['isa'], *parts), comment)
+        self.objects[uuid] = obj
+        return uuid
+
+    def configuration_list(self, owner, label):
+        configs = [self.add(name, {
+            'isa': 'XCBuildConfiguration',
+            'buildSettings': dict(BUILD_SETTINGS, PRODUCT_BUNDLE_IDENTIFIER=f'com.example.{owner.lower()}'),
+            'name': name,
+        }, owner, name) for name in ('Debug', 'Release')]
+        return self.add(f'Build configuration list for {label}', {
+            'isa': 'XCConfigurationList',
+            'buildConfigurations': configs,
+            'defaultConfigurationIsVisible': '0',
+            'defaultConfigurationName': 'Release',
+        }, owner)
+
+    def phase(self, isa, target, label):
+        return self.add(label, {'isa': isa, 'buildActionMask': '2147483647', 'files': [],
+                                'runOnlyForDeploymentPostprocessing': '0'}, target)
+
+
+def synthetic_project(objects):
+    """Return a ``PBXProject`` with about ``objects`` objects (no source text)."""
+    b = _Builder()
+    product_refs = []
+    targets = {}
+    for name, product_type, extension in (
+            ('Nestling', 'com.apple.product-type.application', 'app'),
+            ('NestlingTests', 'com.apple.product-type.bundle.unit-test', 'xctest'),
+            ('NestlingUITests', 'com.apple.product-type.bundle.ui-testing', 'xctest')):
+        product = b.add(f'{name}.{extension}', {
+            'isa': 'PBXFileReference', 'explicitFileType': f'wrapper.{extension}', 'includeInIndex': '0',
+            'path': f'{name}.{extension}', 'sourceTree': 'BUILT_PRODUCTS_DIR'}, name, 'product')
+        product_refs.append(product)
+        phases = {isa: b.phase(isa, name, isa[3:-len('BuildPhase')])
+                  for isa in ('PBXSourcesBuildPhase', 'PBXFrameworksBuildPhase', 'PBXResourcesBuildPhase')}
+        targets[name] = (b.add(name, {
+            'isa': 'PBXNativeTarget',
+            'buildConfigurationList': b.configuration_list(name, f'PBXNativeTarget "{name}"'),
+            'buildPhases': list(phases.values()),
+            'buildRules': [],
+            'dependencies': [],
+            'name': name,
+            'packageProductDependencies': [],
+            'productName': name,
+            'productReference': product,
+            'productType': product_type,
+        }, name), phases)
+
+    app_id, app_phases = targets['Nestling']
+    package_refs = []
+    for name, url, products in PACKAGES:
+        ref = b.add(f'XCRemoteSwiftPackageReference "{name}"', {
+            'isa': 'XCRemoteSwiftPackageReference', 'repositoryURL': url,
+            'requirement': {'kind': 'upToNextMajorVersion', 'minimumVersion': '1.0.0'}}, url)
+        package_refs.append(ref)
+        for product in products:
+            dep = b.add(product, {'isa': 'XCSwiftPackageProductDependency', 'package': ref,
+                                  'productName': product}, app_id, product)
+            b.objects[app_id]['packageProductDependencies'].append(dep)
+            frameworks = app_phases['PBXFrameworksBuildPhase']
+            b.objects[frameworks]['files'].append(
+                b.add(f'{product} in Frameworks', {'isa': 'PBXBuildFile', 'productRef': dep}, frameworks, dep))
+
+    # Each file is a reference plus a build file; each group holds FILES_PER_GROUP files
+    fixed = len(b.objects) + 8
+    per_file = 2 + 1 / FILES_PER_GROUP + 1 / (FILES_PER_GROUP * len(LAYERS))
+    file_count = max(int((objects - fixed) / per_file), len(LAYERS))
+
+    source_groups = {}
+    for name in targets:
+        source_groups[name] = b.add(name, {'isa': 'PBXGroup', 'children': [], 'path': name,
+                                           'sourceTree': '<group>'}, name)
+    features = b.add('Features', {'isa': 'PBXGroup', 'children': [], 'path': 'Features',
+                                  'sourceTree': '<group>'}, 'Nestling', 'Features')
+    b.objects[source_groups['Nestling']]['children'].append(features)
+
+    group = None
+    for index in range(file_count):
+        if index % FILES_PER_GROUP == 0:
+            feature, layer = divmod(index // FILES_PER_GROUP, len(LAYERS))
+            if layer == 0:
+                feature_group = b.add(f'Feature{feature}', {
+                    'isa': 'PBXGroup', 'children': [], 'path': f'Feature{feature}', 'sourceTree': '<group>'},
+                    'Features', feature)
+                b.objects[features]['children'].append(feature_group)
+            group = b.add(LAYERS[layer], {'isa': 'PBXGroup', 'children': [], 'path': LAYERS[layer],
+                                          'sourceTree': '<group>'}, 'Features', feature, layer)
+            b.objects[feature_group]['children'].append(group)
+        # A few files belong to the unit test target, as in the real project
+        target = 'NestlingTests' if index % 50 == 49 else 'Nestling'
+        path = f'{LAYERS[layer][:-1]}{index}.swift'
+        _add_source(b, group, targets[target][1]['PBXSourcesBuildPhase'], path, index)
+        if index % DUPLICATE_EVERY == DUPLICATE_EVERY // 2:
+            _add_source(b, group, targets[target][1]['PBXSourcesBuildPhase'], path, index, 'duplicate')
+        if index % ORPHAN_EVERY == ORPHAN_EVERY - 1:
+            _add_source(b, None, None, f'Removed{index}.swift', index, 'orphan')
+
+    products = b.add('Products', {'isa': 'PBXGroup', 'children': product_refs, 'name': 'Products',
+                                  'sourceTree': '<group>'}, 'Products')
+    main_group = b.add(None, {'isa': 'PBXGroup', 'children': list(source_groups.values()) + [products],
+                              'sourceTree': '<group>'}, 'main')
+    root = b.add('Project object', {
+        'isa': 'PBXProject',
+        'attributes': {'BuildIndependentTargetsInParallel': '1', 'LastSwiftUpdateCheck': '1500',
+                       'LastUpgradeCheck': '1500'},
+        'buildConfigurationList': b.configuration_list('project', 'PBXProject "Nestling"'),
+        'compatibilityVersion': 'Xcode 14.0',
+        'developmentRegion': 'en',
+        'hasScannedForEncodings': '0',
+        'knownRegions': ['en', 'es', 'Base'],
+        'mainGroup': main_group,
+        'packageReferences': package_refs,
+        'productRefGroup': products,
+        'projectDirPath': '',
+        'projectRoot': '',
+        'targets': [uuid for uuid, _ in targets.values()],
+    }, 'project')
+
+    # References carry the referenced object's comment, as Xcode writes them
+    comments = {uuid: uuid.comment for uuid in b.objects}
+    for obj in b.objects.values():
+        _annotate_references(obj, comments)
+    data = {'archiveVersion': '1', 'classes': {}, 'objectVersion': '56',
+            'objects': b.objects, 'rootObject': annotate(str(root), 'Project object')}
+    return PBXProject(data)
+
+
+def _add_source(b, group, phase, path, index, variant=''):
+    ref = b.add(path, {'isa': 'PBXFileReference', 'lastKnownFileType': 'sourcecode.swift',
+                       'path': path, 'sourceTree': '<group>'}, index, path, variant)
+    if group is not None:
+        b.objects[group]['children'].append(ref)
+    build = b.add(f'{path} in Sources', {'isa': 'PBXBuildFile', 'fileRef': ref}, index, variant)
+    if phase is not None:
+        b.objects[phase]['files'].append(build)
+
+
+def _annotate_references(value, comments):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, str):
+                if item in comments:
+                    value[key] = annotate(str(item), comments[item])
+            else:
+                _annotate_references(item, comments)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            if isinstance(item, str):
+                if item in comments:
+                    value[i] = annotate(str(item), comments[item])
+            else:
+                _annotate_references(item, comments)
+
+
+def synthetic_text(objects):
+    return synthetic_project(objects).dumps(full=True)
+
+
+# -- operations ---------------------------------------------------------------
+#
+# Each operation is ``(setup, run)``: ``setup(text)`` builds fresh input
+# outside the timed region and ``run(state)`` is what gets measured.
+
+def _parsed(text):
+    return PBXProject.parse(text)
+
+
+def _run_add(project):
+    from .files import add_files
+    add_files(project, [f'Added{i}.swift' for i in range(ADD_BATCH)], group='Features')
+
+
+def _run_dedupe(project):
+    from .dedupe import find_duplicates, remove_duplicates
+    remove_duplicates(project, find_duplicates(project))
+
+
+def _run_gc(project):
+    from .gc import unreachable
+    for uuid in unreachable(project):
+        project.remove(uuid)
+
+
+def _run_validate(text):
+    from .validate import validate
+    validate(text)
+
+
+def _edited(text):
+    project = PBXProject.parse(text)
+    _run_add(project)
+    project.dumps()    # builds the source map outside the timed region
+    return project
+
+
+OPERATIONS = {
+    'parse': (lambda text: text, PBXProject.parse),
+    'add': (_parsed, _run_add),
+    'dedupe': (_parsed, _run_dedupe),
+    'gc': (_parsed, _run_gc),
+    'validate': (lambda text: text, _run_validate),
+    'serialize': (_edited, lambda project: project.dumps()),
+    'serialize_full': (_parsed, lambda project: project.dumps(full=True)),
+}
+
+
+def measure(setup, run, text, repeat=5, memory=True):
+    """Return ``{'seconds', 'median', 'noise', 'peak_bytes'}`` for one operation.
+
+    ``seconds`` is the best of ``repeat`` runs and ``median`` their median;
+    ``noise`` is their interquartile range as a fraction of the median, so
+    one stray run does not make the operation look noisy.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup(text)
+        _gc.collect()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+        del state
+    median = statistics.median(times)
+    quartiles = statistics.quantiles(times, n=4, method='inclusive') if repeat > 1 else (median,) * 3
+    result = {'seconds': round(min(times), 6), 'median': round(median, 6),
+              'noise': round((quartiles[2] - quartiles[0]) / median, 4)}
+    if memory:
+        state = setup(text)
+        _gc.collect()
+        tracemalloc.start()
+        try:
+            run(state)
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def calibrate(repeat=5):
+    """Median time of a fixed workload: regex matches, slicing and dict inserts, like the tools do."""
+    pattern = re.compile(r'([0-9A-F]{24}) /\* ([\w.]+) \*/')
+    line = '\t\t0123456789ABCDEF01234567 /* Row.swift */ = {isa = PBXFileReference; };'
+    times = []
+    for _ in range(repeat):
+        table = {}
+        start = time.perf_counter()
+        for i in range(CALIBRATION_ROUNDS):
+            match = pattern.search(line)
+            table[match.group(1)[:8] + str(i % 1000)] = match.group(2).lower()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_benchmarks(sizes=SIZES, operations=None, repeat=5, memory=True, progress=None):
+    """Benchmark every operation on a synthetic project of each size.
+
+    Returns a JSON-serializable dict; see ``measure()`` for each result.
+    ``calibrate()`` runs before every operation and ``calibration_seconds``
+    is the median of all of them: a short calibration loop swings far more
+    with the machine's load than a long operation does, so one sample per
+    operation would add noise rather than remove it. Each result's
+    ``relative`` is its median time in those units. ``progress(size, name,
+    result)`` is called after each measurement.
+    """
+    operations = operations or list(OPERATIONS)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'sizes': {},
+    }
+    calibrations = []
+    for size in sizes:
+        text = synthetic_text(size)
+        project = PBXProject.parse(text)
+        entry = {'objects': project.count(), 'bytes': len(text.encode('utf-8')), 'operations': {}}
+        del project
+        for name in operations:
+            setup, run = OPERATIONS[name]
+            calibrations.append(calibrate())
+            result = measure(setup, run, text, repeat=repeat, memory=memory)
+            entry['operations'][name] = result
+            if progress:
+                progress(size, name, result)
+        report['sizes'][str(size)] = entry
+    report['calibration_seconds'] = round(statistics.median(calibrations or [calibrate()]), 6)
+    _set_relative(report)
+    return report
+
+
+def remeasure(report, pairs, repeat=5):
+    """Time each ``(size, name)`` in ``pairs`` again and keep the faster result.
+
+    A regression has to show up in every measurement to survive; one
+    busy moment does not.
+    """
+    texts = {}
+    for size, name in pairs:
+        if size not in texts:
+            texts[size] = synthetic_text(int(size))
+        setup, run = OPERATIONS[name]
+        result = report['sizes'][size]['operations'][name]
+        again = measure(setup, run, texts[size], repeat, memory=False)
+        result['seconds'] = min(result['seconds'], again['seconds'])
+        if again['median'] < result['median']:
+            result['median'], result['noise'] = again['median'], again['noise']
+    _set_relative(report)
+
+
+def _set_relative(report):
+    for entry in report['sizes'].values():
+        for result in entry['operations'].values():
+            result['relative'] = round(result['median'] / report['calibration_seconds'], 4)
+
+
+def compare(report, baseline, threshold=0.25, min_seconds=0.02):
+    """Return a ``Regression`` for each slowdown or memory growth of ``report`` against ``baseline``.
+
+    A peak memory more than ``threshold`` (a fraction) above the baseline
+    counts as a regression. So does a time, once it is also beyond the
+    noise recorded for the operation in the two runs: a slowdown no larger
+    than the operation's own run-to-run spread proves nothing. Times are
+    compared in calibration units when both runs have them, and in seconds
+    otherwise. Timings below ``min_seconds`` in both runs are skipped.
+
+    The calibration loop does not speed up or slow down exactly as the
+    operations do, so when most operations look slower by the same factor
+    that factor (the median across the run) is taken as the machine's drift
+    and divided out: an operation has to be slow against the rest of the
+    run too. A change that slows every operation alike reads as drift.
+    On the machine that recorded the baseline, a slowdown must show in
+    plain seconds as well: seconds swing when the whole machine slows down,
+    calibration units when only the loop speeds up, and a real regression
+    shows in both.
+    """
+    same_machine = all(report.get(key) is not None and report.get(key) == baseline.get(key)
+                       for key in ('python', 'platform', 'machine'))
+    timed = []
+    regressions = []
+    for size, entry in report['sizes'].items():
+        base_entry = baseline.get('sizes', {}).get(size)
+        if base_entry is None:
+            continue
+        for name, result in entry['operations'].items():
+            base = base_entry['operations'].get(name)
+            if base is None:
+                continue
+            seconds, base_seconds = result['seconds'], base['seconds']
+            in_seconds = None
+            if 'relative' in result and 'relative' in base:
+                value, base_value, unit = result['relative'], base['relative'], ' units'
+                if same_machine:
+                    in_seconds = result.get('median', seconds) / base.get('median', base_seconds)
+            else:
+                value, base_value, unit = seconds, base_seconds, 's'
+            if max(seconds, base_seconds) >= min_seconds and base_value > 0:
+                # Both medians are uncertain, so their spreads add up (in quadrature)
+                allowed = threshold + math.hypot(result.get('noise', 0), base.get('noise', 0))
+                timed.append((size, name, value, base_value, unit, allowed, in_seconds))
+            peak, base_peak = result.get('peak_bytes'), base.get('peak_bytes')
+            if peak and base_peak and peak > base_peak * (1 + threshold):
+                regressions.append(Regression(size, name, 'memory', (
+                    f"{name} @ {size}: peak {peak / 1e6:.1f} MB vs {base_peak / 1e6:.1f} MB "
+                    f"baseline (+{(peak / base_peak - 1) * 100:.0f}%)")))
+
+    drift = 1.0
+    if len(timed) >= MIN_DRIFT_SAMPLES:
+        drift = max(1.0, statistics.median(item[2] / item[3] for item in timed))
+    for size, name, value, base_value, unit, allowed, in_seconds in timed:
+        ratio = value / base_value / drift
+        if ratio > 1 + allowed and (in_seconds is None or in_seconds > 1 + allowed):
+            note = f" after the run's +{(drift - 1) * 100:.0f}% drift" if drift > 1 else ""
+            if in_seconds is not None:
+                note += f", +{(in_seconds - 1) * 100:.0f}% in seconds"
+            regressions.append(Regression(size, name, 'time', (
+                f"{name} @ {size}: {value:.4f}{unit} vs {base_value:.4f}{unit} baseline "
+                f"(+{(ratio - 1) * 100:.0f}%{note}, allowed +{allowed * 100:.0f}%)")))
+    return regressions
+
+
+def scaling(report):
+    """Per operation, the growth exponent between consecutive sizes (1.0 = linear)."""
+    sizes = sorted(report['sizes'].values(), key=lambda entry: entry['objects'])
+    exponents = {}
+    for small, large in zip(sizes, sizes[1:]):
+        for name, result in large['operations'].items():
+            before = small['operations'].get(name, {}).get('seconds')
+            if before and result['seconds'] and before > 0.0005:
+                exponents.setdefault(name, []).append(round(
+                    math.log(result['seconds'] / before) / math.log(large['objects'] / small['objects']), 2))
+    return exponents
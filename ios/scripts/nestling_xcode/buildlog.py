@@ -0,0 +1,144 @@
+"""
+Streaming parser for Xcode build logs.
+
+Reads the text Xcode exports from the report navigator ("Showing All
+Messages") or that ``xcodebuild`` prints, one line at a time, and yields
+typed events:
+
+``Step``
+    a build-system task -- ``SwiftCompile``, ``CompileC``, ``Ld``,
+    ``PrecompileModule``, ``CodeSign``, ... -- with its target, project and
+    the file it works on;
+``TargetBuild``
+    a ``Build target X of project Y with configuration Z`` banner;
+``Diagnostic``
+    an ``error:`` / ``warning:`` / ``note:`` line, with its location and
+    the target of the step it was printed under;
+``Timing``
+    a line of the ``Build Timing Summary`` xcodebuild prints with
+    ``-showBuildTimingSummary`` (``SwiftCompile (12 tasks) | 45.1 seconds``),
+    the only per-task durations a text log carries;
+``Footer``
+    the ``Activity Log Complete  <date>  23.7 seconds`` (or ``Build
+    failed ...``) summary, or xcodebuild's ``** BUILD FAILED ** [52.3 sec]``.
+
+Nothing but the current step is remembered, so memory stays constant
+whatever the size of the log, and any iterable of lines works -- an open
+file, ``sys.stdin`` behind a pipe, or a generator.
+"""
+
+import re
+import sys
+from collections import namedtuple
+
+Step = namedtuple('Step', 'kind target project path line')
+TargetBuild = namedtuple('TargetBuild', 'target project configuration line')
+Diagnostic = namedtuple('Diagnostic', 'severity path line column message target project log_line')
+Timing = namedtuple('Timing', 'kind tasks seconds line')
+Footer = namedtuple('Footer', 'status date seconds line')
+
+# A task line: CamelCase name, then escaped-space arguments and usually the target
+STEP_RE = re.compile(r"^(?P<kind>[A-Z][A-Za-z0-9]*)(?: (?P<args>.*?))?"
+                     r"(?: \(in target '(?P<target>[^']*)' from project '(?P<project>[^']*)'"
+                     r"(?: at path '[^']*')?\))?\s*$")
+# Task names without a target are only trusted when they look like one (two humps: PrecompileModule)
+TASK_NAME_RE = re.compile(r'^[A-Z][a-z0-9]*[A-Z]')
+
+TARGET_BUILD_RE = re.compile(r'^Build target (?P<target>\S+)(?: of project (?P<project>\S+))?'
+                             r' with configuration (?P<configuration>\S+)\s*$')
+
+DIAGNOSTIC_RE = re.compile(r'^(?:(?P<path>[^:\n]*[^:\s])(?::(?P<line>\d+))?(?::(?P<column>\d+))?: )?'
+                           r'(?P<severity>fatal error|error|warning|note): (?P<message>.*?)\s*$')
+
+FOOTER_RE = re.compile(r'^(?P<status>[A-Z][A-Za-z ]*?)\s{2,}(?P<date>\S.*?)\s{2,}(?P<seconds>\d+(?:\.\d+)?) seconds\s*$')
+XCODEBUILD_FOOTER_RE = re.compile(r'^\*\* (?P<status>[A-Z ]+) \*\*(?: \[(?P<seconds>\d+(?:\.\d+)?) sec\])?\s*$')
+TIMING_RE = re.compile(r'^(?P<kind>[A-Z][A-Za-z0-9]*) \((?P<tasks>\d+) tasks?\) \| (?P<seconds>\d+(?:\.\d+)?) seconds\s*$')
+
+# Arguments are separated by spaces; a space inside a path is written "\ "
+_ARG_RE = re.compile(r'(?:\\.|[^ \\])+')
+
+# The task argument naming the file, where it is not the first absolute path
+_FILE_ARGUMENT = {
+    'CompileC': 1,          # CompileC <object> <source> normal arm64 c ...
+}
+
+
+def step_path(kind, args):
+    """The file a task works on, from its arguments; None if it names none.
+
+    A batched ``SwiftCompile ... Compiling\\ A.swift,\\ B.swift`` line gets
+    None: every file in the batch also has a line of its own.
+    """
+    if not args or args.startswith('Compiling\\ ') or ' Compiling\\ ' in args:
+        return None
+    paths = [arg.replace('\\ ', ' ') for arg in _ARG_RE.findall(args) if arg.startswith('/')]
+    index = _FILE_ARGUMENT.get(kind, 0)
+    return paths[index] if len(paths) > index else None
+
+
+def parse_log(lines):
+    """Yield ``Step``, ``TargetBuild``, ``Diagnostic``, ``Timing`` and ``Footer`` events from log ``lines``."""
+    target = project = None
+    for number, line in enumerate(lines, 1):
+        if not line or line[0] in ' \t\n\r':
+            continue        # command lines, output and blank lines between tasks
+
+        m = DIAGNOSTIC_RE.match(line)
+        if m:
+            yield Diagnostic(m.group('severity'), m.group('path'),
+                             int(m.group('line')) if m.group('line') else None,
+                             int(m.group('column')) if m.group('column') else None,
+                             m.group('message'), target, project, number)
+            continue
+
+        m = TARGET_BUILD_RE.match(line)
+        if m:
+            target, project = m.group('target'), m.group('project')
+            yield TargetBuild(target, project, m.group('configuration'), number)
+            continue
+
+        m = FOOTER_RE.match(line) or XCODEBUILD_FOOTER_RE.match(line)
+        if m:
+            seconds = m.group('seconds')
+            yield Footer(m.group('status'), m.groupdict().get('date'),
+                         float(seconds) if seconds else None, number)
+            continue
+
+        m = TIMING_RE.match(line)
+        if m:
+            yield Timing(m.group('kind'), int(m.group('tasks')), float(m.group('seconds')), number)
+            continue
+
+        m = STEP_RE.match(line)
+        if m and (m.group('target') is not None or TASK_NAME_RE.match(m.group('kind'))):
+            kind = m.group('kind')
+            if m.group('target') is not None:
+                target, project = m.group('target'), m.group('project')
+                step_target, step_project = target, project
+            else:
+                step_target = step_project = None
+            yield Step(kind, step_target, step_project, step_path(kind, m.group('args')), number)
+
+
+def read_log(path):
+    """``parse_log`` over a file, reading it lazily; ``-`` is stdin."""
+    if path == '-':
+        yield from parse_log(sys.stdin)
+        return
+    with open(path, encoding='utf-8', errors='replace') as f:
+        yield from parse_log(f)
+
+
+def event_dict(event):
+    """JSON-ready form of an event, with its type under ``event``."""
+    return {'event': type(event).__name__.lower(), **event._asdict()}
+
+
+def format_diagnostic(diagnostic):
+    where = diagnostic.path or ''
+    if diagnostic.line is not None:
+        where += f":{diagnostic.line}"
+        if diagnostic.column is not None:
+            where += f":{diagnostic.column}"
+    target = f" [{diagnostic.target}]" if diagnostic.target else ''
+    return f"{where + ': ' if where else ''}{diagnostic.severity}: {diagnostic.message}{target}"
@@ -0,0 +1,261 @@
+"""
+Build-time trends across many Xcode build logs.
+
+Each log is parsed by ``buildlog`` in its own worker process and reduced
+to a small per-run summary: status and wall time from the footer, step
+counts per kind, per target, per project (the app or a Swift package)
+and per source file, errors and warnings, and -- when the log carries an
+xcodebuild ``Build Timing Summary`` -- seconds per task kind. Only the
+summaries come back to the parent, so ingesting a dozen multi-megabyte
+logs costs one log's parse time per CPU.
+
+Runs are ordered by the timestamp in their file name (``Build
+Nuzzle_2025-12-10T07-43-42.txt``), falling back to the footer date.
+Exported "Showing All Messages" logs have no per-task durations, so
+between two runs a regression is reported as the extra work each target,
+project and file caused (steps re-run) next to the change in wall time
+and, where available, in measured seconds per task kind. By default the
+two latest runs that compiled something and report a wall time are
+compared, so a build that failed during package resolution is skipped.
+"""
+
+import glob
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from .buildlog import Diagnostic, Footer, Step, Timing, read_log
+
+# Where build logs are kept, relative to the repository root
+DEFAULT_LOG_GLOBS = (
+    'Xcode Logs/*.txt',
+    'ios/Nuzzle/Build *.txt',
+    'Nuzzle_*.txt',
+)
+
+# Steps that compile or link one file; their paths are what the file table counts
+FILE_STEPS = frozenset({'SwiftCompile', 'CompileC', 'PrecompileModule', 'Ld'})
+
+# Aggregation levels a regression can be reported at
+LEVELS = ('target', 'project', 'file', 'kind')
+
+_NAME_TIME_RE = re.compile(r'(\d{4}-\d{2}-\d{2})T(\d{2})-(\d{2})-(\d{2})')
+_INDEX_RE = re.compile(r'-?(?:0|[1-9]\d*)\Z')
+
+
+def default_logs(repo_root):
+    paths = []
+    for pattern in DEFAULT_LOG_GLOBS:
+        paths.extend(sorted(glob.glob(os.path.join(repo_root, pattern))))
+    return paths
+
+
+def short_path(path):
+    """Package checkouts as ``package/...``, the app's sources from ``ios/`` on."""
+    for marker in ('/SourcePackages/checkouts/', '/DerivedData/'):
+        index = path.find(marker)
+        if index >= 0:
+            return path[index + len(marker):]
+    index = path.find('/ios/')
+    return path[index + 1:] if index >= 0 else path
+
+
+def _started(path, footer_date):
+    m = _NAME_TIME_RE.search(os.path.basename(path))
+    if m:
+        return f"{m.group(1)}T{m.group(2)}:{m.group(3)}:{m.group(4)}"
+    if footer_date:
+        try:
+            # Xcode separates the time and AM/PM with a narrow no-break space
+            when = datetime.strptime(footer_date.replace('\u202f', ' '), '%m/%d/%y, %I:%M %p')
+            return when.isoformat()
+        except ValueError:
+            pass
+    return None
+
+
+class Tally:
+    """Running counts over the events of one log, shared by ``summarize_log`` and ``buildlog``.
+
+    Xcode repeats every issue in its summary at the end of the log, so a
+    diagnostic is counted once per (severity, location, message); notes are
+    not counted.
+    """
+
+    def __init__(self):
+        self.steps, self.targets, self.projects, self.files, self.timing = {}, {}, {}, {}, {}
+        self.errors = self.warnings = 0
+        self.footer = None
+        self._seen = set()
+
+    def add(self, event):
+        """Count ``event``. Returns False for a diagnostic that was already counted."""
+        if isinstance(event, Step):
+            self.steps[event.kind] = self.steps.get(event.kind, 0) + 1
+            if event.target is not None:
+                target = f"{event.target} ({event.project})"
+                self.targets[target] = self.targets.get(target, 0) + 1
+                self.projects[event.project] = self.projects.get(event.project, 0) + 1
+            if event.path and event.kind in FILE_STEPS:
+                name = short_path(event.path)
+                self.files[name] = self.files.get(name, 0) + 1
+        elif isinstance(event, Diagnostic) and event.severity != 'note':
+            key = (event.severity, event.path, event.line, event.column, event.message)
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            if event.severity == 'warning':
+                self.warnings += 1
+            else:
+                self.errors += 1
+        elif isinstance(event, Timing):
+            self.timing[event.kind] = self.timing.get(event.kind, 0.0) + event.seconds
+        elif isinstance(event, Footer):
+            self.footer = event
+        return True
+
+
+def summarize_log(path):
+    """Pool worker: the summary dict for one log."""
+    tally = Tally()
+    for event in read_log(path):
+        tally.add(event)
+    footer = tally.footer
+    return {
+        'log': path,
+        'name': os.path.basename(path),
+        'started': _started(path, footer.date if footer else None),
+        'status': footer.status if footer else None,
+        'seconds': footer.seconds if footer else None,
+        'errors': tally.errors,
+        'warnings': tally.warnings,
+        'kind': tally.steps,
+        'target': tally.targets,
+        'project': tally.projects,
+        'file': tally.files,
+        'timing': tally.timing,
+    }
+
+
+def ingest(paths, jobs=None):
+    """Summaries for ``paths``, one worker process per log, oldest run first."""
+    if not paths:
+        return []
+    with ProcessPoolExecutor(max_workers=jobs or min(len(paths), os.cpu_count() or 1)) as pool:
+        runs = list(pool.map(summarize_log, paths))
+    return sorted(runs, key=lambda run: (run['started'] or '', run['name']))
+
+
+def find_run(runs, key):
+    """
+    A run by index (``-1`` is the latest) or by a substring of its file name.
+
+    Only a number in range without a leading zero is an index, so ``2025``
+    or ``0743`` match the time in a file name. Raises KeyError when no
+    single run matches.
+    """
+    if _INDEX_RE.match(key) and -len(runs) <= int(key) < len(runs):
+        return runs[int(key)]
+    matches = [run for run in runs if key in run['name']]
+    if len(matches) != 1:
+        raise KeyError(f"{len(matches)} of {len(runs)} runs match {key!r}")
+    return matches[0]
+
+
+def comparable(run):
+    """True for a run that got as far as compiling and reported its wall time."""
+    return run['seconds'] is not None and any(run['kind'].get(kind) for kind in FILE_STEPS)
+
+
+def pick_runs(runs, base=None, head=None):
+    """
+    ``(base, head)`` to compare; each is a ``find_run`` key or None.
+
+    By default ``head`` is the latest comparable run and ``base`` the
+    comparable run before it, so a build aborted before compiling (a
+    package resolution failure) is not measured against a full one.
+    """
+    if head is not None:
+        head_run = find_run(runs, head)
+    else:
+        head_run = ([run for run in runs if comparable(run)] or runs)[-1]
+    if base is not None:
+        return find_run(runs, base), head_run
+    earlier = runs[:next(i for i, run in enumerate(runs) if run is head_run)]
+    earlier = [run for run in earlier if comparable(run)] or earlier
+    if not earlier:
+        raise KeyError(f"No run before {head_run['name']} to compare it with")
+    return earlier[-1], head_run
+
+
+def regressions(base, head, top=10):
+    """
+    The biggest increases from ``base`` to ``head``.
+
+    Returns ``{'seconds': ..., 'timing': [...], level: [...]}`` where every
+    list holds ``{'name', 'base', 'head', 'delta'}`` rows, largest delta
+    first, with only the rows that grew.
+    """
+    def grew(before, after):
+        rows = []
+        for name in set(before) | set(after):
+            delta = after.get(name, 0) - before.get(name, 0)
+            if delta > 0:
+                rows.append({'name': name, 'base': before.get(name, 0), 'head': after.get(name, 0), 'delta': delta})
+        rows.sort(key=lambda row: (-row['delta'], row['name']))
+        return rows[:top]
+
+    report = {
+        'base': base['name'],
+        'head': head['name'],
+        'seconds': {'base': base['seconds'], 'head': head['seconds'],
+                    'delta': None if base['seconds'] is None or head['seconds'] is None
+                    else round(head['seconds'] - base['seconds'], 3)},
+        'timing': grew(base['timing'], head['timing']),
+    }
+    for level in LEVELS:
+        report[level] = grew(base[level], head[level])
+    return report
+
+
+def trend_rows(runs):
+    """One row per run: when, status, wall time, step totals and issue counts."""
+    for run in runs:
+        yield {
+            'started': run['started'], 'name': run['name'], 'status': run['status'],
+            'seconds': run['seconds'], 'steps': sum(run['kind'].values()),
+            'SwiftCompile': run['kind'].get('SwiftCompile', 0), 'CompileC': run['kind'].get('CompileC', 0),
+            'PrecompileModule': run['kind'].get('PrecompileModule', 0), 'Ld': run['kind'].get('Ld', 0),
+            'errors': run['errors'], 'warnings': run['warnings'],
+        }
+
+
+def series(runs, level, top=10):
+    """``[(name, [count per run])]`` for the ``top`` names of ``level`` by total across runs."""
+    totals = {}
+    for run in runs:
+        for name, count in run[level].items():
+            totals[name] = totals.get(name, 0) + count
+    names = sorted(totals, key=lambda name: (-totals[name], name))[:top]
+    return [(name, [run[level].get(name, 0) for run in runs]) for name in names]
+
+
+def format_table(headers, rows):
+    """Left-align text columns and right-align numbers, with a rule under the header."""
+    cells = [[_cell(value) for value in row] for row in rows]
+    widths = [max([len(header)] + [len(row[i]) for row in cells]) for i, header in enumerate(headers)]
+    numeric = [all(isinstance(row[i], (int, float)) or row[i] is None for row in rows) for i in range(len(headers))]
+
+    def line(values):
+        return '  '.join(value.rjust(width) if right else value.ljust(width)
+                         for value, width, right in zip(values, widths, numeric)).rstrip()
+    return [line(headers), line(['-' * width for width in widths])] + [line(row) for row in cells]
+
+
+def _cell(value):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    return str(value)
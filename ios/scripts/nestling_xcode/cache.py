@@ -0,0 +1,74 @@
+"""
+On-disk cache of parsed projects.
+
+The parsed object graph and its ``SourceMap`` are pickled next to the
+project file (``.project.pbxproj.cache``) behind a small header holding the
+file's size, mtime and content hash. A matching size and mtime is trusted
+outright; if only the mtime moved (a checkout, or Xcode rewriting the same
+bytes) the hash decides. Anything else -- including a different cache
+version -- counts as a miss and the file is parsed again.
+"""
+
+import hashlib
+import os
+import pickle
+
+CACHE_VERSION = 1
+
+
+def cache_path(path):
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f'.{name}.cache')
+
+
+def fingerprint(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def read(path):
+    """Return ``(text, data, source_map)``; ``data`` is None on a cache miss.
+
+    ``source_map`` may also be None when the cached graph was stored after a
+    write, in which case positions are rebuilt only if they are needed.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+        stat = os.fstat(f.fileno())
+    text = raw.decode('utf-8')
+    try:
+        with open(cache_path(path), 'rb') as f:
+            version, size, mtime, digest = pickle.load(f)
+            if version != CACHE_VERSION or size != stat.st_size:
+                return text, None, None
+            if mtime != stat.st_mtime_ns and digest != fingerprint(raw):
+                return text, None, None
+            data, source_map = pickle.load(f)
+    except Exception:
+        # A damaged cache can fail to unpickle in almost any way (a garbled
+        # length alone gives MemoryError or OverflowError); all are a miss
+        return text, None, None
+    if mtime != stat.st_mtime_ns:
+        write(path, text, data, source_map)
+    return text, data, source_map
+
+
+def write(path, text, data, source_map=None):
+    """Store the parsed graph for ``text``; a cache that cannot be written is skipped."""
+    raw = text.encode('utf-8')
+    try:
+        stat = os.stat(path)
+        tmp_path = cache_path(path) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((CACHE_VERSION, len(raw), stat.st_mtime_ns, fingerprint(raw)), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump((data, source_map), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path(path))
+    except OSError:
+        pass
+
+
+def clear(path):
+    try:
+        os.remove(cache_path(path))
+    except FileNotFoundError:
+        pass
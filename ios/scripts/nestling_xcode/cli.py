@@ -0,0 +1,473 @@
+"""
+``nestling-xcode``: every project tool behind one entry point.
+
+Subcommands can be chained and run in order in one process::
+
+    nestling-xcode sync dedupe gc validate
+    nestling-xcode --dry-run add Nestling/Features/Feed/Views/FeedRow.swift
+    nestling-xcode packages --prune validate
+    nestling-xcode add --group Scripts -- sync + validate
+
+A command name that is an option's value or comes after ``--`` is an
+argument, not the next command; ``+`` always starts the next command.
+
+The project is parsed at most once (from the cache when it is unchanged),
+every command edits the same in-memory model, and the result is written
+once at the end. Command implementations are imported only when their
+command runs, so ``validate`` never pays for PIL or the parser.
+"""
+
+import argparse
+import os
+import sys
+
+from .project import DEFAULT_PROJECT_PATH, IOS_DIR
+
+REPO_ROOT = os.path.dirname(IOS_DIR)
+
+COMMANDS = {}
+
+
+def command(name, help):
+    """Register ``configure(parser)`` / ``run(session, args)`` for a subcommand."""
+    def register(configure):
+        COMMANDS[name] = (help, configure)
+        return configure
+    return register
+
+
+class Session:
+    """State shared by the commands of one invocation."""
+
+    def __init__(self, project_path, dry_run=False, use_cache=True):
+        self.project_path = project_path
+        self.dry_run = dry_run
+        self.use_cache = use_cache
+        self.status = 0
+        self.after_write = []
+        self._project = None
+
+    @property
+    def project(self):
+        if self._project is None:
+            from .project import PBXProject
+            self._project = PBXProject.load(self.project_path, use_cache=self.use_cache)
+        return self._project
+
+    @property
+    def loaded(self):
+        return self._project is not None
+
+    def fail(self):
+        self.status = 1
+
+    def finish(self):
+        """Write the project once if any command changed it."""
+        if self.loaded and self._project.modified:
+            if self.status:
+                print("❌ Not writing the project: a check failed")
+                return
+            if self.dry_run:
+                self._project.save(dry_run=True)
+                return
+            self._project.save()
+            print(f"✅ Wrote {self.project_path}")
+        if not self.dry_run:
+            for callback in self.after_write:
+                callback()
+
+
+# -- project commands ---------------------------------------------------------
+
+@command('add', "add files to a group and target")
+def _add(parser):
+    parser.add_argument('files', nargs='+',
+                        help="paths relative to the project directory, or to --group if given")
+    parser.add_argument('--group', help="group name, path or UUID (default: groups follow the folders)")
+    parser.add_argument('--target', help="target name (default: the app target)")
+
+    def run(session, args):
+        from .files import add_files, add_paths
+        if args.group is None:
+            added = add_paths(session.project, args.files, target=args.target)
+        else:
+            added = add_files(session.project, args.files, group=args.group, target=args.target)
+        for path, file_ref_id, build_file_id in added:
+            print(f"   + {path} (file ref {file_ref_id}, build {build_file_id})")
+        skipped = len(args.files) - len(added)
+        print(f"📄 add: {len(added)} added" + (f", {skipped} already present" if skipped else ""))
+    return run
+
+
+@command('sync', "mirror the Swift files on disk into the project")
+def _sync(parser):
+    parser.add_argument('--full', action='store_true', help="re-list every directory")
+    parser.add_argument('--no-remove', action='store_true', help="only add, never remove")
+
+    def run(session, args):
+        from .sync import Inventory, default_inventory_path, project_root, sync
+        project = session.project
+        inventory_path = default_inventory_path(project)
+        inventory = Inventory.load(inventory_path, project_root(project))
+        result = sync(project, inventory, remove=not args.no_remove, full=args.full)
+        for path in result.added:
+            print(f"   + {path}")
+        for path in result.removed:
+            print(f"   - {path}")
+        for old_path, new_path in result.moved:
+            print(f"   → {old_path} → {new_path}")
+        print(f"🔄 sync: {len(result.added)} added, {len(result.removed)} removed, {len(result.moved)} moved "
+              f"({inventory.scanned} directories listed)")
+        session.after_write.append(lambda: inventory.save(inventory_path))
+    return run
+
+
+@command('dedupe', "remove duplicate file references and build files")
+def _dedupe(parser):
+    parser.add_argument('--check', action='store_true', help="only report; fail if duplicates exist")
+
+    def run(session, args):
+        from .dedupe import find_duplicates, format_report, remove_duplicates
+        duplicates = find_duplicates(session.project)
+        for line in format_report(duplicates):
+            print(f"   {line}")
+        print(f"🔍 dedupe: {len(duplicates)} duplicate(s)")
+        if args.check:
+            if duplicates:
+                session.fail()
+        elif duplicates:
+            remove_duplicates(session.project, duplicates)
+    return run
+
+
+@command('gc', "remove objects unreachable from the root object")
+def _gc(parser):
+    def run(session, args):
+        from .gc import collect_garbage
+        removed, reclaimed = collect_garbage(session.project)
+        for isa, count in sorted(removed.items()):
+            print(f"   {isa}: {count}")
+        print(f"🧹 gc: {sum(removed.values())} unreachable object(s), {reclaimed:,} bytes reclaimed")
+    return run
+
+
+@command('validate', "check structure, references and required keys")
+def _validate(parser):
+    parser.add_argument('--strict', action='store_true', help="treat warnings as errors")
+
+    def run(session, args):
+        from .validate import format_issue, validate, validate_file
+        if session.loaded and session.project.modified:
+            # Validate what is about to be written, not what is on disk
+            issues = validate(session.project.dumps())
+        else:
+            issues = validate_file(session.project_path)
+        for issue in issues:
+            print(f"   {format_issue(issue, session.project_path)}")
+        errors = [issue for issue in issues if issue.severity == 'error' or args.strict]
+        print(f"{'❌' if errors else '✅'} validate: {len(errors)} error(s), {len(issues) - len(errors)} warning(s)")
+        if errors:
+            session.fail()
+    return run
+
+
+@command('packages', "apply the Swift Package manifest (nestling_xcode.packages.PACKAGES)")
+def _packages(parser):
+    parser.add_argument('--prune', action='store_true', help="remove packages the manifest does not list")
+    parser.add_argument('--check', action='store_true', help="only report; fail if changes are needed")
+
+    def run(session, args):
+        from .packages import PACKAGES, format_report, sync_packages
+        changes = sync_packages(session.project, PACKAGES, prune=args.prune, dry_run=args.check)
+        for line in format_report(changes):
+            print(f"   {line}")
+        print(f"📦 packages: {len(changes)} change(s)")
+        if args.check and changes:
+            session.fail()
+    return run
+
+
+@command('normalize', "sort objects, keys and group children into Xcode's canonical order")
+def _normalize(parser):
+    parser.add_argument('--check', action='store_true', help="only report; fail if the file is not normalized")
+    parser.add_argument('--keep-children', action='store_true', help="leave group children in their order")
+
+    def run(session, args):
+        from .normalize import normalize
+        project = session.project
+        result = normalize(project, children=not args.keep_children)
+        changed = project.dumps(full=True) != project.text
+        print(f"🔤 normalize: {result.sections} section(s), {result.objects} object(s) and "
+              f"{result.groups} group(s) out of order" + ("" if changed else "; already normalized"))
+        if args.check:
+            if changed:
+                session.fail()
+        elif changed:
+            project.rewrite = True
+    return run
+
+
+@command('watch', "keep the project loaded and sync it as files are created, deleted or moved")
+def _watch(parser):
+    parser.add_argument('--debounce', type=float, default=0.3, help="seconds of quiet before syncing")
+    parser.add_argument('--poll', action='store_true', help="poll directory mtimes instead of using inotify")
+    parser.add_argument('--interval', type=float, default=1.0, help="polling interval in seconds")
+
+    def run(session, args):
+        from .watch import watch
+        # Whatever the earlier commands changed goes out before watching starts
+        session.finish()
+        session.after_write.clear()
+        session._project = watch(session.project, debounce=args.debounce, poll=args.poll,
+                                 interval=args.interval)
+    return run
+
+
+# -- other tools --------------------------------------------------------------
+
+@command('audit', "check asset catalogs against their Contents.json (PNG headers only)")
+def _audit(parser):
+    parser.add_argument('catalogs', nargs='*', help="*.xcassets directories (default: every catalog under ios/)")
+    parser.add_argument('--strict', action='store_true', help="treat warnings as errors")
+
+    def run(session, args):
+        import time
+        from .assets import audit, find_catalogs, format_issue
+        started = time.perf_counter()
+        catalogs = args.catalogs or find_catalogs(IOS_DIR)
+        issues, sets, files = audit(catalogs)
+        elapsed = time.perf_counter() - started
+        for issue in issues:
+            print(f"   {format_issue(issue)}")
+        errors = [issue for issue in issues if issue.severity == 'error' or args.strict]
+        print(f"{'❌' if errors else '✅'} audit: {len(catalogs)} catalog(s), {sets} set(s), {files} file(s) "
+              f"in {elapsed * 1000:.0f} ms; {len(errors)} error(s), {len(issues) - len(errors)} warning(s)")
+        if errors:
+            session.fail()
+    return run
+
+
+@command('icons', "regenerate the app icon set (needs Pillow)")
+def _icons(parser):
+    parser.add_argument('--force', action='store_true', help="re-render sizes the manifest says are current")
+    parser.add_argument('--quality', action='store_true',
+                        help="check each pyramid resize against direct Lanczos and fall back past the bound")
+    parser.add_argument('--optimize', action='store_true',
+                        help="losslessly shrink the rendered PNGs and check the catalog size budgets")
+    parser.add_argument('--compare', action='store_true',
+                        help="compare every size with the golden icons (SSIM / max difference)")
+    parser.add_argument('--jobs', type=int, help="worker processes (default: one per CPU)")
+
+    def run(session, args):
+        module = _load_script(os.path.join(REPO_ROOT, 'scripts', 'fix_app_icons.py'), 'fix_app_icons')
+        if not module.main(force=args.force, jobs=args.jobs, quality=args.quality, optimize=args.optimize,
+                           compare=args.compare):
+            session.fail()
+    return run
+
+
+@command('buildlog', "parse Xcode build logs (files or stdin) into steps, diagnostics and timing")
+def _buildlog(parser):
+    parser.add_argument('logs', nargs='*', default=['-'], help="exported build logs (default: stdin)")
+    parser.add_argument('--json', action='store_true', help="print every event as a JSON line")
+    parser.add_argument('--check', action='store_true', help="fail if a log has errors")
+
+    def run(session, args):
+        import json
+        from .buildlog import Diagnostic, event_dict, format_diagnostic, read_log
+        from .buildreport import Tally
+        for path in args.logs:
+            tally = Tally()
+            for event in read_log(path):
+                if args.json:
+                    print(json.dumps({**event_dict(event), 'log': path}))
+                if tally.add(event) and isinstance(event, Diagnostic) and event.severity != 'note' and not args.json:
+                    print(f"   {format_diagnostic(event)}")
+            if args.json:
+                continue
+            name = 'stdin' if path == '-' else os.path.basename(path)
+            top = sorted(tally.steps.items(), key=lambda item: -item[1])[:6]
+            footer = tally.footer
+            print(f"{'❌' if tally.errors else '✅'} {name}: {sum(tally.steps.values())} steps "
+                  f"({', '.join(f'{count} {kind}' for kind, count in top)}), "
+                  f"{tally.errors} error(s), {tally.warnings} warning(s)"
+                  + (f"; {footer.status}" + (f" in {footer.seconds:g} s" if footer.seconds is not None else "")
+                     if footer else ""))
+            if args.check and tally.errors:
+                session.fail()
+    return run
+
+
+@command('buildreport', "build-time trends across build logs and the top regressions between two runs")
+def _buildreport(parser):
+    parser.add_argument('logs', nargs='*', help="build logs (default: Xcode Logs/, ios/Nuzzle/Build *.txt, Nuzzle_*.txt)")
+    parser.add_argument('--base', help="run to compare from: index or part of the file name "
+                                       "(default: the last comparable run before --head)")
+    parser.add_argument('--head', help="run to compare to (default: the latest run that compiled and has a "
+                                       "wall time, so an aborted build is skipped)")
+    parser.add_argument('--top', type=int, default=10, help="rows per table (default: %(default)s)")
+    parser.add_argument('--json', metavar='FILE', help="also write the runs and regressions as JSON ('-' for stdout)")
+    parser.add_argument('--jobs', type=int, help="worker processes (default: one per log, up to the CPU count)")
+
+    def run(session, args):
+        import json
+        from .buildreport import LEVELS, default_logs, format_table, ingest, pick_runs, regressions, series, trend_rows
+        runs = ingest(args.logs or default_logs(REPO_ROOT), args.jobs)
+        if not runs:
+            print("❌ buildreport: no build logs found")
+            session.fail()
+            return
+        report = {'runs': runs}
+        if len(runs) > 1 or args.base is not None or args.head is not None:
+            try:
+                report['regressions'] = regressions(*pick_runs(runs, args.base, args.head), args.top)
+            except KeyError as e:
+                print(f"❌ buildreport: {e.args[0]}")
+                session.fail()
+
+        if args.json != '-':
+            rows = list(trend_rows(runs))
+            for line in format_table(list(rows[0]), [list(row.values()) for row in rows]):
+                print(f"   {line}")
+            for level in ('target', 'project'):
+                print(f"\n   Steps per {level}, by run:")
+                table = [[name] + counts for name, counts in series(runs, level, args.top)]
+                for line in format_table([level] + [f"#{i + 1}" for i in range(len(runs))], table):
+                    print(f"   {line}")
+            found = report.get('regressions')
+            if found:
+                seconds = found['seconds']
+                print(f"\n📈 {found['base']} → {found['head']}: wall time {seconds['base']} → {seconds['head']} s")
+                for level in ('timing',) + LEVELS:
+                    if found[level]:
+                        print(f"\n   Top {level} regressions ({'seconds' if level == 'timing' else 'steps'}):")
+                        table = [[row['name'], row['base'], row['head'], f"+{row['delta']:g}"] for row in found[level]]
+                        for line in format_table([level, 'base', 'head', 'delta'], table):
+                            print(f"   {line}")
+        if args.json:
+            text = json.dumps(report, indent=2)
+            if args.json == '-':
+                print(text)
+            else:
+                with open(args.json, 'w') as f:
+                    f.write(text + '\n')
+                print(f"📝 Wrote {args.json}")
+    return run
+
+
+@command('logs', "stream simulator/device logs; remaining arguments go to xcode-logs.sh")
+def _logs(parser):
+    parser.add_argument('options', nargs=argparse.REMAINDER)
+
+    def run(session, args):
+        import subprocess
+        script = os.path.join(REPO_ROOT, 'scripts', 'xcode-logs.sh')
+        if subprocess.call(['bash', script] + args.options):
+            session.fail()
+    return run
+
+
+# Commands that take every argument after them
+GREEDY = frozenset({'logs'})
+
+
+def _load_script(path, name):
+    import importlib.util
+    # Like running it directly: the script's siblings are importable
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Always ends one command and starts the next
+SEPARATOR = '+'
+
+
+def _value_options(configure):
+    """Option strings that take a value, for a parser set up by ``configure``."""
+    parser = argparse.ArgumentParser(add_help=False)
+    configure(parser)
+    return {option for action in parser._actions if action.nargs != 0 for option in action.option_strings}
+
+
+def split_chain(argv):
+    """
+    Split ``argv`` into the global options and one argument list per command.
+
+    A command name starts the next command unless it is the value of an
+    option, comes after ``--`` or follows a greedy command; in those places
+    it is an argument (a file named ``gc``). ``+`` always starts the next
+    command, so ``add -- gc sync + validate`` adds two files and validates.
+    """
+    head, chain = [], []
+    values = _value_options(build_parser)
+    literal = is_value = after_separator = False
+    for arg in argv:
+        if arg == SEPARATOR:
+            after_separator = True
+            continue
+        starts = after_separator or (arg in COMMANDS and not literal and not is_value
+                                     and not (chain and chain[-1][0] in GREEDY))
+        if starts:
+            chain.append([arg])
+            values = _value_options(COMMANDS[arg][1]) if arg in COMMANDS else set()
+            literal = is_value = after_separator = False
+            continue
+        (chain[-1] if chain else head).append(arg)
+        if is_value or literal:
+            is_value = False
+        elif arg == '--':
+            literal = True
+        else:
+            is_value = arg in values
+    return head, chain
+
+
+def build_parser(parser=None):
+    parser = parser or argparse.ArgumentParser(
+        prog='nestling-xcode',
+        description="Chainable tools for Nestling.xcodeproj. Commands run in order; "
+                    "the project is parsed once and written once.",
+        epilog="commands:\n" + "\n".join(f"  {name:<10} {help}" for name, (help, _) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--project', default=DEFAULT_PROJECT_PATH, help="path to project.pbxproj")
+    parser.add_argument('--dry-run', action='store_true', help="print a diff instead of writing")
+    parser.add_argument('--no-cache', action='store_true', help="always parse the project file")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    head, chain = split_chain(argv)
+    parser = build_parser()
+    options = parser.parse_args(head)
+    if not chain:
+        parser.print_help()
+        return 2
+
+    steps = []
+    for name, *rest in chain:
+        if name not in COMMANDS:
+            parser.error(f"unknown command {name!r} after {SEPARATOR!r}")
+        help, configure = COMMANDS[name]
+        sub = argparse.ArgumentParser(prog=f'nestling-xcode {name}', description=help)
+        run = configure(sub)
+        steps.append((name, run, sub.parse_args(rest)))
+
+    if not os.path.exists(options.project):
+        print(f"❌ Project file not found: {options.project}")
+        return 1
+
+    session = Session(options.project, dry_run=options.dry_run, use_cache=not options.no_cache)
+    try:
+        for name, run, args in steps:
+            run(session, args)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    session.finish()
+    return session.status
@@ -0,0 +1,135 @@
+"""
+Duplicate detection for PBXFileReference and PBXBuildFile objects.
+
+File references are hash-indexed by their resolved path and build files by
+``(fileRef, build phase)``, across every target and phase, so one linear
+pass finds every duplicate and one rewrite removes them.
+"""
+
+from collections import namedtuple
+
+from .project import BUILD_PHASE_ISAS, GROUP_ISAS
+
+Duplicate = namedtuple('Duplicate', 'kind key kept removed')
+
+
+def find_duplicate_file_refs(project, paths=None):
+    """Group file references that resolve to the same path."""
+    if paths is None:
+        paths = project.resolved_paths()
+    referenced = {obj.get('fileRef') for _, obj in project.iter_section('PBXBuildFile')}
+
+    by_path = {}
+    for uuid, _ in project.iter_section('PBXFileReference'):
+        path = paths.get(uuid)
+        if path is not None:
+            by_path.setdefault(path, []).append(uuid)
+
+    duplicates = []
+    for path, uuids in by_path.items():
+        if len(uuids) > 1:
+            # Keep the reference a build phase already uses, if any
+            kept = next((uuid for uuid in uuids if uuid in referenced), uuids[0])
+            duplicates.append(Duplicate('PBXFileReference', path, kept, [u for u in uuids if u != kept]))
+    return duplicates
+
+
+def find_duplicate_build_files(project, ref_mapping=None):
+    """Group build files in the same phase that build the same file or product.
+
+    ``ref_mapping`` folds duplicate file references onto the kept one first,
+    so two build files for two copies of the same file count as duplicates.
+    """
+    ref_mapping = ref_mapping or {}
+    phase_owner = {}
+    for target_id, target in project.targets():
+        for phase_id in target.get('buildPhases', ()):
+            phase_owner[phase_id] = target.get('name')
+
+    duplicates = []
+    for isa in BUILD_PHASE_ISAS:
+        for phase_id, phase in project.iter_section(isa):
+            seen = {}
+            for build_id in phase.get('files', ()):
+                build = project.get(build_id)
+                if build is None:
+                    continue
+                ref = build.get('fileRef') or build.get('productRef')
+                key = ref_mapping.get(ref, ref)
+                if key not in seen:
+                    seen[key] = Duplicate('PBXBuildFile', _build_key(project, phase_owner, phase_id, key),
+                                          build_id, [])
+                elif build_id != seen[key].kept and build_id not in seen[key].removed:
+                    seen[key].removed.append(build_id)
+            duplicates.extend(dup for dup in seen.values() if dup.removed)
+    return duplicates
+
+
+def find_repeated_entries(project):
+    """Find groups and build phases that list the same UUID more than once."""
+    repeated = []
+    for isas, key in ((GROUP_ISAS, 'children'), (BUILD_PHASE_ISAS, 'files')):
+        for isa in isas:
+            for uuid, obj in project.iter_section(isa):
+                items = obj.get(key, ())
+                if len(set(items)) != len(items):
+                    extra = len(items) - len(set(items))
+                    repeated.append(Duplicate(isa, project.comments.get(uuid, uuid), uuid, [None] * extra))
+    return repeated
+
+
+def find_duplicates(project):
+    """Return every duplicate file reference, build file and repeated list entry."""
+    ref_dups = find_duplicate_file_refs(project)
+    ref_mapping = {old: dup.kept for dup in ref_dups for old in dup.removed}
+    return ref_dups + find_duplicate_build_files(project, ref_mapping) + find_repeated_entries(project)
+
+
+def remove_duplicates(project, duplicates=None):
+    """Fold every duplicate onto the kept object and delete the rest, in one rewrite.
+
+    Returns the list of duplicates that were removed.
+    """
+    if duplicates is None:
+        duplicates = find_duplicates(project)
+
+    mapping = {}
+    for dup in duplicates:
+        if dup.kind in ('PBXFileReference', 'PBXBuildFile'):
+            for old in dup.removed:
+                mapping[old] = dup.kept
+
+    if mapping:
+        project.replace_references(mapping)
+        for old in mapping:
+            project.remove(old)
+
+    # Entries repeated without any duplicate object behind them
+    for dup in duplicates:
+        if dup.kind not in ('PBXFileReference', 'PBXBuildFile') and dup.kept in project:
+            obj = project[dup.kept]
+            key = 'children' if 'children' in obj else 'files'
+            seen = set()
+            unique = [item for item in obj[key] if not (item in seen or seen.add(item))]
+            if len(unique) != len(obj[key]):
+                project.edit(dup.kept)[key] = unique
+    return duplicates
+
+
+def format_report(duplicates):
+    """Human-readable lines describing each duplicate."""
+    lines = []
+    for dup in duplicates:
+        if dup.kind == 'PBXFileReference':
+            lines.append(f"file reference  {dup.key}: keep {dup.kept}, drop {', '.join(dup.removed)}")
+        elif dup.kind == 'PBXBuildFile':
+            lines.append(f"build file      {dup.key}: keep {dup.kept}, drop {', '.join(dup.removed)}")
+        else:
+            lines.append(f"repeated entry  {dup.kind} {dup.key}: {len(dup.removed)} extra")
+    return lines
+
+
+def _build_key(project, phase_owner, phase_id, ref):
+    name = project.comments.get(ref) or project.display_name(ref) or ref
+    target = phase_owner.get(phase_id, '?')
+    return f"{name} in {target}/{project.phase_name(phase_id)}"
@@ -0,0 +1,184 @@
+"""
+Batch file insertion.
+
+``add_files`` plans every PBXFileReference / PBXBuildFile for a run first,
+then merges them into the groups and build phases in a single pass, so
+adding 200 files costs the same single read and write as adding one. IDs
+are derived from the group, phase and path, so re-adding a file is a no-op
+unless another target needs it built.
+"""
+
+import os
+import posixpath
+
+from .groups import GroupTree
+from .ids import IdAllocator
+
+# lastKnownFileType for the extensions we add to the project
+FILE_TYPES = {
+    '.swift': 'sourcecode.swift',
+    '.m': 'sourcecode.c.objc',
+    '.h': 'sourcecode.c.h',
+    '.strings': 'text.plist.strings',
+    '.stringsdict': 'text.plist.stringsdict',
+    '.plist': 'text.plist.xml',
+    '.json': 'text.json',
+    '.html': 'text.html',
+    '.xcassets': 'folder.assetcatalog',
+    '.xcprivacy': 'text.xml',
+    '.storekit': 'text',
+    '.entitlements': 'text.plist.entitlements',
+    '.xcdatamodeld': 'wrapper.xcdatamodeld',
+    '.png': 'image.png',
+    '.svg': 'text.xml',
+}
+
+SOURCE_EXTENSIONS = frozenset({'.swift', '.m', '.mm', '.c', '.cpp'})
+NO_BUILD_EXTENSIONS = frozenset({'.h', '.plist', '.entitlements'})
+
+
+def phase_isa_for(path):
+    """Return the build phase isa a file belongs in, or None if it is not built."""
+    ext = os.path.splitext(path)[1]
+    if ext in SOURCE_EXTENSIONS:
+        return 'PBXSourcesBuildPhase'
+    if ext in NO_BUILD_EXTENSIONS:
+        return None
+    return 'PBXResourcesBuildPhase'
+
+
+def file_reference(path):
+    """Build a group-relative PBXFileReference dict for ``path``."""
+    name = os.path.basename(path)
+    obj = {
+        'isa': 'PBXFileReference',
+        'includeInIndex': '1',
+        'lastKnownFileType': FILE_TYPES.get(os.path.splitext(name)[1], 'text'),
+    }
+    if name != path:
+        obj['name'] = name
+    obj['path'] = path
+    obj['sourceTree'] = '<group>'
+    return obj
+
+
+def resolve_group(project, group):
+    """Accept a group UUID, name or path and return its UUID."""
+    if group is None:
+        return project.main_group
+    if project.isa(group) in ('PBXGroup', 'PBXVariantGroup'):
+        return group
+    uuid = project.find_group(group)
+    if uuid is None:
+        raise KeyError(f"Could not find group {group!r}")
+    return uuid
+
+
+def add_files(project, paths, group=None, target=None, ids=None):
+    """
+    Add every path in ``paths`` to ``group`` and to ``target``'s build phases.
+
+    Paths are relative to the group. A file the group already lists at the
+    same path keeps its reference and only gains a build file if the
+    target's phase does not build it yet. Returns a list of
+    ``(path, file_ref_id, build_file_id)`` for the files that were added to
+    the group or the target; ``build_file_id`` is None for non-built files.
+    ``ids`` is the ``IdAllocator`` to draw from (one per project by default).
+    """
+    if ids is None:
+        ids = IdAllocator(project)
+    group_id = resolve_group(project, group)
+    target_id = project.target(target)
+    # Group-relative paths already listed; the same name in another
+    # subdirectory is a different file
+    existing = {}
+    for child in project[group_id].get('children', ()):
+        obj = project.get(child)
+        if obj is not None and obj.get('sourceTree', '<group>') == '<group>':
+            existing.setdefault(obj.get('path'), child)
+
+    phases = {}
+    built = {}               # phase UUID -> file references planned this run
+    listed = {}              # phase UUID -> file references it already builds
+    planned_refs = []
+    planned_builds = {}
+    added = []
+
+    # Plan every object first ...
+    for path in paths:
+        name = os.path.basename(path)
+        file_ref_id = existing.get(path)
+        if file_ref_id is None:
+            file_ref_id = ids.existing('PBXFileReference', group_id, path)
+        is_new = file_ref_id is None
+        if is_new:
+            file_ref_id = ids('PBXFileReference', group_id, path)
+            existing[path] = file_ref_id
+            planned_refs.append((file_ref_id, file_reference(path), name))
+
+        build_file_id = None
+        phase_isa = phase_isa_for(path)
+        if phase_isa is not None:
+            if phase_isa not in phases:
+                phases[phase_isa] = project.build_phase(target_id, phase_isa)
+            phase_id = phases[phase_isa]
+            # A new reference cannot be in a phase yet; only files the group
+            # already had need the phase's list, so new batches never read it
+            if phase_id is not None and (is_new or (
+                    file_ref_id not in built.setdefault(phase_id, set())
+                    and file_ref_id not in _listed_in(project, phase_id, listed))):
+                built.setdefault(phase_id, set()).add(file_ref_id)
+                build_file_id = ids('PBXBuildFile', phase_id, file_ref_id)
+                planned_builds.setdefault(phase_id, []).append(
+                    (build_file_id, file_ref_id, f"{name} in {project.phase_name(phase_id)}"))
+        if is_new or build_file_id is not None:
+            added.append((path, file_ref_id, build_file_id))
+
+    # ... then merge them into the sections, the group and the phases in one pass
+    refs = {}
+    for file_ref_id, obj, name in planned_refs:
+        refs[file_ref_id] = project.add(file_ref_id, obj, name)
+    if refs:
+        project.edit(group_id).setdefault('children', []).extend(refs.values())
+
+    for phase_id, builds in planned_builds.items():
+        files = project.edit(phase_id).setdefault('files', [])
+        for build_file_id, file_ref_id, comment in builds:
+            files.append(project.add(build_file_id, {
+                'isa': 'PBXBuildFile',
+                'fileRef': project.ref(file_ref_id),
+            }, comment))
+
+    return added
+
+
+def _listed_in(project, phase_id, listed):
+    """File references ``phase_id`` already builds, read once per phase."""
+    if phase_id not in listed:
+        # Whoever created the build files, Xcode or us
+        listed[phase_id] = {project.get(build_file, {}).get('fileRef')
+                            for build_file in project[phase_id].get('files', ())}
+    return listed[phase_id]
+
+
+def add_paths(project, paths, target=None, ids=None):
+    """
+    Add files given by their path relative to the project directory.
+
+    The group for each directory is found or created through one
+    ``GroupTree``, then each group's files go in as a single ``add_files``
+    batch. Returns ``(path, file_ref_id, build_file_id)`` like ``add_files``.
+    """
+    if ids is None:
+        ids = IdAllocator(project)
+    tree = GroupTree(project, ids)
+    batches = {}
+    for path in paths:
+        directory, name = posixpath.split(path)
+        batches.setdefault(tree.ensure(directory), {})[name] = path
+    added = []
+    for group_id, by_name in batches.items():
+        for name, file_ref_id, build_file_id in add_files(project, list(by_name), group=group_id,
+                                                          target=target, ids=ids):
+            added.append((by_name[name], file_ref_id, build_file_id))
+    return added
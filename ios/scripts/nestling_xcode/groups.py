@@ -0,0 +1,118 @@
+"""
+The PBXGroup hierarchy as a trie of directory components.
+
+``GroupTree`` indexes every group that has a ``path`` of its own by the
+directory it resolves to, one trie node per path component. Looking up or
+creating the group for ``Features/Feed/Views/Cells`` walks four nodes; a
+missing component becomes a new PBXGroup appended to its parent's
+``children``, and every later path under it reuses that node. Inserting
+many paths therefore costs one dict lookup per path component in total,
+however deep or repetitive the folders are.
+"""
+
+import posixpath
+
+from .ids import IdAllocator
+from .project import GROUP_ISAS
+
+
+class _Node:
+    __slots__ = ('uuid', 'children')
+
+    def __init__(self, uuid=None):
+        self.uuid = uuid
+        self.children = {}
+
+
+class GroupTree:
+    """Directory -> PBXGroup trie over a project's group hierarchy.
+
+    Only groups with a ``path`` (and the main group, at ``''``) are indexed;
+    name-only groups share their parent's directory. ``paths`` is the result
+    of ``project.resolved_paths()`` when the caller already has it.
+    """
+
+    def __init__(self, project, ids=None, paths=None):
+        self.project = project
+        self.ids = ids if ids is not None else IdAllocator(project)
+        self.root = _Node(project.main_group)
+        self.directories = {project.main_group: ''}
+        self.created = []
+        if paths is None:
+            paths = project.resolved_paths()
+        for isa in GROUP_ISAS:
+            for uuid, obj in project.iter_section(isa):
+                if 'path' in obj and uuid in paths:
+                    node = self._walk(paths[uuid], create=True)
+                    if node.uuid is None:
+                        node.uuid = uuid
+                        self.directories[uuid] = paths[uuid]
+
+    def _walk(self, directory, create=False):
+        node = self.root
+        for component in _components(directory):
+            child = node.children.get(component)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[component] = _Node()
+            node = child
+        return node
+
+    def find(self, directory):
+        """Return the group for ``directory``, or None if there is none yet."""
+        node = self._walk(directory)
+        return node.uuid if node is not None else None
+
+    def ensure(self, directory):
+        """Return the group for ``directory``, creating each missing group on the way down."""
+        node = self.root
+        parent = node.uuid
+        walked = []
+        for component in _components(directory):
+            walked.append(component)
+            child = node.children.get(component)
+            if child is None:
+                child = node.children[component] = _Node()
+            if child.uuid is None:
+                child.uuid = self._add_group(parent, component)
+                path = '/'.join(walked)
+                self.directories[child.uuid] = path
+                self.created.append(path)
+            node = child
+            parent = node.uuid
+        return node.uuid
+
+    def ensure_all(self, directories):
+        """Map each of ``directories`` to its group, creating what is missing."""
+        return {directory: self.ensure(directory) for directory in directories}
+
+    def discard(self, uuid):
+        """Forget a group that was removed from the project (and everything below it)."""
+        directory = self.directories.pop(uuid, None)
+        if not directory:
+            return
+        parent_path, name = posixpath.split(directory)
+        parent = self._walk(parent_path)
+        if parent is not None:
+            node = parent.children.pop(name, None)
+            stack = [node] if node is not None else []
+            while stack:
+                node = stack.pop()
+                self.directories.pop(node.uuid, None)
+                stack.extend(node.children.values())
+
+    def _add_group(self, parent, name):
+        project = self.project
+        uuid = project.add(self.ids('PBXGroup', parent, name), {
+            'isa': 'PBXGroup',
+            'children': [],
+            'path': name,
+            'sourceTree': '<group>',
+        }, name)
+        project.edit(parent).setdefault('children', []).append(uuid)
+        return uuid
+
+
+def _components(directory):
+    return [component for component in directory.split('/') if component and component != '.']
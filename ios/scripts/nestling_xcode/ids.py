@@ -0,0 +1,51 @@
+"""
+Deterministic, content-addressed object IDs.
+
+An object's ID is a hash of what identifies it -- its isa plus the owning
+target, phase or group and its path or name -- so running a script twice
+produces the same IDs and the second run can tell in O(1) that an object is
+already there. ``IdAllocator`` backs this with a set of IDs already issued
+so that a collision with an unrelated object is resolved by re-hashing with
+a salt instead of silently sharing an ID.
+"""
+
+import hashlib
+
+
+def object_id(isa, *parts, salt=0):
+    """Return the 24-digit uppercase hex ID for ``isa`` identified by ``parts``."""
+    key = '\0'.join((isa,) + tuple(str(part) for part in parts))
+    if salt:
+        key += f'\0{salt}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:24].upper()
+
+
+class IdAllocator:
+    """Issue ``object_id()`` values that are unique within a project.
+
+    ``existing()`` answers "was this object added before?" with one dict
+    lookup; calling the allocator returns the ID to use for a new object.
+    """
+
+    def __init__(self, project=None):
+        self.project = project
+        self.issued = set()
+
+    def _taken(self, uuid):
+        return uuid in self.issued or (self.project is not None and uuid in self.project)
+
+    def existing(self, isa, *parts):
+        """Return the ID if the project already holds this object, else None."""
+        uuid = object_id(isa, *parts)
+        if self.project is not None and self.project.isa(uuid) == isa:
+            return uuid
+        return None
+
+    def __call__(self, isa, *parts):
+        salt = 0
+        uuid = object_id(isa, *parts)
+        while self._taken(uuid):
+            salt += 1
+            uuid = object_id(isa, *parts, salt=salt)
+        self.issued.add(uuid)
+        return uuid
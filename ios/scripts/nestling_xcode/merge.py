@@ -0,0 +1,186 @@
+"""
+Three-way merge of project.pbxproj on the object graph.
+
+Base, ours and theirs are parsed, and every object is merged by UUID:
+an object only one side touched takes that side's version, and an object
+both sides changed is merged key by key. Lists -- ``children``, ``files``,
+``packageProductDependencies``, ``buildPhases`` and the rest -- are merged
+per member, so two branches that each add files to the same group or
+phase both keep their additions, in ours' order with theirs' new members
+placed after the member they followed. Only a key both sides changed to
+different values (or an object one side deleted while the other edited
+it) is a conflict. Each step is a dict or set lookup, so the whole merge
+is linear in the size of the three files.
+
+The result is rendered onto ours' text, so untouched objects keep their
+exact bytes. A conflicting object is written once per side between the
+usual ``<<<<<<<`` / ``=======`` / ``>>>>>>>`` markers.
+"""
+
+import re
+from collections import namedtuple
+
+from .parser import parse
+from .project import PBXProject
+from .serializer import object_text, quote
+
+Conflict = namedtuple('Conflict', 'uuid key base ours theirs')
+
+_MISSING = object()
+
+
+def merge_values(base, ours, theirs, conflicts, uuid, key=''):
+    """Merge one value three ways. Returns the merged value (ours on conflict)."""
+    if ours == theirs:
+        return ours
+    if ours == base:
+        return theirs
+    if theirs == base:
+        return ours
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        return merge_dicts(base if isinstance(base, dict) else {}, ours, theirs, conflicts, uuid, key)
+    if isinstance(ours, list) and isinstance(theirs, list):
+        merged = merge_lists(base if isinstance(base, list) else [], ours, theirs)
+        if merged is not None:
+            return merged
+    conflicts.append(Conflict(uuid, key, base, ours, theirs))
+    return ours
+
+
+def merge_dicts(base, ours, theirs, conflicts, uuid, key=''):
+    merged = {}
+    for name in list(ours) + [name for name in theirs if name not in ours]:
+        b = base.get(name, _MISSING)
+        o = ours.get(name, _MISSING)
+        t = theirs.get(name, _MISSING)
+        value = merge_values(b, o, t, conflicts, uuid, f'{key}.{name}' if key else name)
+        if value is not _MISSING:
+            merged[name] = value
+    return merged
+
+
+def merge_lists(base, ours, theirs):
+    """Merge list members: ours' order, minus what either side removed, plus theirs' additions.
+
+    Returns None for lists whose members cannot be hashed.
+    """
+    try:
+        base_set, ours_set, theirs_set = set(base), set(ours), set(theirs)
+    except TypeError:
+        return None
+    removed = base_set - theirs_set
+    kept = [item for item in ours if item not in removed]
+    kept_set = set(kept)
+    # Theirs' new members go right after the member they follow in theirs
+    following = {}
+    anchor = None
+    for item in theirs:
+        if item not in base_set and item not in ours_set:
+            following.setdefault(anchor, []).append(item)
+            kept_set.add(item)
+        if item in kept_set:
+            anchor = item
+    merged = list(following.get(None, ()))
+    for item in kept:
+        merged.append(item)
+        merged.extend(following.get(item, ()))
+    return merged
+
+
+def merge(base_text, ours_text, theirs_text, path=None):
+    """Return ``(text, conflicts)`` for a three-way merge of project.pbxproj texts."""
+    project = PBXProject.parse(ours_text, path)
+    base = parse(base_text)
+    theirs = parse(theirs_text)
+    base_objects = base['objects']
+    theirs_objects = theirs['objects']
+    conflicts = []
+    # Objects that end up in conflict, with each side's version for the markers
+    marked = {}
+
+    for uuid in list(theirs_objects) + [uuid for uuid in base_objects if uuid not in theirs_objects]:
+        b = base_objects.get(uuid)
+        t = theirs_objects.get(uuid)
+        if t == b:
+            continue
+        o = project.get(uuid)
+        if o == t:
+            continue
+        if o == b:
+            _apply(project, uuid, t)
+        elif t is None or o is None:
+            # Deleted on one side and edited on the other: keep the edit, flag it
+            conflicts.append(Conflict(uuid, '', b, o, t))
+            if o is None:
+                _apply(project, uuid, t)
+            else:
+                project.edit(uuid)
+            marked[uuid] = (o, t)
+        else:
+            found = []
+            merged = merge_dicts(b or {}, o, t, found, uuid)
+            if merged != o:
+                _apply(project, uuid, merged)
+            if found:
+                conflicts.extend(found)
+                project.edit(uuid)
+                marked[uuid] = (o, t)
+
+    # Top-level keys (objectVersion after an Xcode upgrade, ...)
+    root_changes = {}
+    for key in theirs:
+        if key == 'objects':
+            continue
+        value = merge_values(base.get(key, _MISSING), project.data.get(key, _MISSING), theirs[key],
+                             conflicts, '', key)
+        if value != project.data.get(key, _MISSING):
+            root_changes[key] = value
+
+    text = project.dumps()
+    for key, value in root_changes.items():
+        project.data[key] = value
+        if isinstance(value, str):
+            text, count = re.subn(rf'^\t{re.escape(quote(key))} = [^\n]*;$',
+                                  lambda m: f'\t{quote(key)} = {quote(value)};', text, count=1, flags=re.M)
+        if not isinstance(value, str) or not count:
+            text = project.dumps(full=True)
+    for uuid, (o, t) in marked.items():
+        text = _mark(text, project, uuid, o, t)
+    return text, conflicts
+
+
+def _apply(project, uuid, obj):
+    """Make ``uuid`` hold ``obj`` (None removes it)."""
+    if obj is None:
+        if uuid in project:
+            project.remove(uuid)
+    elif uuid in project:
+        current = project.edit(uuid)
+        current.clear()
+        current.update(obj)
+    else:
+        # Keys parsed from theirs carry their comment
+        project.add(str(uuid), dict(obj), getattr(uuid, 'comment', None))
+
+
+def _mark(text, project, uuid, ours, theirs):
+    ref = project.ref(uuid)
+    current = object_text(ref, project[uuid]) if uuid in project else ''
+    ours_text = object_text(ref, ours) if ours is not None else ''
+    theirs_text = object_text(ref, theirs) if theirs is not None else ''
+    block = f'<<<<<<< ours\n{ours_text}=======\n{theirs_text}>>>>>>> theirs\n'
+    if current and current in text:
+        return text.replace(current, block, 1)
+    return text
+
+
+def format_conflict(conflict):
+    where = f"{conflict.uuid} {conflict.key}".strip()
+    return f"{where}: ours {_short(conflict.ours)} / theirs {_short(conflict.theirs)}"
+
+
+def _short(value):
+    if value is None or value is _MISSING:
+        return '(deleted)'
+    text = repr(value)
+    return text if len(text) <= 60 else text[:57] + '...'
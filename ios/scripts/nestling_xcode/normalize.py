@@ -0,0 +1,111 @@
+"""
+Canonical object order for project.pbxproj.
+
+Xcode writes each section's objects sorted by UUID and each dictionary's
+keys sorted with ``isa`` first; scripts that splice objects in wherever a
+regex matched (or append new keys at the end) drift away from that, and
+every later diff pays for it. ``normalize`` restores Xcode's order and
+additionally sorts group children by name, so two runs that add the same
+files produce the same bytes. The whole file is then regenerated by the
+serializer in Xcode's layout, which also repairs hand-edited indentation.
+
+One pass over the objects plus the sorts; a second run changes nothing.
+"""
+
+from collections import namedtuple
+
+from .project import GROUP_ISAS, PBXProject
+
+NormalizeResult = namedtuple('NormalizeResult', 'sections objects groups')
+
+
+def _key_order(key):
+    return (key != 'isa', key)
+
+
+def sort_keys(value):
+    """Return ``value`` with every nested dict's keys in Xcode order; None if already sorted."""
+    changed = False
+    if isinstance(value, dict):
+        items = {}
+        for key, item in value.items():
+            sorted_item = sort_keys(item)
+            if sorted_item is not None:
+                item = sorted_item
+                changed = True
+            items[key] = item
+        keys = sorted(items, key=_key_order)
+        if changed or keys != list(items):
+            return {key: items[key] for key in keys}
+    elif isinstance(value, list):
+        items = []
+        for item in value:
+            sorted_item = sort_keys(item)
+            if sorted_item is not None:
+                item = sorted_item
+                changed = True
+            items.append(item)
+        if changed:
+            return items
+    return None
+
+
+def child_order(project):
+    """Sort key for group children: display name, case-insensitively, then UUID."""
+    def key(uuid):
+        name = project.display_name(uuid) or ''
+        return name.casefold(), name, str(uuid)
+    return key
+
+
+def normalize(project, children=True):
+    """Put ``project`` in canonical order in memory. Returns a ``NormalizeResult`` of counts.
+
+    The counts are the sections, objects (keys) and groups (children) that
+    were out of order. Set ``project.rewrite`` to have the next save write
+    the reordered file.
+    """
+    objects = project.objects
+    sections = 0
+    for isa, section in project.sections.items():
+        ordered = sorted(section)
+        if ordered != list(section):
+            project.sections[isa] = dict.fromkeys(ordered)
+            sections += 1
+    if sections:
+        # The object table's order is what a cached or re-parsed graph sees
+        items = [(uuid, objects[uuid]) for isa in sorted(project.sections) for uuid in project.sections[isa]]
+        objects.clear()
+        objects.update(items)
+
+    reordered = 0
+    for uuid, obj in objects.items():
+        ordered = sort_keys(obj)
+        if ordered is not None:
+            obj.clear()
+            obj.update(ordered)
+            reordered += 1
+
+    groups = 0
+    if children:
+        key = child_order(project)
+        main_group = project.main_group
+        for isa in GROUP_ISAS:
+            for uuid, obj in project.iter_section(isa):
+                # The main group's order is the navigator's top level; leave it as laid out
+                members = obj.get('children')
+                if uuid == main_group or not members:
+                    continue
+                ordered = sorted(members, key=key)
+                if ordered != members:
+                    obj['children'] = ordered
+                    groups += 1
+
+    return NormalizeResult(sections, reordered, groups)
+
+
+def normalize_text(text, children=True):
+    """Return the normalized form of project.pbxproj ``text``."""
+    project = PBXProject.parse(text)
+    normalize(project, children)
+    return project.dumps(full=True)
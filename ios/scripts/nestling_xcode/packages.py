@@ -0,0 +1,217 @@
+"""
+Swift Package dependencies, diffed against a manifest.
+
+A manifest is a list of packages::
+
+    {'name': 'Sentry',
+     'url': 'https://github.com/getsentry/sentry-cocoa.git',
+     'version': '8.0.0',                       # or 'requirement': {...}
+     'products': ['Sentry'],
+     'targets': ['Nestling', 'NestlingWidgets']}  # default: the app target
+
+Existing package references, product dependencies and their Frameworks
+build files are indexed in one pass; the manifest is then compared against
+those indexes and only missing or changed objects are added or edited.
+With ``prune``, packages and products the manifest no longer lists are
+removed along with every reference to them.
+
+``PACKAGES`` is the app's manifest, shared by ``nestling-xcode packages``
+and add_packages_python.py.
+"""
+
+from collections import namedtuple
+
+from .ids import IdAllocator
+
+Change = namedtuple('Change', 'action kind description')
+
+# Package definitions; 'targets' lists target names (or product names) to link
+PACKAGES = [
+    {
+        'name': 'Firebase',
+        'url': 'https://github.com/firebase/firebase-ios-sdk.git',
+        'version': '11.0.0',
+        'products': ['FirebaseCore', 'FirebaseAnalytics']
+    },
+    {
+        'name': 'Supabase',
+        'url': 'https://github.com/supabase/supabase-swift.git',
+        'version': '2.0.0',
+        'products': ['Supabase']
+    },
+    {
+        'name': 'Sentry',
+        'url': 'https://github.com/getsentry/sentry-cocoa.git',
+        'version': '8.0.0',
+        'products': ['Sentry']
+    }
+]
+
+
+def normalize_url(url):
+    """Compare repository URLs without case, trailing slashes or ``.git``."""
+    url = url.strip().rstrip('/').lower()
+    return url[:-4] if url.endswith('.git') else url
+
+
+def repository_name(url):
+    name = url.rstrip('/').rsplit('/', 1)[-1]
+    return name[:-4] if name.endswith('.git') else name
+
+
+def requirement_for(package):
+    """The ``requirement`` dict for a manifest entry."""
+    if 'requirement' in package:
+        return dict(package['requirement'])
+    return {'kind': 'upToNextMajorVersion', 'minimumVersion': package['version']}
+
+
+class PackageIndex:
+    """Package references, product dependencies and build files keyed for O(1) lookups."""
+
+    def __init__(self, project):
+        self.refs = {}           # normalized URL -> XCRemoteSwiftPackageReference UUID
+        self.deps = {}           # (target UUID, product name) -> XCSwiftPackageProductDependency UUID
+        self.build_files = {}    # product dependency UUID -> [PBXBuildFile UUID]
+        for uuid, obj in project.iter_section('XCRemoteSwiftPackageReference'):
+            self.refs.setdefault(normalize_url(obj.get('repositoryURL', '')), uuid)
+        for target_id, target in project.targets():
+            for dep_id in target.get('packageProductDependencies', ()):
+                dep = project.get(dep_id)
+                if dep is not None:
+                    self.deps.setdefault((target_id, dep.get('productName')), dep_id)
+        for uuid, obj in project.iter_section('PBXBuildFile'):
+            if 'productRef' in obj:
+                self.build_files.setdefault(obj['productRef'], []).append(uuid)
+
+
+def sync_packages(project, manifest, prune=False, dry_run=False):
+    """Bring the project's packages in line with ``manifest`` in one batch.
+
+    Returns the list of ``Change`` made (or, with ``dry_run``, that would be
+    made). Targets are matched by name or product name.
+    """
+    index = PackageIndex(project)
+    ids = IdAllocator(project)
+    changes = []
+    root_id = project.root_object
+    listed_refs = set(project.project_object.get('packageReferences', ()))
+    wanted_refs = set()
+    wanted_deps = set()
+
+    for package in manifest:
+        url = package['url']
+        name = package.get('name') or repository_name(url)
+        requirement = requirement_for(package)
+        key = normalize_url(url)
+
+        ref_id = index.refs.get(key)
+        created = ref_id is None
+        if created:
+            changes.append(Change('add', 'package', f"{name} ({url}, {_describe(requirement)})"))
+            if not dry_run:
+                ref_id = project.add(ids('XCRemoteSwiftPackageReference', key), {
+                    'isa': 'XCRemoteSwiftPackageReference',
+                    'repositoryURL': url,
+                    'requirement': requirement,
+                }, f'XCRemoteSwiftPackageReference "{repository_name(url)}"')
+                index.refs[key] = ref_id
+        elif project[ref_id].get('requirement') != requirement:
+            changes.append(Change('update', 'package',
+                                  f"{name}: {_describe(project[ref_id].get('requirement', {}))} → {_describe(requirement)}"))
+            if not dry_run:
+                project.edit(ref_id)['requirement'] = requirement
+        if ref_id is not None:
+            wanted_refs.add(ref_id)
+            if ref_id not in listed_refs:
+                if not created:
+                    changes.append(Change('add', 'package', f"{name} to the project's package list"))
+                if not dry_run:
+                    project.edit(root_id).setdefault('packageReferences', []).append(project.ref(ref_id))
+                listed_refs.add(ref_id)
+
+        for target_name in package.get('targets') or [None]:
+            target_id = project.target(target_name)
+            target_label = project[target_id].get('name')
+            for product in package['products']:
+                dep_id = index.deps.get((target_id, product))
+                if dep_id is None:
+                    changes.append(Change('add', 'product', f"{product} to {target_label}"))
+                    if not dry_run:
+                        dep_id = _add_product(project, ids, target_id, ref_id, product)
+                        index.deps[(target_id, product)] = dep_id
+                else:
+                    if ref_id is not None and project[dep_id].get('package') != ref_id:
+                        changes.append(Change('update', 'product',
+                                              f"{product} in {target_label} now comes from {name}"))
+                        if not dry_run:
+                            project.edit(dep_id)['package'] = project.ref(ref_id)
+                    # A dependency Xcode never linked still needs its Frameworks build file
+                    phase_id = project.build_phase(target_id, 'PBXFrameworksBuildPhase')
+                    if phase_id is not None and not index.build_files.get(dep_id):
+                        changes.append(Change('add', 'product', f"{product} to {target_label}'s "
+                                                                f"{project.phase_name(phase_id)} phase"))
+                        if not dry_run:
+                            index.build_files[dep_id] = [_link_product(project, ids, phase_id, dep_id, product)]
+                if dep_id is not None:
+                    wanted_deps.add(dep_id)
+
+    if prune:
+        doomed = set()
+        for (target_id, product), dep_id in index.deps.items():
+            if dep_id not in wanted_deps:
+                changes.append(Change('remove', 'product', f"{product} from {project[target_id].get('name')}"))
+                doomed.add(dep_id)
+                doomed.update(index.build_files.get(dep_id, ()))
+        for key, ref_id in index.refs.items():
+            if ref_id not in wanted_refs:
+                changes.append(Change('remove', 'package', repository_name(project[ref_id].get('repositoryURL', key))))
+                doomed.add(ref_id)
+        # Product dependencies of a removed package go with it, whichever target lists them
+        for uuid, obj in project.iter_section('XCSwiftPackageProductDependency'):
+            if obj.get('package') in doomed and uuid not in doomed:
+                doomed.add(uuid)
+                doomed.update(index.build_files.get(uuid, ()))
+        if doomed and not dry_run:
+            for uuid in doomed:
+                project.remove(uuid)
+            project.remove_references(doomed)
+
+    return changes
+
+
+def _add_product(project, ids, target_id, ref_id, product):
+    dep_id = project.add(ids('XCSwiftPackageProductDependency', target_id, product), {
+        'isa': 'XCSwiftPackageProductDependency',
+        'package': project.ref(ref_id),
+        'productName': product,
+    }, product)
+    project.edit(target_id).setdefault('packageProductDependencies', []).append(dep_id)
+
+    # Link it: Xcode lists package products in the target's Frameworks phase
+    phase_id = project.build_phase(target_id, 'PBXFrameworksBuildPhase')
+    if phase_id is not None:
+        _link_product(project, ids, phase_id, dep_id, product)
+    return dep_id
+
+
+def _link_product(project, ids, phase_id, dep_id, product):
+    build_id = project.add(ids('PBXBuildFile', phase_id, dep_id), {
+        'isa': 'PBXBuildFile',
+        'productRef': project.ref(dep_id),
+    }, f"{product} in {project.phase_name(phase_id)}")
+    project.edit(phase_id).setdefault('files', []).append(build_id)
+    return build_id
+
+
+def _describe(requirement):
+    kind = requirement.get('kind', '?')
+    version = requirement.get('minimumVersion') or requirement.get('version') or requirement.get('branch') \
+        or requirement.get('revision') or ''
+    return f"{kind} {version}".strip()
+
+
+def format_report(changes):
+    """Human-readable lines describing each change."""
+    symbols = {'add': '+', 'update': '~', 'remove': '-'}
+    return [f"{symbols[change.action]} {change.kind:<8} {change.description}" for change in changes]
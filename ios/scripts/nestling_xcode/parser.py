@@ -0,0 +1,377 @@
+"""
+Tokenizer and parser for the OpenStep-style plist used by project.pbxproj.
+
+The whole file is scanned once with a single compiled regex and turned into
+plain Python containers (dict / list / str). Comments that Xcode writes next
+to object IDs (``ABC123 /* HomeView.swift */``) are kept on the string itself
+via ``Annotated`` so the file can be written back without losing them.
+"""
+
+import re
+
+
+class PBXParseError(ValueError):
+    """Raised when project.pbxproj is not a well-formed OpenStep plist."""
+
+    def __init__(self, message, text=None, pos=None):
+        self.line, self.column = line_col(text, pos) if text is not None and pos is not None else (None, None)
+        if self.line is not None:
+            message = f"{message} (line {self.line}, column {self.column})"
+        super().__init__(message)
+
+
+class Annotated(str):
+    """A string value that carries the ``/* ... */`` comment that followed it."""
+
+    def __new__(cls, value, comment):
+        self = super().__new__(cls, value)
+        self.comment = comment
+        return self
+
+    def __reduce__(self):
+        return (Annotated, (str(self), self.comment))
+
+
+# One alternative per token kind. Leading whitespace is consumed by the same
+# match so every token costs exactly one regex step.
+TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<comment>/\*.*?\*/|//[^\n]*)
+      | "(?P<quoted>(?:[^"\\]|\\.)*)"
+      | (?P<bare>(?:[^\s{}()=;,"/]+|/(?![*/]))+)
+      | (?P<punct>[{}()=;,])
+      | (?P<error>\S)
+    )
+''', re.S | re.X)
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\', "'": "'"}
+_ESCAPE_RE = re.compile(r'\\(.)', re.S)
+
+
+def unescape(value):
+    """Decode backslash escapes inside a quoted string."""
+    if '\\' not in value:
+        return value
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def line_col(text, pos):
+    """Return the 1-based (line, column) of a character offset."""
+    line_start = text.rfind('\n', 0, pos) + 1
+    return text.count('\n', 0, pos) + 1, pos - line_start + 1
+
+
+def tokenize(text):
+    """Yield ``(kind, value, pos)`` tuples for every token in ``text``."""
+    for m in TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind is None:
+            continue
+        value = m.group(kind)
+        if kind == 'quoted':
+            value = unescape(value)
+        yield kind, value, m.start(kind)
+
+
+class SourceMap:
+    """Byte ranges of the objects and sections in the parsed text.
+
+    ``objects`` maps each UUID to the ``(start, end)`` of its definition,
+    whole lines included, and ``sections`` maps each isa to the range from
+    its ``/* Begin */`` marker to the end of its ``/* End */`` marker line.
+    ``objects_end`` is where the closing ``};`` of ``objects`` starts.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.sections = {}
+        self.objects_end = None
+
+
+def _line_start(text, pos):
+    start = text.rfind('\n', 0, pos) + 1
+    return start if text[start:pos].isspace() or start == pos else pos
+
+
+def _line_end(text, pos):
+    end = text.find('\n', pos)
+    if end == -1:
+        return len(text)
+    return end + 1 if end == pos or text[pos:end].isspace() else pos
+
+
+# Parser states
+_KEY, _EQ, _VALUE, _SEMI, _ITEM, _COMMA = range(6)
+
+
+def parse(text, source_map=None):
+    """Parse a project.pbxproj document and return its top-level dict.
+
+    When ``source_map`` is given it is filled with the position of every
+    object and section so unchanged parts can later be copied verbatim.
+    """
+    root = None
+    stack = []           # open containers; dicts hold pending key in keys[]
+    keys = []            # pending key per open container (None for lists)
+    state = _VALUE
+    last = None          # (container, key) of the last string, for comments
+    object_start = None
+
+    for m in TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind is None:
+            continue
+
+        if kind == 'comment':
+            if source_map is not None and len(stack) == 2 and keys[0] == 'objects':
+                _record_marker(source_map, text, m.group(kind), m.start(kind))
+            if last is not None:
+                container, slot = last
+                if container is None:
+                    keys[-1] = Annotated(keys[-1], m.group(kind)[2:-2].strip())
+                else:
+                    container[slot] = Annotated(container[slot], m.group(kind)[2:-2].strip())
+                last = None
+            continue
+
+        if kind == 'quoted' or kind == 'bare':
+            value = m.group(kind)
+            if kind == 'quoted':
+                value = unescape(value)
+            if state == _KEY:
+                keys[-1] = value
+                last = (None, None)
+                if source_map is not None and len(stack) == 2 and keys[0] == 'objects':
+                    object_start = _line_start(text, m.start(kind))
+                state = _EQ
+            elif state == _VALUE:
+                if not stack:
+                    raise PBXParseError("Top-level value must be a dictionary", text, m.start(kind))
+                container = stack[-1]
+                container[keys[-1]] = value
+                last = (container, keys[-1])
+                state = _SEMI
+            elif state == _ITEM:
+                container = stack[-1]
+                container.append(value)
+                last = (container, len(container) - 1)
+                state = _COMMA
+            else:
+                raise PBXParseError(f"Unexpected string {value!r}", text, m.start(kind))
+            continue
+
+        if kind == 'error':
+            raise PBXParseError(f"Unexpected character {m.group(kind)!r}", text, m.start(kind))
+
+        last = None
+        char = m.group(kind)
+        pos = m.start(kind)
+
+        if char == '=':
+            if state != _EQ:
+                raise PBXParseError("Unexpected '='", text, pos)
+            state = _VALUE
+        elif char == ';':
+            if state != _SEMI:
+                raise PBXParseError("Unexpected ';'", text, pos)
+            if object_start is not None and len(stack) == 2:
+                source_map.objects[keys[-1]] = (object_start, _line_end(text, pos + 1))
+                object_start = None
+            state = _KEY
+        elif char == ',':
+            if state != _COMMA:
+                raise PBXParseError("Unexpected ','", text, pos)
+            state = _ITEM
+        elif char == '{' or char == '(':
+            if state not in (_VALUE, _ITEM):
+                raise PBXParseError(f"Unexpected {char!r}", text, pos)
+            new = {} if char == '{' else []
+            if not stack:
+                if root is not None:
+                    raise PBXParseError("Trailing data after top-level dictionary", text, pos)
+                root = new
+            elif state == _ITEM:
+                stack[-1].append(new)
+            else:
+                stack[-1][keys[-1]] = new
+            stack.append(new)
+            keys.append(None)
+            state = _KEY if char == '{' else _ITEM
+        elif char == '}':
+            if state != _KEY or not isinstance(stack[-1], dict):
+                raise PBXParseError("Unexpected '}'", text, pos)
+            if source_map is not None and len(stack) == 2 and keys[0] == 'objects':
+                source_map.objects_end = _line_start(text, pos)
+            stack.pop()
+            keys.pop()
+            state = _after_value(stack)
+        elif char == ')':
+            if state not in (_ITEM, _COMMA) or not isinstance(stack[-1], list):
+                raise PBXParseError("Unexpected ')'", text, pos)
+            stack.pop()
+            keys.pop()
+            state = _after_value(stack)
+
+    if root is None:
+        raise PBXParseError("Empty project file")
+    if stack:
+        raise PBXParseError("Unexpected end of file", text, len(text))
+    return root
+
+
+def reparse(old_text, data, source_map, text):
+    """Parse ``text`` again, reusing ``data`` and ``source_map`` parsed from ``old_text``.
+
+    Sections whose text did not change are carried over with their positions
+    shifted; in the others only the objects on lines that differ are parsed.
+    Returns ``(data, source_map)`` for ``text``, or None when something
+    outside the sections changed, a section was added or removed, or a
+    changed run of lines does not parse on its own -- the caller then parses
+    ``text`` in full.
+    """
+    sections = sorted((start, end, isa) for isa, (start, end) in source_map.sections.items())
+    if not sections or any(start is None or end is None for start, end, _ in sections):
+        return None
+
+    # Find the same sections, in the same order, with the same text between them
+    located = []
+    old_cursor = cursor = 0
+    for start, end, isa in sections:
+        begin = text.find(f'/* Begin {isa} section */', cursor)
+        marker = f'/* End {isa} section */'
+        close = text.find(marker, begin)
+        if begin == -1 or close == -1:
+            return None
+        new_start, new_end = _line_start(text, begin), _line_end(text, close + len(marker))
+        if old_text[old_cursor:start] != text[cursor:new_start]:
+            return None
+        located.append((start, end, new_start, new_end, isa))
+        old_cursor, cursor = end, new_end
+    if old_text[old_cursor:] != text[cursor:]:
+        return None
+
+    by_section = {}
+    for uuid, obj in data['objects'].items():
+        by_section.setdefault(obj['isa'], []).append(uuid)
+    objects = {}
+    result = SourceMap()
+    for start, end, new_start, new_end, isa in located:
+        uuids = by_section.pop(isa, [])
+        if any(uuid not in source_map.objects or uuid in objects for uuid in uuids):
+            return None     # unknown position, or a duplicate of a reparsed object
+        if old_text[start:end] == text[new_start:new_end]:
+            for uuid in uuids:
+                object_start, object_end = source_map.objects[uuid]
+                objects[uuid] = data['objects'][uuid]
+                result.objects[uuid] = (object_start - start + new_start, object_end - start + new_start)
+        elif not _reparse_section(old_text, (start, end), text, (new_start, new_end),
+                                  uuids, data['objects'], source_map, objects, result):
+            return None
+        result.sections[isa] = (new_start, new_end)
+    if by_section:
+        return None     # objects outside the section of their isa
+    result.objects_end = source_map.objects_end + len(text) - len(old_text)
+    data = dict(data)
+    data['objects'] = objects
+    return data, result
+
+
+def _reparse_section(old_text, old_range, text, new_range, uuids, old_objects, source_map, objects, result):
+    """Add one changed section's objects to ``objects`` and ``result``; False if it must be parsed in full."""
+    start, end = old_range
+    new_start, new_end = new_range
+    old_body, body = old_text[start:end], text[new_start:new_end]
+    prefix = _common_prefix(old_body, body)
+    suffix = _common_suffix(old_body, body, min(len(old_body), len(body)) - prefix)
+
+    # Whole lines, then whole objects, around the change (in old positions)
+    first = start + old_body.rfind('\n', 0, prefix) + 1
+    last = end - suffix
+    if old_text[last - 1] != '\n':
+        last = old_text.find('\n', last) + 1 or len(old_text)
+    for uuid in uuids:
+        object_start, object_end = source_map.objects[uuid]
+        if object_start < last and object_end > first:
+            first = min(first, object_start)
+            last = max(last, object_end)
+
+    shift = new_start - start
+    tail_shift = shift + len(body) - len(old_body)
+    fragment = text[first + shift:last + tail_shift]
+    if 'section */' in old_text[first:last] or 'section */' in fragment:
+        return False
+    wrapper = '{objects = {\n'
+    fragment_map = SourceMap()
+    try:
+        fragment_objects = parse(wrapper + fragment + '};}', fragment_map)['objects']
+    except PBXParseError:
+        return False
+
+    positions = result.objects
+    inserted = False
+    for uuid in uuids:
+        object_start, object_end = source_map.objects[uuid]
+        if object_end <= first:
+            objects[uuid] = old_objects[uuid]
+            positions[uuid] = (object_start + shift, object_end + shift)
+        elif object_start >= last:
+            if not inserted:
+                inserted = _insert_fragment(objects, positions, fragment_objects, fragment_map,
+                                            first + shift - len(wrapper))
+                if not inserted:
+                    return False
+            objects[uuid] = old_objects[uuid]
+            positions[uuid] = (object_start + tail_shift, object_end + tail_shift)
+    return inserted or _insert_fragment(objects, positions, fragment_objects, fragment_map,
+                                        first + shift - len(wrapper))
+
+
+def _insert_fragment(objects, positions, fragment_objects, fragment_map, offset):
+    for uuid, obj in fragment_objects.items():
+        if uuid in objects:
+            return False    # a duplicate; let the full parse decide which one wins
+        object_start, object_end = fragment_map.objects[uuid]
+        objects[uuid] = obj
+        positions[uuid] = (object_start + offset, object_end + offset)
+    return True
+
+
+def _common_prefix(a, b):
+    # Binary search over slice comparisons, which run in C
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix(a, b, limit):
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len(a) - mid:len(a) - low] == b[len(b) - mid:len(b) - low]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _record_marker(source_map, text, comment, pos):
+    words = comment[2:-2].split()
+    if len(words) != 3 or words[2] != 'section' or words[0] not in ('Begin', 'End'):
+        return
+    start, end = source_map.sections.get(words[1], (None, None))
+    if words[0] == 'Begin':
+        start = _line_start(text, pos)
+    else:
+        end = _line_end(text, pos + len(comment))
+    source_map.sections[words[1]] = (start, end)
+
+
+def _after_value(stack):
+    if not stack:
+        return None
+    return _SEMI if isinstance(stack[-1], dict) else _COMMA
@@ -0,0 +1,380 @@
+"""
+In-memory object graph for an Xcode project.
+
+``PBXProject`` parses project.pbxproj once into an object table keyed by
+UUID plus one index per ``isa`` so that lookups, inserts and removals are
+dictionary operations instead of whole-file regex scans.
+"""
+
+import difflib
+import os
+import posixpath
+
+from . import cache
+from .parser import Annotated, SourceMap, parse, reparse
+from .serializer import annotate, dumps, render, unified_diff
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IOS_DIR = os.path.dirname(SCRIPTS_DIR)
+DEFAULT_PROJECT_PATH = os.path.join(IOS_DIR, 'Nuzzle', 'Nestling.xcodeproj', 'project.pbxproj')
+
+BUILD_PHASE_ISAS = (
+    'PBXSourcesBuildPhase',
+    'PBXFrameworksBuildPhase',
+    'PBXResourcesBuildPhase',
+    'PBXCopyFilesBuildPhase',
+    'PBXShellScriptBuildPhase',
+    'PBXHeadersBuildPhase',
+)
+
+GROUP_ISAS = ('PBXGroup', 'PBXVariantGroup', 'XCVersionGroup')
+
+
+class PBXProject:
+    """Parsed project.pbxproj with UUID and per-isa indexes.
+
+    When built from text, the original text and a ``SourceMap`` are kept so
+    that ``dumps()`` only re-emits objects that were added, removed or passed
+    through ``edit()``; everything else is copied byte for byte.
+    """
+
+    def __init__(self, data, path=None, text=None, source_map=None):
+        self.data = data
+        self.path = path
+        self.text = text
+        self.source_map = source_map
+        self.added = {}
+        self.removed = {}
+        self.dirty = set()
+        self.rewrite = False
+        self.objects = data['objects']
+        self.sections = {}
+        self.comments = {}
+        for uuid, obj in self.objects.items():
+            self.sections.setdefault(obj['isa'], {})[uuid] = None
+            if isinstance(uuid, Annotated):
+                self.comments[uuid] = uuid.comment
+
+    @classmethod
+    def parse(cls, text, path=None):
+        source_map = SourceMap()
+        return cls(parse(text, source_map), path, text, source_map)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PROJECT_PATH, use_cache=True):
+        """Load a project, reusing the parsed graph cached next to it when the file is unchanged."""
+        if not use_cache:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.parse(f.read(), path)
+        text, data, source_map = cache.read(path)
+        if data is None:
+            source_map = SourceMap()
+            data = parse(text, source_map)
+            cache.write(path, text, data, source_map)
+        return cls(data, path, text, source_map)
+
+    def reload(self):
+        """Re-read the project file after someone else changed it; returns a new project.
+
+        When this project is unmodified and its positions are known, only the
+        objects on lines that changed are parsed again. Anything else goes
+        through ``load`` (the parse cache, then a full parse).
+        """
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        if text == self.text and not self.modified:
+            return self
+        if self.text is not None and self.source_map is not None and not self.modified:
+            result = reparse(self.text, self.data, self.source_map, text)
+            if result is not None:
+                data, source_map = result
+                cache.write(self.path, text, data, source_map)
+                return type(self)(data, self.path, text, source_map)
+        return type(self).load(self.path)
+
+    @property
+    def modified(self):
+        return bool(self.added or self.removed or self.dirty or self.rewrite)
+
+    def dumps(self, full=False):
+        """Serialize the project, copying untouched byte ranges from the source text.
+
+        With ``full`` (or after ``rewrite`` was set, e.g. by normalize) every
+        object is written out again in the order of its section.
+        """
+        if full or self.rewrite or self.text is None:
+            return dumps(self)
+        self._ensure_source_map()
+        return render(self)[0]
+
+    def diff(self):
+        """Unified diff of only the lines this session touched."""
+        if self.text is None:
+            raise ValueError("Project was not parsed from text; nothing to diff against")
+        if self.rewrite:
+            path = (self.path or 'project.pbxproj').lstrip('/')
+            lines = difflib.unified_diff(self.text.splitlines(True), self.dumps().splitlines(True),
+                                         f'a/{path}', f'b/{path}', n=0)
+            return ''.join(lines)
+        self._ensure_source_map()
+        return unified_diff(self.text, render(self)[1], self.path or 'project.pbxproj')
+
+    def save(self, path=None, dry_run=False):
+        """Write the project if it changed. With ``dry_run``, print the diff instead.
+
+        Returns True when there were changes to write.
+        """
+        path = path or self.path
+        if not self.modified and path == self.path and self.text is not None:
+            return False
+        if dry_run:
+            print(self.diff(), end='')
+            return True
+        text = self.dumps()
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        if path == self.path:
+            self.reset(text)
+            # The graph now matches the file; positions are rebuilt on demand
+            cache.write(path, text, self.data)
+        return True
+
+    def reset(self, text):
+        """Make ``text`` the new baseline after it has been written out."""
+        self.text = text
+        self.source_map = None
+        self.added.clear()
+        self.removed.clear()
+        self.dirty.clear()
+        self.rewrite = False
+
+    def _ensure_source_map(self):
+        # Positions are only needed for the next incremental write
+        if self.source_map is None:
+            self.source_map = SourceMap()
+            parse(self.text, self.source_map)
+
+    # -- object table -----------------------------------------------------
+
+    def __contains__(self, uuid):
+        return uuid in self.objects
+
+    def __getitem__(self, uuid):
+        return self.objects[uuid]
+
+    def get(self, uuid, default=None):
+        return self.objects.get(uuid, default)
+
+    def isa(self, uuid):
+        obj = self.objects.get(uuid)
+        return obj['isa'] if obj is not None else None
+
+    def iter_section(self, isa):
+        """Yield ``(uuid, obj)`` for every object of the given isa, in file order."""
+        objects = self.objects
+        for uuid in self.sections.get(isa, ()):
+            yield uuid, objects[uuid]
+
+    def count(self, isa=None):
+        if isa is None:
+            return len(self.objects)
+        return len(self.sections.get(isa, ()))
+
+    def add(self, uuid, obj, comment=None):
+        """Insert a new object and return its (annotated) UUID for use in references."""
+        if uuid in self.objects:
+            raise KeyError(f"Object {uuid} already exists")
+        key = annotate(uuid, comment)
+        self.objects[key] = obj
+        self.sections.setdefault(obj['isa'], {})[key] = None
+        if comment is not None:
+            self.comments[key] = comment
+        if self.removed.pop(uuid, None) is not None:
+            self.dirty.add(uuid)
+        else:
+            self.added[key] = None
+        return key
+
+    def edit(self, uuid):
+        """Return an object for in-place modification and mark it dirty."""
+        obj = self.objects[uuid]
+        if uuid not in self.added:
+            self.dirty.add(uuid)
+        return obj
+
+    def remove(self, uuid):
+        """Delete an object from the table. References to it are left untouched."""
+        obj = self.objects.pop(uuid)
+        section = self.sections[obj['isa']]
+        del section[uuid]
+        if not section:
+            del self.sections[obj['isa']]
+        self.comments.pop(uuid, None)
+        self.dirty.discard(uuid)
+        if uuid in self.added:
+            del self.added[uuid]
+        else:
+            self.removed[uuid] = obj['isa']
+        return obj
+
+    def ref(self, uuid):
+        """Return ``uuid`` annotated with the object's comment, as Xcode writes references."""
+        return annotate(str(uuid), self.comments.get(uuid))
+
+    # -- navigation -------------------------------------------------------
+
+    @property
+    def root_object(self):
+        return self.data['rootObject']
+
+    @property
+    def project_object(self):
+        return self.objects[self.root_object]
+
+    @property
+    def main_group(self):
+        return self.project_object['mainGroup']
+
+    def targets(self):
+        """Return ``(uuid, obj)`` for each target listed on the PBXProject."""
+        return [(uuid, self.objects[uuid]) for uuid in self.project_object.get('targets', ())]
+
+    def target(self, name=None):
+        """Find a target by name; with no name, return the first (application) target."""
+        for uuid, obj in self.targets():
+            if name is None or obj.get('name') == name or obj.get('productName') == name:
+                return uuid
+        raise KeyError(f"No target named {name!r}")
+
+    def build_phase(self, target_uuid, isa):
+        """Return the UUID of the target's build phase with the given isa."""
+        for uuid in self.objects[target_uuid].get('buildPhases', ()):
+            if self.isa(uuid) == isa:
+                return uuid
+        return None
+
+    def phase_name(self, phase_uuid):
+        phase = self.objects[phase_uuid]
+        if 'name' in phase:
+            return phase['name']
+        return phase['isa'][3:-len('BuildPhase')]
+
+    def display_name(self, uuid):
+        obj = self.objects.get(uuid, {})
+        return obj.get('name') or obj.get('path') or obj.get('productName')
+
+    def groups(self):
+        for isa in GROUP_ISAS:
+            yield from self.iter_section(isa)
+
+    def find_group(self, name):
+        """Return the first group whose name or path is ``name``."""
+        for uuid, obj in self.groups():
+            if obj.get('name') == name or obj.get('path') == name:
+                return uuid
+        return None
+
+    def parent_groups(self):
+        """Map every child UUID to the group that lists it."""
+        parents = {}
+        for uuid, obj in self.groups():
+            for child in obj.get('children', ()):
+                parents[child] = uuid
+        return parents
+
+    def resolved_paths(self):
+        """Map groups and file references to their path relative to the project directory.
+
+        Walks the group tree once from the main group. Items outside the tree
+        are included only when their ``sourceTree`` does not depend on a parent.
+        """
+        paths = {}
+        stack = [(self.main_group, '')]
+        while stack:
+            uuid, parent_path = stack.pop()
+            obj = self.objects.get(uuid)
+            if obj is None or uuid in paths:
+                continue
+            path = _resolve(obj, parent_path)
+            paths[uuid] = path
+            for child in obj.get('children', ()):
+                stack.append((child, path))
+        for isa in ('PBXFileReference',) + GROUP_ISAS:
+            for uuid, obj in self.iter_section(isa):
+                if uuid not in paths and obj.get('sourceTree') != '<group>':
+                    paths[uuid] = _resolve(obj, '')
+        return paths
+
+    def replace_references(self, mapping):
+        """Point every reference to a key of ``mapping`` at its value instead.
+
+        One pass over all objects; lists that received a replacement are
+        de-duplicated so a group never lists the same child twice.
+        """
+        for uuid, obj in self.objects.items():
+            if _replace_in(obj, mapping, self):
+                self.edit(uuid)
+
+    def remove_references(self, uuids):
+        """Drop every list entry that refers to one of ``uuids``, in one pass."""
+        uuids = set(uuids)
+        for uuid, obj in self.objects.items():
+            if _remove_in(obj, uuids):
+                self.edit(uuid)
+
+
+def _resolve(obj, parent_path):
+    tree = obj.get('sourceTree', '<group>')
+    path = obj.get('path', '')
+    if tree == '<group>':
+        base = parent_path
+    elif tree in ('SOURCE_ROOT', '<absolute>'):
+        base = ''
+    else:
+        base = f'$({tree})'
+    return posixpath.normpath(posixpath.join(base, path)) if base or path else ''
+
+
+def _replace_in(value, mapping, project):
+    changed = False
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, str):
+                if item in mapping:
+                    value[key] = project.ref(mapping[item])
+                    changed = True
+            elif _replace_in(item, mapping, project):
+                changed = True
+    elif isinstance(value, list):
+        replaced = False
+        for index, item in enumerate(value):
+            if isinstance(item, str):
+                if item in mapping:
+                    value[index] = project.ref(mapping[item])
+                    replaced = True
+            elif _replace_in(item, mapping, project):
+                changed = True
+        if replaced and all(isinstance(item, str) for item in value):
+            seen = set()
+            value[:] = [item for item in value if not (item in seen or seen.add(item))]
+        changed = changed or replaced
+    return changed
+
+
+def _remove_in(value, uuids):
+    changed = False
+    if isinstance(value, dict):
+        for item in value.values():
+            if not isinstance(item, str) and _remove_in(item, uuids):
+                changed = True
+    elif isinstance(value, list):
+        kept = [item for item in value if not (isinstance(item, str) and item in uuids)]
+        if len(kept) != len(value):
+            value[:] = kept
+            changed = True
+        for item in value:
+            if not isinstance(item, str) and _remove_in(item, uuids):
+                changed = True
+    return changed
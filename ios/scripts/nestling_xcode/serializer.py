@@ -0,0 +1,225 @@
+"""
+Writes a parsed project back out in the exact layout Xcode uses:
+tab indentation, one ``/* Begin <isa> section */`` block per object type,
+and single-line objects for PBXBuildFile / PBXFileReference.
+
+``dumps`` regenerates the whole file; ``render`` splices only added, removed
+and edited objects into the original text so untouched bytes are preserved.
+"""
+
+import difflib
+import re
+
+from .parser import Annotated
+
+HEADER = '// !$*UTF8*$!\n'
+
+# Object types Xcode writes on a single line
+FLAT_ISAS = frozenset({'PBXBuildFile', 'PBXFileReference'})
+
+_BARE_RE = re.compile(r'[A-Za-z0-9_$./]+\Z')
+_ESCAPE_RE = re.compile(r'[\\"\n\t\r]')
+_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t', '\r': '\\r'}
+
+
+def quote(value):
+    """Render a string the way Xcode does, quoting only when needed."""
+    if _BARE_RE.match(value) and '___' not in value:
+        text = value
+    else:
+        text = '"' + _ESCAPE_RE.sub(lambda m: _ESCAPES[m.group()], value) + '"'
+    comment = getattr(value, 'comment', None)
+    if comment is not None:
+        text += f' /* {comment} */'
+    return text
+
+
+def write_value(out, value, indent, flat):
+    """Append the textual form of ``value`` to the ``out`` list."""
+    if isinstance(value, str):
+        out.append(quote(value))
+    elif isinstance(value, dict):
+        if flat:
+            out.append('{')
+            for key, item in value.items():
+                out.append(quote(key))
+                out.append(' = ')
+                write_value(out, item, indent, True)
+                out.append('; ')
+            out.append('}')
+        else:
+            out.append('{\n')
+            inner = '\t' * (indent + 1)
+            for key, item in value.items():
+                out.append(inner)
+                out.append(quote(key))
+                out.append(' = ')
+                write_value(out, item, indent + 1, False)
+                out.append(';\n')
+            out.append('\t' * indent)
+            out.append('}')
+    elif isinstance(value, list):
+        if flat:
+            out.append('(')
+            for item in value:
+                write_value(out, item, indent, True)
+                out.append(', ')
+            out.append(')')
+        else:
+            out.append('(\n')
+            inner = '\t' * (indent + 1)
+            for item in value:
+                out.append(inner)
+                write_value(out, item, indent + 1, False)
+                out.append(',\n')
+            out.append('\t' * indent)
+            out.append(')')
+    else:
+        raise TypeError(f"Cannot serialize {type(value).__name__} in project.pbxproj")
+
+
+def write_object(out, uuid, obj):
+    """Append one ``UUID /* comment */ = {...};`` line (or block) at object depth."""
+    out.append('\t\t')
+    out.append(quote(uuid))
+    out.append(' = ')
+    write_value(out, obj, 2, obj.get('isa') in FLAT_ISAS)
+    out.append(';\n')
+
+
+def write_section(out, isa, items):
+    """Append a complete ``/* Begin isa section */`` block for ``(uuid, obj)`` items."""
+    out.append(f'\n/* Begin {isa} section */\n')
+    for uuid, obj in items:
+        write_object(out, uuid, obj)
+    out.append(f'/* End {isa} section */\n')
+
+
+def dumps(project):
+    """Serialize a ``PBXProject`` to project.pbxproj text."""
+    out = [HEADER, '{\n']
+    for key, value in project.data.items():
+        out.append('\t')
+        out.append(quote(key))
+        out.append(' = ')
+        if key == 'objects':
+            out.append('{\n')
+            for isa in sorted(project.sections):
+                write_section(out, isa, project.iter_section(isa))
+            out.append('\t}')
+        else:
+            write_value(out, value, 1, False)
+        out.append(';\n')
+    out.append('}\n')
+    return ''.join(out)
+
+
+def object_text(uuid, obj):
+    out = []
+    write_object(out, uuid, obj)
+    return ''.join(out)
+
+
+def render(project):
+    """Return ``(text, edits)`` for a project parsed from text.
+
+    ``edits`` is a sorted list of ``(start, end, replacement)`` ranges in the
+    original text; everything outside them is copied through unchanged.
+    """
+    text = project.text
+    source_map = project.source_map
+    objects = project.objects
+    edits = []
+
+    emptied = {isa for isa in set(project.removed.values())
+               if isa not in project.sections and isa in source_map.sections}
+    for isa in emptied:
+        start, end = source_map.sections[isa]
+        if text[start - 2:start] == '\n\n':
+            start -= 1
+        edits.append((start, end, ''))
+
+    for uuid, isa in project.removed.items():
+        if isa not in emptied and uuid in source_map.objects:
+            start, end = source_map.objects[uuid]
+            edits.append((start, end, ''))
+
+    for uuid in project.dirty:
+        if uuid in source_map.objects:
+            start, end = source_map.objects[uuid]
+            edits.append((start, end, object_text(project.ref(uuid), objects[uuid])))
+
+    added_by_isa = {}
+    for uuid in project.added:
+        added_by_isa.setdefault(objects[uuid]['isa'], []).append(uuid)
+    for isa, uuids in added_by_isa.items():
+        items = [(project.ref(uuid), objects[uuid]) for uuid in uuids]
+        if isa in source_map.sections and isa not in emptied:
+            # Append just before the section's End marker
+            end_marker = text.rfind('/* End ', 0, source_map.sections[isa][1])
+            edits.append((end_marker, end_marker, ''.join(object_text(*item) for item in items)))
+        else:
+            out = []
+            write_section(out, isa, items)
+            edits.append((_section_insert_point(text, source_map, isa), None, ''.join(out)))
+
+    edits = [(start, start if end is None else end, replacement) for start, end, replacement in edits]
+    edits.sort(key=lambda edit: (edit[0], edit[1]))
+
+    pieces = []
+    cursor = 0
+    for start, end, replacement in edits:
+        pieces.append(text[cursor:start])
+        pieces.append(replacement)
+        cursor = end
+    pieces.append(text[cursor:])
+    return ''.join(pieces), edits
+
+
+def _section_insert_point(text, source_map, isa):
+    """Where a brand-new ``isa`` section goes to keep sections in isa order."""
+    following = [start for name, (start, _) in source_map.sections.items() if name > isa and start is not None]
+    if following:
+        start = min(following)
+        return start - 1 if text[start - 2:start] == '\n\n' else start
+    return source_map.objects_end
+
+
+def unified_diff(text, edits, path='project.pbxproj'):
+    """Render ``edits`` against ``text`` as a zero-context unified diff.
+
+    Each edit is diffed line by line on its own, so an edited group shows
+    only the children that changed rather than the whole object.
+    """
+    path = path.lstrip('/')
+    out = [f'--- a/{path}\n', f'+++ b/{path}\n']
+    offset = 0
+    line = 1
+    cursor = 0
+    for start, end, replacement in edits:
+        start_line = text.rfind('\n', 0, start) + 1
+        end_line = end if end == start_line or text[end - 1:end] == '\n' else text.find('\n', end) + 1 or len(text)
+        line += text.count('\n', cursor, start_line)
+        cursor = start_line
+        old = text[start_line:end_line].splitlines(True)
+        new = (text[start_line:start] + replacement + text[end:end_line]).splitlines(True)
+        matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                continue
+            old_start = line + i1 if i2 > i1 else line + i1 - 1
+            new_start = line + offset + j1 if j2 > j1 else line + offset + j1 - 1
+            out.append(f'@@ -{old_start},{i2 - i1} +{new_start},{j2 - j1} @@\n')
+            out.extend(_diff_line('-', l) for l in old[i1:i2])
+            out.extend(_diff_line('+', l) for l in new[j1:j2])
+        offset += len(new) - len(old)
+    return ''.join(out) if len(out) > 2 else ''
+
+
+def _diff_line(prefix, line):
+    return prefix + line if line.endswith('\n') else prefix + line + '\n\\ No newline at end of file\n'
+
+
+def annotate(value, comment):
+    """Attach an Xcode-style comment to a string value."""
+    return Annotated(value, comment) if comment is not None else value
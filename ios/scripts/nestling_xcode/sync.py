@@ -0,0 +1,305 @@
+"""
+Incremental disk-to-project sync.
+
+A persisted ``Inventory`` records every directory under the synced roots
+with its mtime and, per file, ``(size, mtime, content hash)``. A directory's
+mtime only changes when entries are added, removed or renamed in it, so a
+later run stats each known directory once and calls ``os.scandir`` only on
+the ones that changed. ``sync`` then diffs the inventory against the
+project's PBXFileReference paths and applies just the adds and removes,
+creating and pruning PBXGroups to mirror the directories. A file that moved
+between directories keeps its reference and build files.
+
+A missing file is not removed when it is in ``KEEP_PATHS`` or git ignores
+it: those are local files (such as Secrets.swift) that a fresh checkout
+does not have yet but the project still needs.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import subprocess
+from collections import namedtuple
+
+from .files import add_files
+from .groups import GroupTree
+from .ids import IdAllocator
+
+# Directories on disk and the target their sources build into
+SYNC_ROOTS = (
+    ('Nestling', 'Nestling'),
+    ('NestlingTests', 'NestlingTests'),
+    ('NuzzleTests', 'NuzzleTests'),
+    ('NestlingUITests', 'NestlingUITests'),
+    ('NuzzleUITests', 'NestlingUITests'),
+)
+
+# Files that are never removed for being missing on disk
+KEEP_PATHS = ('Nestling/Services/Secrets.swift',)
+
+SYNC_EXTENSIONS = ('.swift',)
+
+# Bundles Xcode treats as single files; nothing to sync inside them
+SKIP_SUFFIXES = ('.xcodeproj', '.xcworkspace', '.xcassets', '.lproj', '.xcdatamodeld', '.bundle')
+
+INVENTORY_NAME = '.sync-inventory.json'
+INVENTORY_VERSION = 1
+
+SyncResult = namedtuple('SyncResult', 'added removed moved groups_added groups_removed')
+
+
+def file_hash(path):
+    """Content hash used to recognise a file that moved."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Inventory:
+    """Directory listing cache rooted at the project directory.
+
+    ``dirs`` maps each relative directory to ``[mtime_ns, subdirs, files]``
+    where ``files`` maps a file name to ``[size, mtime_ns, sha1]``.
+    """
+
+    def __init__(self, root, dirs=None):
+        self.root = root
+        self.dirs = dirs or {}
+        self.scanned = 0
+
+    @classmethod
+    def load(cls, path, root):
+        """Read a saved inventory; a missing, stale or unreadable one starts empty."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(root)
+        if data.get('version') != INVENTORY_VERSION:
+            return cls(root)
+        return cls(root, data.get('dirs'))
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INVENTORY_VERSION, 'dirs': self.dirs}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def files(self, roots=None, extensions=SYNC_EXTENSIONS):
+        """Map relative file path to ``(size, mtime_ns, sha1)`` under ``roots``."""
+        found = {}
+        for directory, (_, _, files) in self.dirs.items():
+            if roots is not None and not _under(directory, roots):
+                continue
+            for name, entry in files.items():
+                if name.endswith(extensions):
+                    found[posixpath.join(directory, name)] = tuple(entry)
+        return found
+
+    def scan(self, roots, extensions=SYNC_EXTENSIONS, full=False):
+        """Bring the inventory up to date for ``roots``.
+
+        Unchanged directories cost one ``stat``; only directories whose mtime
+        moved (or every directory, with ``full``) are listed again. Returns
+        the number of directories that were listed.
+        """
+        self.scanned = 0
+        stack = list(roots)
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(os.path.join(self.root, directory)).st_mtime_ns
+            except FileNotFoundError:
+                self._forget(directory)
+                continue
+            known = self.dirs.get(directory)
+            if known is not None and known[0] == mtime and not full:
+                stack.extend(posixpath.join(directory, name) for name in known[1])
+                continue
+            subdirs = self._list(directory, mtime, known, extensions)
+            stack.extend(posixpath.join(directory, name) for name in subdirs)
+        return self.scanned
+
+    def _list(self, directory, mtime, known, extensions):
+        self.scanned += 1
+        old_subdirs, old_files = (known[1], known[2]) if known else ((), {})
+        subdirs, files = [], {}
+        with os.scandir(os.path.join(self.root, directory)) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if name != 'build' and not name.endswith(SKIP_SUFFIXES):
+                        subdirs.append(name)
+                elif name.endswith(extensions):
+                    stat = entry.stat()
+                    old = old_files.get(name)
+                    if old is not None and old[0] == stat.st_size and old[1] == stat.st_mtime_ns:
+                        files[name] = old
+                    else:
+                        files[name] = [stat.st_size, stat.st_mtime_ns, file_hash(entry.path)]
+        for name in set(old_subdirs) - set(subdirs):
+            self._forget(posixpath.join(directory, name))
+        subdirs.sort()
+        self.dirs[directory] = [mtime, subdirs, dict(sorted(files.items()))]
+        return subdirs
+
+    def _forget(self, directory):
+        prefix = directory + '/'
+        for path in [path for path in self.dirs if path == directory or path.startswith(prefix)]:
+            del self.dirs[path]
+
+
+def default_inventory_path(project):
+    """The inventory lives inside the .xcodeproj bundle, next to project.pbxproj."""
+    return os.path.join(os.path.dirname(project.path), INVENTORY_NAME)
+
+
+def project_root(project):
+    """Directory that ``<group>`` and SOURCE_ROOT paths are relative to."""
+    return os.path.dirname(os.path.dirname(os.path.abspath(project.path)))
+
+
+def project_files(project, roots, extensions=SYNC_EXTENSIONS, paths=None):
+    """Map each synced relative path to the file references that point at it."""
+    if paths is None:
+        paths = project.resolved_paths()
+    found = {}
+    for uuid, _ in project.iter_section('PBXFileReference'):
+        path = paths.get(uuid)
+        if path is not None and path.endswith(extensions) and _under(path, roots):
+            found.setdefault(path, []).append(uuid)
+    return found
+
+
+def ignored_paths(root, paths):
+    """The subset of ``paths`` (relative to ``root``) that git ignores; empty outside a git checkout."""
+    if not paths:
+        return set()
+    try:
+        result = subprocess.run(['git', 'check-ignore', '-z', '--stdin'], cwd=root, capture_output=True,
+                                input='\0'.join(paths).encode('utf-8'))
+    except OSError:
+        return set()
+    if result.returncode not in (0, 1):
+        return set()
+    return {path for path in result.stdout.decode('utf-8').split('\0') if path}
+
+
+def sync(project, inventory, roots=SYNC_ROOTS, extensions=SYNC_EXTENSIONS, remove=True, full=False,
+         keep=KEEP_PATHS):
+    """Make the project's references under ``roots`` match the files on disk.
+
+    ``roots`` is a sequence of ``(directory, target)`` pairs relative to the
+    project directory. Missing files in ``keep`` or ignored by git keep
+    their references. Returns a ``SyncResult`` of the relative paths added,
+    removed and moved, and the group paths created and pruned.
+    """
+    root_dirs = [directory for directory, _ in roots]
+    previous = inventory.files(root_dirs, extensions)
+    inventory.scan(root_dirs, extensions, full=full)
+    on_disk = inventory.files(root_dirs, extensions)
+
+    paths = project.resolved_paths()
+    in_project = project_files(project, root_dirs, extensions, paths)
+    ids = IdAllocator(project)
+    groups = GroupTree(project, ids, paths)
+    parents = project.parent_groups()
+
+    to_add = sorted(path for path in on_disk if path not in in_project)
+    to_remove = sorted(path for path in in_project if path not in on_disk) if remove else []
+    if to_remove:
+        kept = set(keep) | ignored_paths(inventory.root, to_remove)
+        to_remove = [path for path in to_remove if path not in kept]
+
+    # A missing file whose name and content now turn up in another directory
+    # moved there; without an earlier hash, a unique name is enough
+    by_name = {}
+    for path in to_add:
+        by_name.setdefault(posixpath.basename(path), []).append(path)
+    moved = []
+    for old_path in list(to_remove):
+        candidates = by_name.get(posixpath.basename(old_path), [])
+        old = previous.get(old_path)
+        if old is not None:
+            candidates = [path for path in candidates if on_disk[path][2] == old[2]]
+        if len(candidates) == 1:
+            new_path = candidates[0]
+            by_name[posixpath.basename(old_path)].remove(new_path)
+            # The first reference moves; duplicates of it are still removed
+            uuid, *duplicates = in_project[old_path]
+            moved.append((old_path, new_path, uuid))
+            in_project[old_path] = duplicates
+            if not duplicates:
+                to_remove.remove(old_path)
+            to_add.remove(new_path)
+
+    emptied = set()
+    for old_path, new_path, uuid in moved:
+        group = groups.ensure(posixpath.dirname(new_path))
+        old_group = parents.get(uuid)
+        if old_group is not None:
+            project.edit(old_group)['children'].remove(uuid)
+            emptied.add(old_group)
+        project.edit(group).setdefault('children', []).append(project.ref(uuid))
+        parents[uuid] = group
+        obj = project.edit(uuid)
+        obj['path'] = posixpath.basename(new_path)
+        if obj.get('name') == obj['path']:
+            del obj['name']
+
+    # Adds: one add_files batch per (group, target)
+    targets = dict(roots)
+    batches = {}
+    for path in to_add:
+        group = groups.ensure(posixpath.dirname(path))
+        target = targets[_root_of(path, root_dirs)]
+        batches.setdefault((group, target), []).append(path)
+    added = []
+    for (group, target), batch in batches.items():
+        by_name = {posixpath.basename(path): path for path in batch}
+        for name, _, _ in add_files(project, list(by_name), group=group, target=target, ids=ids):
+            added.append(by_name[name])
+
+    # Removes: the references, their build files, and groups left empty
+    removed_ids = set()
+    for path in to_remove:
+        removed_ids.update(in_project[path])
+    if removed_ids:
+        for uuid, obj in list(project.iter_section('PBXBuildFile')):
+            if obj.get('fileRef') in removed_ids:
+                removed_ids.add(uuid)
+    if removed_ids:
+        emptied.update(parents[uuid] for uuid in removed_ids if uuid in parents)
+        for uuid in removed_ids:
+            project.remove(uuid)
+        project.remove_references(removed_ids)
+
+    groups_removed = []
+    while emptied:
+        group = emptied.pop()
+        directory = groups.directories.get(group)
+        if (group in project and not project[group].get('children') and directory
+                and directory not in root_dirs and _under(directory, root_dirs)):
+            project.remove(group)
+            groups.discard(group)
+            parent = parents.get(group)
+            if parent is not None and parent in project:
+                project.edit(parent)['children'].remove(group)
+                emptied.add(parent)
+            groups_removed.append(directory)
+
+    return SyncResult(sorted(added), to_remove, [(old, new) for old, new, _ in moved],
+                      groups.created, sorted(groups_removed))
+
+
+def _under(path, roots):
+    return any(path == root or path.startswith(root + '/') for root in roots)
+
+
+def _root_of(path, roots):
+    return next(root for root in roots if path.startswith(root + '/'))
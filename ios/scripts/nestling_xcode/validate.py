@@ -0,0 +1,335 @@
+"""
+Single-pass structural validation of project.pbxproj.
+
+The text is scanned once with a structural regex that matches a whole
+``key = value;`` assignment or list item per step. Nesting and punctuation,
+duplicate object definitions, duplicate keys, ``isa``-specific required keys
+and dangling UUID references are checked along the way and reported with
+line and column.
+
+A 10.9 MB project (50k objects) validates in about 0.9 s; roughly half of
+that is the regex engine producing 310k matches, so the per-match work is
+kept to a few comparisons and the per-object checks run once, when the
+object closes.
+"""
+
+import re
+from bisect import bisect_right
+from collections import namedtuple
+
+from .parser import unescape
+
+Issue = namedtuple('Issue', 'severity line column message')
+
+# Comments in between tokens are skipped by the same match (written so a
+# comment can never run past its own ``*/``); quoted strings and bare words
+# are one atom each, and ``/`` only starts a comment before ``*`` or ``/``.
+_SKIP = r'\s*(?:(?:/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*)\s*)*'
+_BARE = r'[^\s{}()=;,"/]'
+_ATOM = rf'(?:"[^"\\]*(?:\\.[^"\\]*)*"|(?:{_BARE}|/(?![*/])){_BARE}*(?:/(?![*/]){_BARE}*)*)'
+
+# A key and a list item both start with an atom, so they share one branch
+# and the atom is matched once; what follows it (``=``, ``,`` or nothing)
+# tells them apart.
+STRUCTURE_RE = re.compile(rf'''
+    {_SKIP}(?:
+        (?P<token>{_ATOM}){_SKIP}(?:={_SKIP}(?:(?P<value>{_ATOM}){_SKIP}(?P<semi>;)?|(?P<open>[{{(]))|(?P<sep>,))?
+      | (?P<close>[}})])(?:{_SKIP}(?P<term>[;,]))?
+      | (?P<lopen>[{{(])
+      | (?P<error>\S)
+      | \Z
+    )
+''', re.S | re.X)
+
+# Group numbers, in pattern order; ``lastindex`` says which alternative matched
+_TOKEN, _VALUE, _SEMI, _OPEN, _SEP, _CLOSE, _TERM, _LOPEN, _ERROR = range(1, 10)
+
+# Keys whose value is the UUID of another object
+REFERENCE_KEYS = frozenset({
+    'buildConfigurationList', 'containerPortal', 'fileRef', 'mainGroup', 'package',
+    'productRef', 'productRefGroup', 'productReference', 'target', 'targetProxy',
+})
+
+# Keys whose value is a list of object UUIDs
+REFERENCE_LIST_KEYS = frozenset({
+    'buildConfigurations', 'buildPhases', 'buildRules', 'children', 'dependencies', 'files',
+    'packageProductDependencies', 'packageReferences', 'targets',
+})
+
+# Keys every object of an isa must define; a tuple means "any one of these"
+REQUIRED_KEYS = {
+    'PBXAggregateTarget': ('buildConfigurationList', 'buildPhases', 'name'),
+    'PBXBuildFile': (('fileRef', 'productRef'),),
+    'PBXContainerItemProxy': ('containerPortal', 'proxyType', 'remoteGlobalIDString'),
+    'PBXCopyFilesBuildPhase': ('buildActionMask', 'dstSubfolderSpec', 'files'),
+    'PBXFileReference': (('path', 'name'), 'sourceTree'),
+    'PBXFrameworksBuildPhase': ('buildActionMask', 'files'),
+    'PBXGroup': ('children', 'sourceTree'),
+    'PBXHeadersBuildPhase': ('buildActionMask', 'files'),
+    'PBXNativeTarget': ('buildConfigurationList', 'buildPhases', 'name', 'productType'),
+    'PBXProject': ('buildConfigurationList', 'mainGroup', 'targets'),
+    'PBXResourcesBuildPhase': ('buildActionMask', 'files'),
+    'PBXShellScriptBuildPhase': ('buildActionMask', 'files', 'shellScript'),
+    'PBXSourcesBuildPhase': ('buildActionMask', 'files'),
+    'PBXTargetDependency': (('target', 'targetProxy', 'productRef'),),
+    'PBXVariantGroup': ('children', 'sourceTree'),
+    'XCBuildConfiguration': ('buildSettings', 'name'),
+    'XCConfigurationList': ('buildConfigurations',),
+    'XCRemoteSwiftPackageReference': ('repositoryURL', 'requirement'),
+    'XCSwiftPackageProductDependency': ('productName',),
+    'XCVersionGroup': ('children', 'sourceTree', 'versionGroupType'),
+}
+
+# REQUIRED_KEYS split into keys that must all be there and "any one of" sets
+_NEEDED = {isa: (frozenset(key for key in required if isinstance(key, str)),
+                 tuple(frozenset(keys) for keys in required if isinstance(keys, tuple)))
+           for isa, required in REQUIRED_KEYS.items()}
+
+_ROOT_KEYS = ('archiveVersion', 'objectVersion', 'objects', 'rootObject')
+
+
+def validate(text):
+    """Validate project.pbxproj text and return a list of ``Issue`` in file order.
+
+    Structural errors stop the scan, since nothing after them can be trusted;
+    everything else is collected. Repeated keys inside an object are only
+    warnings because Xcode itself reads them (last one wins).
+    """
+    found = []               # (pos, severity, message, other position)
+    stack = []               # open containers: [closer, key, keys, pos, isa, collect]
+    frame = None             # stack[-1]
+    keys = None              # frame's key set while in a dictionary, else None
+    collect = None           # in a list: whether its items are references; else None
+    depth = 0                # len(stack)
+    object_depth = -1        # depth of an object's own keys while inside ``objects``
+    defined = {}             # object UUID -> position of its definition
+    refs = {}                # referenced UUID -> (key, position) of a reference
+    expect_close = False     # last list item had no trailing comma
+    finished = False         # root dictionary closed
+
+    def fail(message, pos, other=None):
+        found.append((pos, 'error', message, other))
+        return _located(text, found)
+
+    for m in STRUCTURE_RE.finditer(text):
+        kind = m.lastindex
+        if expect_close:
+            if kind is not None and kind < _CLOSE:
+                return fail("expected ',' or ')' after list item", m.start(_TOKEN))
+            expect_close = False
+
+        if kind == _SEMI:
+            # key = value; the bulk of the file, so only the checks that
+            # apply at this depth run
+            if keys is None:
+                return fail(_misplaced(frame, finished, m.group(_TOKEN)), m.start(_TOKEN))
+            key = m.group(_TOKEN)
+            if key[0] == '"':
+                key = _unquote(key)
+            if key in keys:
+                found.append((m.start(_TOKEN), 'warning', f"duplicate key {key} in {frame[1] or 'root'}", None))
+            keys.add(key)
+            if depth == object_depth:
+                if key == 'isa' or key in REFERENCE_KEYS:
+                    value = m.group(_VALUE)
+                    if value[0] == '"':
+                        value = _unquote(value)
+                    if key == 'isa':
+                        frame[4] = value
+                    else:
+                        refs[value] = (key, m.start(_VALUE))
+            elif depth == 1:
+                if key == 'rootObject':
+                    refs[_unquote(m.group(_VALUE))] = (key, m.start(_VALUE))
+            elif depth == object_depth - 1:
+                return fail(f"object {key} is not a dictionary", m.start(_TOKEN))
+
+        elif kind == _OPEN:
+            if keys is None:
+                return fail(_misplaced(frame, finished, m.group(_TOKEN)), m.start(_TOKEN))
+            key = _unquote(m.group(_TOKEN))
+            if m.group(_OPEN) == '{':
+                if depth == object_depth - 1:
+                    # An object definition: its UUID is a key of ``objects``
+                    if key in defined:
+                        found.append((m.start(_TOKEN), 'error',
+                                      f"duplicate object definition {key} (first defined on line {{line}})",
+                                      defined[key]))
+                    else:
+                        defined[key] = m.start(_TOKEN)
+                    pos = m.start(_TOKEN)
+                else:
+                    if key in keys:
+                        found.append((m.start(_TOKEN), 'warning', f"duplicate key {key} in {frame[1] or 'root'}",
+                                      None))
+                    keys.add(key)
+                    if depth == 1 and key == 'objects':
+                        object_depth = 3
+                    pos = m.start(_OPEN)
+                keys = set()
+                collect = None
+                frame = ['}', key, keys, pos, None, None]
+            else:
+                if depth == object_depth - 1:
+                    return fail(f"object {key} is not a dictionary", m.start(_TOKEN))
+                if key in keys:
+                    found.append((m.start(_TOKEN), 'warning', f"duplicate key {key} in {frame[1] or 'root'}", None))
+                keys.add(key)
+                keys = None
+                collect = depth == object_depth and key in REFERENCE_LIST_KEYS
+                frame = [')', key, None, m.start(_OPEN), None, collect]
+            stack.append(frame)
+            depth += 1
+
+        elif kind == _SEP or kind == _TOKEN:
+            if collect is None:
+                if frame is None:
+                    return fail(_unexpected(finished, m.group(_TOKEN)), m.start(_TOKEN))
+                return fail(f"expected '=' after {m.group(_TOKEN)}", m.end(_TOKEN))
+            if collect:
+                uuid = m.group(_TOKEN)
+                refs[uuid if uuid[0] != '"' else _unquote(uuid)] = (frame[1], m.start(_TOKEN))
+            if kind == _TOKEN:
+                expect_close = True
+
+        elif kind == _CLOSE or kind == _TERM:
+            closer = m.group(_CLOSE)
+            if frame is None:
+                return fail(_unexpected(finished, f"'{closer}'"), m.start(_CLOSE))
+            if frame[0] != closer:
+                return fail(f"expected '{frame[0]}' to close line {{line}}, found '{closer}'",
+                            m.start(_CLOSE), frame[3])
+            closed = stack.pop()
+            depth -= 1
+            if stack:
+                frame = stack[-1]
+                keys = frame[2]
+                collect = frame[5]
+            else:
+                frame = keys = collect = None
+            if depth == object_depth - 1:
+                # One superset test per object; the detailed check only runs
+                # when something is missing
+                needed = _NEEDED.get(closed[4])
+                if needed is None or not closed[2].issuperset(needed[0]) \
+                        or any(closed[2].isdisjoint(choices) for choices in needed[1]):
+                    _check_object(closed, found)
+            elif depth == 1 and closed[1] == 'objects':
+                object_depth = -1
+            elif depth == 0:
+                missing = [key for key in _ROOT_KEYS if key not in closed[2]]
+                if missing:
+                    found.append((closed[3], 'error', f"project is missing {', '.join(missing)}", None))
+                finished = True
+
+            term = m.group(_TERM)
+            if frame is None:
+                if term:
+                    return fail(f"unexpected '{term}' after the end of the project", m.start(_TERM))
+            elif keys is not None:
+                if term != ';':
+                    return fail(f"expected ';' after '{closer}'", m.end(_CLOSE))
+            elif term is None:
+                expect_close = True
+            elif term == ';':
+                return fail("expected ',' or ')' after list item", m.start(_TERM))
+
+        elif kind == _VALUE:
+            return fail("expected ';' after value", m.end(_VALUE))
+
+        elif kind == _LOPEN:
+            opener = m.group(_LOPEN)
+            if frame is None:
+                if finished or opener != '{':
+                    return fail(_unexpected(finished, f"'{opener}'"), m.start(_LOPEN))
+            elif collect is None:
+                return fail(f"unexpected '{opener}' without a key", m.start(_LOPEN))
+            if opener == '{':
+                keys, collect = set(), None
+                frame = ['}', None, keys, m.start(_LOPEN), None, None]
+            else:
+                keys, collect = None, False
+                frame = [')', None, None, m.start(_LOPEN), None, False]
+            stack.append(frame)
+            depth += 1
+
+        elif kind == _ERROR:
+            return fail(_unexpected(finished, repr(m.group(_ERROR))) if frame is None else f"unexpected {m.group(_ERROR)!r}",
+                        m.start(_ERROR))
+
+    if stack:
+        return fail(f"'{frame[1] or ('{' if frame[0] == '}' else '(')}' is never closed", frame[3])
+    if not finished:
+        return fail("project is empty", 0)
+
+    for uuid in refs.keys() - defined.keys():
+        key, pos = refs[uuid]
+        found.append((pos, 'error', f"{key} refers to undefined object {uuid}", None))
+
+    return _located(text, found)
+
+
+def validate_file(path):
+    """Read and validate a project.pbxproj, including its UTF-8 encoding."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        prefix = data[:e.start]
+        line = prefix.count(b'\n') + 1
+        column = e.start - (prefix.rfind(b'\n') + 1) + 1
+        return [Issue('error', line, column, f"invalid UTF-8 byte 0x{data[e.start]:02x}")]
+    return validate(text)
+
+
+def format_issue(issue, path=None):
+    """``path:line:column: severity: message``, the form editors and hooks understand."""
+    where = f"{path}:{issue.line}:{issue.column}" if path else f"line {issue.line}, column {issue.column}"
+    return f"{where}: {issue.severity}: {issue.message}"
+
+
+def _check_object(frame, found):
+    _, uuid, keys, pos, isa, _ = frame
+    if isa is None:
+        found.append((pos, 'error', f"object {uuid} has no isa", None))
+        return
+    for required in REQUIRED_KEYS.get(isa, ()):
+        if isinstance(required, tuple):
+            if keys.isdisjoint(required):
+                found.append((pos, 'error', f"{isa} {uuid} needs one of {', '.join(required)}", None))
+        elif required not in keys:
+            found.append((pos, 'error', f"{isa} {uuid} is missing {required}", None))
+
+
+def _unquote(atom):
+    # References and keys may legally be written quoted ("ABC123")
+    return unescape(atom[1:-1]) if atom[0] == '"' else atom
+
+
+def _misplaced(frame, finished, key):
+    return _unexpected(finished, key) if frame is None else "unexpected '=' inside a list"
+
+
+def _unexpected(finished, token):
+    if finished:
+        return "unexpected content after the end of the project"
+    return f"expected '{{' at the start of the project, found {token}"
+
+
+def _located(text, found):
+    # Positions become line/column through one index of the newlines, built
+    # only when there is something to report
+    newlines = [m.start() for m in re.finditer('\n', text)] if found else []
+
+    def locate(pos):
+        line = bisect_right(newlines, pos - 1)
+        return line + 1, pos - (newlines[line - 1] + 1 if line else 0) + 1
+
+    issues = []
+    for pos, severity, message, other in sorted(found, key=lambda item: item[0]):
+        if other is not None:
+            # "{line}" in a message stands for the line of a second position
+            message = message.replace('{line}', str(locate(other)[0]))
+        issues.append(Issue(severity, *locate(pos), message))
+    return issues
@@ -0,0 +1,219 @@
+"""
+Keep the project in memory and follow the source folders as they change.
+
+``watch`` loads project.pbxproj once and then waits for file system events
+under the synced roots. A burst of creates, deletes and renames (a branch
+switch, a refactor, Xcode's own file templates) is debounced into one
+``sync`` -- which only lists the directories whose mtime moved -- and the
+result is flushed with one atomic write. When project.pbxproj changes on
+disk and the change is not ours (Xcode saved it, or a checkout replaced
+it), the model is reloaded before the next sync, parsing again only the
+objects on lines that changed. A file that does not parse (caught halfway
+through a write) leaves the previous model in place.
+
+Events come from inotify on Linux (through ctypes, no extra packages).
+Elsewhere -- macOS included -- ``PollingWatcher`` stats the known
+directories on an interval, which is the same check the inventory makes.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from .sync import SYNC_ROOTS, Inventory, default_inventory_path, project_root, sync
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_Q_OVERFLOW = 0x00004000
+
+SOURCE_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF
+PROJECT_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO
+
+_EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Recursive inotify watch over ``directories`` plus the project file.
+
+    ``wait(timeout)`` returns the changed paths, ``[]`` on timeout. A
+    directory created under a watched one is watched as soon as it appears.
+    """
+
+    def __init__(self, directories, project_path):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+        self.project_path = os.path.abspath(project_path)
+        self._add(os.path.dirname(self.project_path), PROJECT_EVENTS)
+        for directory in directories:
+            self._add_tree(directory)
+
+    def _add(self, path, mask):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd >= 0:
+            self.paths[wd] = path
+
+    def _add_tree(self, top):
+        for directory, subdirs, _ in os.walk(top):
+            subdirs[:] = [name for name in subdirs if not name.startswith('.')]
+            self._add(directory, SOURCE_EVENTS)
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return []
+            changed = self._read()
+            if changed:
+                return changed
+
+    def _read(self):
+        data = os.read(self.fd, 1 << 16)
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; the next sync rescans what changed anyway
+                changed.append(None)
+                continue
+            directory = self.paths.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.paths[wd]
+                continue
+            path = os.path.join(directory, name) if name else directory
+            if directory == os.path.dirname(self.project_path) and path != self.project_path:
+                continue    # our cache, the inventory, xcuserdata, ...
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(path)
+            changed.append(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback: stat the known directories and the project file every ``interval`` seconds."""
+
+    def __init__(self, inventory, roots, project_path, interval=1.0):
+        self.inventory = inventory
+        self.roots = roots
+        self.project_path = os.path.abspath(project_path)
+        self.interval = interval
+        self.seen = self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {}
+        directories = set(self.inventory.dirs) | set(self.roots)
+        for directory in directories:
+            path = os.path.join(self.inventory.root, directory)
+            try:
+                snapshot[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                snapshot[path] = None
+        try:
+            stat = os.stat(self.project_path)
+            snapshot[self.project_path] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            snapshot[self.project_path] = None
+        return snapshot
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                return []
+            time.sleep(self.interval if deadline is None else min(self.interval, deadline - now))
+            snapshot = self._snapshot()
+            changed = [path for path, value in snapshot.items() if self.seen.get(path) != value]
+            self.seen = snapshot
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def watch(project, roots=SYNC_ROOTS, debounce=0.3, poll=False, interval=1.0, log=print):
+    """Sync ``project`` with the disk until interrupted. Returns the project as last loaded.
+
+    ``project`` is written right away if it has unsaved changes.
+    """
+    path = project.path
+    root = project_root(project)
+    inventory_path = default_inventory_path(project)
+    inventory = Inventory.load(inventory_path, root)
+    root_dirs = [directory for directory, _ in roots if os.path.isdir(os.path.join(root, directory))]
+
+    def apply():
+        result = sync(project, inventory, roots=roots)
+        if project.modified:
+            project.save()
+            # Index the positions while idle, so the next outside change to
+            # the file is reparsed incrementally
+            project._ensure_source_map()
+        inventory.save(inventory_path)
+        for line in ([f"+ {p}" for p in result.added] + [f"- {p}" for p in result.removed]
+                     + [f"→ {old} → {new}" for old, new in result.moved]):
+            log(f"   {line}")
+        if result.added or result.removed or result.moved:
+            log(f"🔄 {len(result.added)} added, {len(result.removed)} removed, {len(result.moved)} moved "
+                f"({inventory.scanned} directories listed)")
+        return _signature(path)
+
+    ours = apply()
+    if poll or not sys.platform.startswith('linux'):
+        watcher = PollingWatcher(inventory, root_dirs, path, interval)
+    else:
+        watcher = InotifyWatcher([os.path.join(root, directory) for directory in root_dirs], path)
+    log(f"👀 Watching {', '.join(root_dirs)} for {path} (Ctrl-C to stop)")
+
+    try:
+        while True:
+            changed = watcher.wait()
+            # Debounce: keep collecting until the tree has been quiet for a moment
+            while True:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed.extend(more)
+            try:
+                if os.path.abspath(path) in changed and _signature(path) != ours:
+                    log("📥 project.pbxproj changed on disk; reloading")
+                    # On a parse error (Xcode halfway through a write) the
+                    # previous model stays; the finished write brings another event
+                    project = project.reload()
+                ours = apply()
+            except (KeyError, ValueError, OSError) as e:
+                log(f"❌ {e}")
+    except KeyboardInterrupt:
+        log("👋 Stopped watching")
+    finally:
+        watcher.close()
+    return project
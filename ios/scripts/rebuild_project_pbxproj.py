@@ -1,88 +1,43 @@
 #!/usr/bin/env python3
 """
-Rebuild Xcode project.pbxproj file with fresh UUIDs
-This script validates and can regenerate the project file structure
+Validate Xcode project.pbxproj files
+Checks structure, references and required keys; see nestling_xcode.validate
+
+Usage (also works as a pre-commit hook; exits 1 on errors):
+    python3 ios/scripts/rebuild_project_pbxproj.py [project.pbxproj ...]
 """
 
-import re
 import sys
-import os
-import subprocess
 from pathlib import Path
 
-def generate_xcode_uuid():
-    """Generate a 24-character hex UUID in Xcode format"""
-    import secrets
-    return secrets.token_hex(12).upper()
+from nestling_xcode import DEFAULT_PROJECT_PATH
+from nestling_xcode.validate import format_issue, validate_file
 
 def validate_project_file(project_file_path):
-    """Validate the project.pbxproj file structure"""
-    issues = []
-    
-    with open(project_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Check for balanced braces
-    open_braces = content.count('{')
-    close_braces = content.count('}')
-    if open_braces != close_braces:
-        issues.append(f"Mismatched braces: {open_braces} open, {close_braces} close")
-    
-    # Check for balanced parentheses
-    open_parens = content.count('(')
-    close_parens = content.count(')')
-    if open_parens != close_parens:
-        issues.append(f"Mismatched parentheses: {open_parens} open, {close_parens} close")
-    
-    # Check for valid UTF-8
-    try:
-        content.encode('utf-8').decode('utf-8')
-    except UnicodeDecodeError:
-        issues.append("Invalid UTF-8 encoding")
-    
-    # Check for actual duplicate object definitions (not nested attributes)
-    # TargetAttributes can have nested dictionaries with same UUIDs, which is valid
-    # We check for duplicate definitions at the top level of the objects section
-    lines = content.split('\n')
-    in_objects = False
-    object_defs = {}
-    current_indent = 0
-    
-    for i, line in enumerate(lines):
-        if 'objects = {' in line:
-            in_objects = True
-            continue
-        if in_objects and line.strip().startswith('};') and 'objects' not in line:
-            # End of objects section
-            break
-        if in_objects:
-            # Check for object definition (UUID followed by comment and =)
-            match = re.match(r'^\s+([A-F0-9]{24})\s+/\*.*\*/\s*=\s*{', line)
-            if match:
-                uuid = match.group(1)
-                if uuid in object_defs:
-                    issues.append(f"Duplicate object definition: {uuid} at lines {object_defs[uuid]} and {i+1}")
-                else:
-                    object_defs[uuid] = i+1
-    
-    return issues
+    """Validate the project.pbxproj file structure.
+
+    Returns ``path:line:column: severity: message`` strings for every issue;
+    see nestling_xcode.validate for what is checked.
+    """
+    return [format_issue(issue, project_file_path) for issue in validate_file(project_file_path)]
 
 def main():
-    script_dir = Path(__file__).parent
-    project_dir = script_dir.parent / "Nestling"
-    project_file = project_dir / "Nestling.xcodeproj" / "project.pbxproj"
+    project_files = [Path(arg) for arg in sys.argv[1:]] or [Path(DEFAULT_PROJECT_PATH)]
     
-    if not project_file.exists():
-        print(f"❌ ERROR: Project file not found at {project_file}")
-        sys.exit(1)
+    for project_file in project_files:
+        if not project_file.exists():
+            print(f"❌ ERROR: Project file not found at {project_file}")
+            sys.exit(1)
     
     print("🔍 Validating project file...")
-    issues = validate_project_file(project_file)
+    issues = [(project_file, issue) for project_file in project_files for issue in validate_file(project_file)]
+    errors = [issue for _, issue in issues if issue.severity == 'error']
     
     if issues:
-        print("❌ Issues found in project file:")
-        for issue in issues:
-            print(f"   - {issue}")
+        print("❌ Issues found in project file:" if errors else "⚠️  Warnings in project file:")
+        for project_file, issue in issues:
+            print(f"   - {format_issue(issue, project_file)}")
+    if errors:
         print("\n💡 Recommendation: Restore from backup or recreate project in Xcode")
         sys.exit(1)
     else:
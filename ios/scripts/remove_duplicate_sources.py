@@ -1,92 +1,60 @@
 #!/usr/bin/env python3
-"""Remove duplicate source file references from Xcode project."""
+"""Remove duplicate file references and build files from Xcode project.
+
+Covers every target and build phase: file references are matched by their
+resolved path, build files by (fileRef, build phase). Replaces the
+fix_duplicate_*.rb scripts.
+
+Usage:
+    python3 remove_duplicate_sources.py [--dry-run] [--check] [project.pbxproj]
+"""
 
-import re
 import sys
 import os
 
-def remove_duplicate_sources(project_path):
-    """Remove duplicate source file references."""
-    
-    print(f"🔍 Checking for duplicate source references in {project_path}")
-    
-    with open(project_path, 'r') as f:
-        content = f.read()
-    
-    # Find all PBXBuildFile entries for RemoteDataStore and DataMigrationService
-    pattern = r'(\t\t[A-F0-9]+ /\* (RemoteDataStore|DataMigrationService)\.swift in Sources \*/ = \{isa = PBXBuildFile; fileRef = [A-F0-9]+ /\* \2\.swift \*/; \};)'
-    
-    matches = list(re.finditer(pattern, content))
-    print(f"   Found {len(matches)} references to RemoteDataStore/DataMigrationService")
-    
-    if len(matches) <= 2:  # Should have exactly 1 of each
+from nestling_xcode import DEFAULT_PROJECT_PATH, PBXProject
+from nestling_xcode.dedupe import find_duplicates, format_report, remove_duplicates
+
+def remove_duplicate_sources(project_path, dry_run=False, check=False):
+    """Report and remove duplicates. Returns the number of duplicates found."""
+
+    print(f"🔍 Checking for duplicate references in {project_path}")
+
+    project = PBXProject.load(project_path)
+    duplicates = find_duplicates(project)
+
+    if not duplicates:
         print("   ✅ No duplicates found")
-        return
-    
-    # Group by filename
-    by_file = {}
-    for match in matches:
-        filename = match.group(2)
-        if filename not in by_file:
-            by_file[filename] = []
-        by_file[filename].append(match)
-    
-    # Remove duplicates (keep first, remove rest)
-    for filename, file_matches in by_file.items():
-        if len(file_matches) > 1:
-            print(f"   Removing {len(file_matches) - 1} duplicate(s) of {filename}.swift")
-            # Remove all but the first
-            for match in file_matches[1:]:
-                content = content.replace(match.group(1) + '\n', '')
-    
-    # Also remove from Sources build phase
-    # Find the Sources build phase
-    sources_phase_pattern = r'(8D0EF79BF179A231B6BF4115 /\* Sources \*/ = \{[^}]+files = \([^)]+)\);'
-    sources_match = re.search(sources_phase_pattern, content, re.DOTALL)
-    
-    if sources_match:
-        sources_content = sources_match.group(1)
-        original_sources = sources_content
-        
-        # Find duplicate entries in the sources list
-        entry_pattern = r'\t\t\t\t([A-F0-9]+) /\* (RemoteDataStore|DataMigrationService)\.swift in Sources \*/,'
-        entries = list(re.finditer(entry_pattern, sources_content))
-        
-        # Group by filename
-        entries_by_file = {}
-        for entry in entries:
-            filename = entry.group(2)
-            if filename not in entries_by_file:
-                entries_by_file[filename] = []
-            entries_by_file[filename].append(entry)
-        
-        # Remove duplicates from sources phase
-        for filename, file_entries in entries_by_file.items():
-            if len(file_entries) > 1:
-                print(f"   Removing {len(file_entries) - 1} duplicate source phase entry for {filename}.swift")
-                for entry in file_entries[1:]:
-                    sources_content = sources_content.replace('\n' + entry.group(0), '')
-        
-        # Replace in content
-        if sources_content != original_sources:
-            content = content.replace(original_sources, sources_content)
-    
+        return 0
+
+    for line in format_report(duplicates):
+        print(f"   {line}")
+
+    objects = sum(len(dup.removed) for dup in duplicates if dup.kind in ('PBXFileReference', 'PBXBuildFile'))
+    print(f"   Found {len(duplicates)} duplicate(s), {objects} object(s) to remove")
+
+    if check:
+        return len(duplicates)
+
+    remove_duplicates(project, duplicates)
+
     # Write back
-    with open(project_path, 'w') as f:
-        f.write(content)
-    
-    print("   ✅ Duplicates removed")
+    project.save(dry_run=dry_run)
+
+    if not dry_run:
+        print("   ✅ Duplicates removed")
+    return len(duplicates)
 
 if __name__ == '__main__':
-    script_dir = os.path.dirname(__file__)
-    project_path = os.path.join(script_dir, '..', 'Nestling', 'Nestling.xcodeproj', 'project.pbxproj')
-    project_path = os.path.abspath(project_path)
-    
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    project_path = args[0] if args else DEFAULT_PROJECT_PATH
+
     if not os.path.exists(project_path):
         print(f"❌ Project file not found: {project_path}")
         sys.exit(1)
-    
-    remove_duplicate_sources(project_path)
-    print("✅ Done!")
-
 
+    found = remove_duplicate_sources(project_path, dry_run='--dry-run' in sys.argv[1:],
+                                     check='--check' in sys.argv[1:])
+    if found and '--check' in sys.argv[1:]:
+        sys.exit(1)
+    print("✅ Done!")
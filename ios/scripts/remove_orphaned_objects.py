@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Remove objects that are no longer reachable from the Xcode project root.
+
+Leftover file references, build files and groups from earlier add/fix
+scripts are swept in one pass; everything reachable from rootObject through
+groups, build phases, targets, configuration lists and package references
+is kept.
+
+Usage:
+    python3 remove_orphaned_objects.py [--dry-run] [project.pbxproj]
+"""
+
+import sys
+import os
+
+from nestling_xcode import DEFAULT_PROJECT_PATH, PBXProject
+from nestling_xcode.gc import collect_garbage
+
+def remove_orphaned_objects(project_path, dry_run=False):
+    """Sweep unreachable objects. Returns the number of objects reclaimed."""
+
+    print(f"🧹 Collecting unreachable objects in {project_path}")
+
+    project = PBXProject.load(project_path)
+    total_before = project.count()
+    removed, reclaimed = collect_garbage(project)
+
+    if not removed:
+        print("   ✅ Every object is reachable")
+        return 0
+
+    for isa, count in sorted(removed.items()):
+        print(f"   {isa}: {count}")
+    count = sum(removed.values())
+    print(f"   Reclaimed {count} of {total_before} objects, {reclaimed:,} bytes")
+
+    if dry_run:
+        print("   (dry run, project not written)")
+        return count
+
+    # Write back
+    project.save()
+    print("   ✅ Orphaned objects removed")
+    return count
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    project_path = args[0] if args else DEFAULT_PROJECT_PATH
+
+    if not os.path.exists(project_path):
+        print(f"❌ Project file not found: {project_path}")
+        sys.exit(1)
+
+    remove_orphaned_objects(project_path, dry_run='--dry-run' in sys.argv[1:])
+    print("✅ Done!")
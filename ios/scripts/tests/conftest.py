@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(TESTS_DIR, 'fixtures')
+
+# The tools run as scripts from ios/scripts, so the package is not installed
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+
+@pytest.fixture
+def minimal_text():
+    with open(os.path.join(FIXTURES_DIR, 'Minimal.pbxproj'), encoding='utf-8') as f:
+        return f.read()
@@ -0,0 +1,88 @@
+import json
+import os
+import struct
+import zlib
+
+import pytest
+
+from nestling_xcode.assets import PNGHeader, audit, audit_set, find_catalogs, read_png_header
+
+IOS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def chunk(kind, payload):
+    return struct.pack('>I', len(payload)) + kind + payload + struct.pack('>I', zlib.crc32(kind + payload))
+
+
+def png(width, height, color_type=2, trns=False):
+    """A valid PNG of zero bytes; only the header matters to the audit."""
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[color_type]
+    rows = b''.join(b'\0' + bytes(width * channels) for _ in range(height))
+    extra = chunk(b'PLTE', bytes(3)) if color_type == 3 else b''
+    if trns:
+        extra += chunk(b'tRNS', b'\0')
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+            + chunk(b'tEXt', b'Software\0test') + extra + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+def write_set(path, contents, files):
+    path.mkdir(parents=True)
+    (path / 'Contents.json').write_text(json.dumps(contents))
+    for name, data in files.items():
+        (path / name).write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize('color_type, trns, alpha', [(2, False, False), (6, False, True), (3, True, True),
+                                                     (0, False, False), (4, False, True)])
+def test_png_header(tmp_path, color_type, trns, alpha):
+    path = tmp_path / 'image.png'
+    path.write_bytes(png(3, 2, color_type, trns))
+    assert read_png_header(str(path)) == PNGHeader(3, 2, 8, color_type, alpha)
+
+
+def test_not_a_png(tmp_path):
+    path = tmp_path / 'image.png'
+    path.write_bytes(b'GIF89a' + bytes(40))
+    assert read_png_header(str(path)) is None
+
+
+def test_app_icon_sizes_alpha_and_files(tmp_path):
+    icons = {'images': [
+        {'filename': 'icon-40.png', 'idiom': 'iphone', 'scale': '2x', 'size': '20x20'},
+        {'filename': 'icon-60.png', 'idiom': 'iphone', 'scale': '3x', 'size': '20x20'},
+        {'filename': 'icon-1024.png', 'idiom': 'ios-marketing', 'scale': '1x', 'size': '1024x1024'},
+        {'filename': 'missing.png', 'idiom': 'iphone', 'scale': '2x', 'size': '29x29'},
+    ]}
+    set_path = write_set(tmp_path / 'AppIcon.appiconset', icons, {
+        'icon-40.png': png(40, 40), 'icon-60.png': png(59, 59),
+        'icon-1024.png': png(1024, 1024, 6), 'stray.png': png(1, 1)})
+    issues = []
+    assert audit_set(set_path, issues) == 3
+    found = sorted((issue.severity, os.path.basename(issue.path), issue.message) for issue in issues)
+    assert found == [
+        ('error', 'icon-1024.png', "app icon has an alpha channel"),
+        ('error', 'icon-60.png', "59x59 px, but 20x20 at 3x needs 60x60"),
+        ('error', 'missing.png', "listed in Contents.json but missing"),
+        ('warning', 'stray.png', "not referenced by Contents.json"),
+    ]
+
+
+def test_image_set_scales_must_agree(tmp_path):
+    images = {'images': [{'filename': f'logo@{scale}x.png', 'idiom': 'universal', 'scale': f'{scale}x'}
+                         for scale in (1, 2, 3)]}
+    set_path = write_set(tmp_path / 'Logo.imageset', images, {
+        'logo@1x.png': png(10, 5), 'logo@2x.png': png(20, 10), 'logo@3x.png': png(40, 20)})
+    issues = []
+    audit_set(set_path, issues)
+    assert [(issue.severity, issue.message) for issue in issues] == [
+        ('warning', "40x20 px at 3x, but logo@1x.png implies 30x15")]
+
+
+def test_checked_in_catalogs_are_clean():
+    catalogs = find_catalogs(IOS_DIR)
+    if not catalogs:
+        pytest.skip("needs the iOS asset catalogs")
+    issues, sets, files = audit(catalogs)
+    assert [issue for issue in issues if issue.severity == 'error'] == []
+    assert sets and files
@@ -0,0 +1,96 @@
+import copy
+
+from nestling_xcode.bench import compare, measure, remeasure, synthetic_text
+
+
+def report(calibration, noise=0.05, **seconds):
+    return {
+        'calibration_seconds': calibration,
+        'sizes': {'1000': {'operations': {
+            name: {'seconds': value, 'median': value, 'relative': value / calibration, 'noise': noise,
+                   'peak_bytes': 1_000_000}
+            for name, value in seconds.items()}}},
+    }
+
+
+def test_the_same_results_are_not_a_regression():
+    current = report(0.02, parse=0.5, validate=0.2)
+    assert compare(current, copy.deepcopy(current)) == []
+    # Nor is a run that recorded no noise
+    quiet = report(0.02, noise=0, parse=0.5)
+    assert compare(quiet, copy.deepcopy(quiet)) == []
+
+
+def test_a_slowdown_within_the_noise_is_not_a_regression():
+    baseline = report(0.02, noise=0.2, validate=0.2)
+    assert compare(report(0.02, validate=0.28), baseline) == []
+    found = compare(report(0.02, validate=0.3), baseline)
+    assert [item.operation for item in found] == ['validate']
+    assert found[0].message.endswith('(+50%, allowed +46%)')
+
+
+def test_a_slower_machine_is_not_a_regression():
+    baseline = report(0.02, parse=0.5, validate=0.2)
+    assert compare(report(0.04, parse=1.0, validate=0.4), baseline) == []
+
+
+def test_a_slower_operation_is_a_regression_on_any_machine():
+    baseline = report(0.02, parse=0.5, validate=0.2)
+    found = compare(report(0.01, parse=0.25, validate=0.1), baseline) + \
+        compare(report(0.04, parse=1.0, validate=0.6), baseline)
+    assert [(item.operation, item.kind) for item in found] == [('validate', 'time')]
+
+
+def test_a_calibration_out_of_step_with_the_operations_is_drift():
+    times = dict(parse=0.5, add=0.1, dedupe=0.3, gc=0.2, validate=0.4, serialize=0.6)
+    baseline = report(0.04, **times)
+    # The calibration loop alone got faster, so every operation looks 60% slower
+    assert compare(report(0.025, **times), baseline) == []
+    found = compare(report(0.025, **dict(times, gc=0.3)), baseline)
+    assert [item.operation for item in found] == ['gc']
+    assert found[0].message.endswith("(+50% after the run's +60% drift, allowed +32%)")
+
+
+def test_on_the_same_machine_a_slowdown_must_show_in_seconds_too():
+    baseline = dict(report(0.04, parse=0.5, validate=0.2), python='3.11', platform='Linux', machine='x86_64')
+    faster_loop = dict(baseline, **report(0.02, parse=0.5, validate=0.2))
+    assert compare(faster_loop, baseline) == []
+    slower = dict(baseline, **report(0.02, parse=0.5, validate=0.4))
+    found = compare(slower, baseline)
+    assert [item.operation for item in found] == ['validate']
+    assert found[0].message.endswith('(+300%, +100% in seconds, allowed +32%)')
+    # Elsewhere seconds mean nothing, so calibration units alone decide
+    assert [item.operation for item in compare(dict(faster_loop, platform='Darwin'), baseline)] == \
+        ['parse', 'validate']
+
+
+def test_baselines_without_calibration_compare_seconds():
+    baseline = report(0.02, parse=0.5)
+    for result in baseline['sizes']['1000']['operations'].values():
+        del result['relative']
+    del baseline['calibration_seconds']
+    assert [item.operation for item in compare(report(0.04, parse=1.0), baseline)] == ['parse']
+
+
+def test_memory_growth_is_a_regression():
+    current = report(0.02, parse=0.5)
+    current['sizes']['1000']['operations']['parse']['peak_bytes'] = 2_000_000
+    assert [item.kind for item in compare(current, report(0.02, parse=0.5))] == ['memory']
+
+
+def test_remeasure_keeps_the_faster_time():
+    slow = report(1.0, noise=3.0, gc=10.0)
+    remeasure(slow, [('1000', 'gc')], repeat=1)
+    result = slow['sizes']['1000']['operations']['gc']
+    assert result['seconds'] < 10.0 and result['median'] < 10.0
+    assert result['relative'] == round(result['median'] / slow['calibration_seconds'], 4)
+
+
+def test_measure_reports_best_median_and_spread():
+    result = measure(lambda text: text, len, 'abc', repeat=3, memory=False)
+    assert set(result) == {'seconds', 'median', 'noise'}
+    assert result['seconds'] <= result['median'] and result['noise'] >= 0
+
+
+def test_synthetic_projects_are_deterministic():
+    assert synthetic_text(500) == synthetic_text(500)
@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from nestling_xcode.buildlog import (Diagnostic, Footer, Step, TargetBuild, Timing, format_diagnostic, parse_log,
+                                     read_log, step_path)
+
+DERIVED = '/Users/dev/Library/Developer/Xcode/DerivedData/Nestling-abc/Build'
+IOS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SAMPLE_LOG = os.path.join(IOS_DIR, 'Nuzzle', 'Build Nuzzle_2025-12-10T18-37-36.txt')
+
+LOG = f"""Showing All Messages
+
+Build target Nuzzle of project Nestling with configuration Debug
+
+note: Building targets in dependency order
+    Target 'Nuzzle' in project 'Nestling'
+
+SwiftCompile normal arm64 Compiling\\ A.swift,\\ B.swift /src/A.swift /src/B.swift (in target 'Nuzzle' from project 'Nestling')
+
+SwiftCompile normal arm64 /Users/dev/Coding\\ Projects/App/A.swift (in target 'Nuzzle' from project 'Nestling')
+    cd /Users/dev/App
+
+/Users/dev/Coding Projects/App/A.swift:142:14: warning: capture of 'self' in a closure
+CompileC {DERIVED}/Foo.o /src/Foo.m normal arm64 objective-c com.apple.compilers.llvm.clang.1_0.compiler (in target 'Nuzzle' from project 'Nestling')
+PrecompileModule {DERIVED}/ExplicitPrecompiledModules/_Builtin_stdbool-5VX4.scan
+Swift version 5.10
+error: Build input file cannot be found: '/src/Gone.swift'
+SwiftCompile (12 tasks) | 45.1 seconds
+Ld {DERIVED}/Nuzzle.app/Nuzzle normal (in target 'Nuzzle' from project 'Nestling')
+
+Build failed    12/10/25, 6:38 PM    23.9 seconds
+** BUILD FAILED ** [52.3 sec]
+"""
+
+
+@pytest.fixture
+def events():
+    return list(parse_log(LOG.splitlines(True)))
+
+
+def test_every_kind_of_line_becomes_an_event(events):
+    assert [type(event).__name__ for event in events] == [
+        'TargetBuild', 'Diagnostic', 'Step', 'Step', 'Diagnostic', 'Step', 'Step', 'Diagnostic', 'Timing', 'Step',
+        'Footer', 'Footer']
+
+
+def test_target_banner(events):
+    assert events[0] == TargetBuild('Nuzzle', 'Nestling', 'Debug', 3)
+
+
+def test_steps_carry_their_file_and_target(events):
+    batch, single, compile_c, precompile, link = [event for event in events if isinstance(event, Step)]
+    assert (batch.kind, batch.path) == ('SwiftCompile', None)
+    assert single == Step('SwiftCompile', 'Nuzzle', 'Nestling', '/Users/dev/Coding Projects/App/A.swift', 10)
+    assert compile_c.path == '/src/Foo.m'
+    # No target on the line: the task is still counted, but not attributed
+    assert (precompile.kind, precompile.target, precompile.path) == (
+        'PrecompileModule', None, f'{DERIVED}/ExplicitPrecompiledModules/_Builtin_stdbool-5VX4.scan')
+    assert (link.kind, link.path) == ('Ld', f'{DERIVED}/Nuzzle.app/Nuzzle')
+
+
+def test_diagnostics_keep_location_and_the_current_target(events):
+    note, warning, error = [event for event in events if isinstance(event, Diagnostic)]
+    assert (note.severity, note.path, note.target) == ('note', None, 'Nuzzle')
+    assert warning == Diagnostic('warning', '/Users/dev/Coding Projects/App/A.swift', 142, 14,
+                                 "capture of 'self' in a closure", 'Nuzzle', 'Nestling', 13)
+    assert (error.severity, error.path, error.line) == ('error', None, None)
+    assert format_diagnostic(warning) == ("/Users/dev/Coding Projects/App/A.swift:142:14: warning: "
+                                          "capture of 'self' in a closure [Nuzzle]")
+
+
+def test_timing_and_footers(events):
+    assert [event for event in events if isinstance(event, Timing)] == [Timing('SwiftCompile', 12, 45.1, 18)]
+    assert [event for event in events if isinstance(event, Footer)] == [
+        Footer('Build failed', '12/10/25, 6:38 PM', 23.9, 21),
+        Footer('BUILD FAILED', None, 52.3, 22),
+    ]
+
+
+def test_tool_output_is_not_mistaken_for_a_step(events):
+    assert not any(isinstance(event, Step) and event.kind == 'Swift' for event in events)
+
+
+@pytest.mark.parametrize('kind, args, path', [
+    ('SwiftCompile', 'normal arm64 /a/B\\ C.swift', '/a/B C.swift'),
+    ('CompileC', '/obj/X.o /src/X.c normal', '/src/X.c'),
+    ('SwiftCompile', 'normal arm64 Compiling\\ A.swift /a/A.swift', None),
+    ('CodeSign', None, None),
+])
+def test_step_path(kind, args, path):
+    assert step_path(kind, args) == path
+
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_LOG), reason="needs the sample build log")
+def test_sample_log():
+    events = list(read_log(SAMPLE_LOG))
+    footers = [event for event in events if isinstance(event, Footer)]
+    assert [(footer.status, footer.seconds) for footer in footers] == [('Build succeeded', 23.9)]
+    assert sum(isinstance(event, TargetBuild) for event in events) == 49
+    assert all(event.path is None or event.path.startswith('/') for event in events if isinstance(event, Step))
@@ -0,0 +1,95 @@
+import pytest
+
+from nestling_xcode.buildlog import parse_log
+from nestling_xcode.buildreport import Tally, find_run, pick_runs, regressions, summarize_log
+
+LOG = """\
+Build target Nuzzle of project Nestling with configuration Debug
+
+SwiftCompile normal arm64 /Users/dev/ios/Nuzzle/Nestling/App.swift (in target 'Nuzzle' from project 'Nestling')
+    cd /Users/dev/ios/Nuzzle
+SwiftCompile normal arm64 /Users/dev/Library/Developer/Xcode/DerivedData/N/SourcePackages/checkouts/swift-crypto/A.swift (in target 'Crypto' from project 'swift-crypto')
+/Users/dev/ios/Nuzzle/Nestling/App.swift:3:5: warning: variable 'x' was never used
+/Users/dev/ios/Nuzzle/Nestling/App.swift:3:5: note: consider replacing it with '_'
+Ld /Users/dev/DerivedData/Build/Nuzzle.app/Nuzzle normal (in target 'Nuzzle' from project 'Nestling')
+
+/Users/dev/ios/Nuzzle/Nestling/App.swift:3:5: warning: variable 'x' was never used
+Build succeeded    12/10/25, 6:37 PM    23.9 seconds
+"""
+
+
+def run(name, seconds=20.0, swift=10, started=None):
+    return {'name': name, 'started': started or name, 'seconds': seconds, 'status': 'Build succeeded',
+            'kind': {'SwiftCompile': swift} if swift else {'ExecuteExternalTool': 3}, 'target': {}, 'project': {},
+            'file': {}, 'timing': {}, 'errors': 0, 'warnings': 0}
+
+
+RUNS = [
+    run('Build Nuzzle_2025-12-10T07-43-42.txt'),
+    run('Build Nuzzle_2025-12-10T08-08-57.txt', seconds=None),
+    run('Build Nuzzle_2025-12-10T18-37-36.txt', seconds=23.9),
+    run('Build Nuzzle_2025-12-10T18-44-11.txt', seconds=0.2, swift=0),
+]
+
+
+def test_tally_counts_each_diagnostic_once():
+    tally = Tally()
+    repeats = [tally.add(event) for event in parse_log(LOG.splitlines(True))]
+    assert repeats.count(False) == 1
+    assert tally.warnings == 1 and tally.errors == 0
+    assert tally.steps == {'SwiftCompile': 2, 'Ld': 1}
+    assert tally.targets == {'Nuzzle (Nestling)': 2, 'Crypto (swift-crypto)': 1}
+    assert tally.files == {'ios/Nuzzle/Nestling/App.swift': 1, 'swift-crypto/A.swift': 1,
+                           'Build/Nuzzle.app/Nuzzle': 1}
+    assert tally.footer.seconds == 23.9
+
+
+def test_summarize_log(tmp_path):
+    path = tmp_path / 'Build Nuzzle_2025-12-10T18-37-36.txt'
+    path.write_text(LOG, encoding='utf-8')
+    summary = summarize_log(str(path))
+    assert summary['started'] == '2025-12-10T18:37:36'
+    assert (summary['status'], summary['seconds'], summary['warnings']) == ('Build succeeded', 23.9, 1)
+    assert summary['project'] == {'Nestling': 2, 'swift-crypto': 1}
+
+
+@pytest.mark.parametrize('key, name', [
+    ('-1', 'Build Nuzzle_2025-12-10T18-44-11.txt'),
+    ('0', 'Build Nuzzle_2025-12-10T07-43-42.txt'),
+    ('07-43', 'Build Nuzzle_2025-12-10T07-43-42.txt'),
+    ('0808', None),
+    ('2025', None),
+    ('99', None),
+    ('18-37', 'Build Nuzzle_2025-12-10T18-37-36.txt'),
+])
+def test_find_run(key, name):
+    if name is None:
+        with pytest.raises(KeyError):
+            find_run(RUNS, key)
+    else:
+        assert find_run(RUNS, key)['name'] == name
+
+
+def test_numeric_key_out_of_range_matches_names():
+    runs = [run('Build 2025-01.txt'), run('Build 0743.txt')]
+    assert find_run(runs, '0743')['name'] == 'Build 0743.txt'
+    assert find_run(runs, '01')['name'] == 'Build 2025-01.txt'
+
+
+def test_default_pair_skips_aborted_and_untimed_runs():
+    base, head = pick_runs(RUNS)
+    assert (base['name'], head['name']) == ('Build Nuzzle_2025-12-10T07-43-42.txt',
+                                            'Build Nuzzle_2025-12-10T18-37-36.txt')
+
+
+def test_explicit_head_compares_with_the_run_before_it():
+    base, head = pick_runs(RUNS, head='18-44')
+    assert (base['name'], head['name']) == ('Build Nuzzle_2025-12-10T18-37-36.txt',
+                                            'Build Nuzzle_2025-12-10T18-44-11.txt')
+
+
+def test_regressions_only_lists_growth():
+    base, head = run('a', swift=10), run('b', swift=12, seconds=25.0)
+    report = regressions(base, head)
+    assert report['kind'] == [{'name': 'SwiftCompile', 'base': 10, 'head': 12, 'delta': 2}]
+    assert report['seconds']['delta'] == 5.0
@@ -0,0 +1,91 @@
+import os
+import pickle
+
+import pytest
+
+from nestling_xcode import PBXProject, cache
+from nestling_xcode import project as project_module
+from nestling_xcode.parser import parse
+
+
+@pytest.fixture
+def project_path(tmp_path, minimal_text):
+    path = tmp_path / 'project.pbxproj'
+    path.write_text(minimal_text, encoding='utf-8')
+    return str(path)
+
+
+def cached(path):
+    PBXProject.load(path)
+    assert os.path.exists(cache.cache_path(path))
+
+
+def header(path):
+    with open(cache.cache_path(path), 'rb') as f:
+        return pickle.load(f)
+
+
+def test_load_writes_the_cache_and_the_next_load_uses_it(project_path, minimal_text, monkeypatch):
+    cached(project_path)
+    text, data, _ = cache.read(project_path)
+    assert text == minimal_text
+    assert data == parse(minimal_text)
+
+    def no_parse(*args):
+        raise AssertionError("parsed despite a cache hit")
+    monkeypatch.setattr(project_module, 'parse', no_parse)
+    assert PBXProject.load(project_path).dumps() == minimal_text
+
+
+def test_changed_content_is_a_miss(project_path, minimal_text):
+    cached(project_path)
+    # Same size, so only the new mtime and the hash can tell
+    edited = minimal_text.replace('path = Row.swift;', 'path = Tow.swift;')
+    with open(project_path, 'w', encoding='utf-8') as f:
+        f.write(edited)
+    stat = os.stat(project_path)
+    os.utime(project_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    text, data, source_map = cache.read(project_path)
+    assert text == edited
+    assert data is None and source_map is None
+    assert PBXProject.load(project_path)['F0000000000000000000A002']['path'] == 'Tow.swift'
+
+
+def test_a_new_mtime_with_the_same_bytes_is_a_hit(project_path, minimal_text):
+    cached(project_path)
+    stat = os.stat(project_path)
+    touched = stat.st_mtime_ns + 1_000_000_000
+    os.utime(project_path, ns=(stat.st_atime_ns, touched))
+    _, data, _ = cache.read(project_path)
+    assert data == parse(minimal_text)
+    # The header is refreshed so the next read skips the hash
+    assert header(project_path)[2] == touched
+
+
+def test_a_version_bump_invalidates_the_cache(project_path, monkeypatch):
+    cached(project_path)
+    monkeypatch.setattr(cache, 'CACHE_VERSION', cache.CACHE_VERSION + 1)
+    assert cache.read(project_path)[1] is None
+
+
+@pytest.mark.parametrize('damage', [
+    lambda raw: raw[:len(raw) // 2],
+    lambda raw: raw[:10],
+    lambda raw: b'',
+    lambda raw: b'not a pickle at all',
+    lambda raw: pickle.dumps('a header of the wrong shape'),
+    lambda raw: raw[:-40] + bytes(40),
+    # A garbled length field: BINBYTES8 asking for 2**62 bytes
+    lambda raw: b'\x80\x05\x8e' + (2 ** 62).to_bytes(8, 'little'),
+])
+def test_a_damaged_cache_falls_back_to_parsing(project_path, minimal_text, damage):
+    cached(project_path)
+    path = cache.cache_path(project_path)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    with open(path, 'wb') as f:
+        f.write(damage(raw))
+    assert cache.read(project_path)[1] is None
+    assert PBXProject.load(project_path).dumps() == minimal_text
+    # ...and the reparse stores a good cache again
+    assert cache.read(project_path)[1] == parse(minimal_text)
@@ -0,0 +1,47 @@
+import pytest
+
+from nestling_xcode import PBXProject
+from nestling_xcode.cli import main, split_chain
+
+
+@pytest.mark.parametrize('argv, head, chain', [
+    (['sync', 'dedupe', 'gc', 'validate'], [], [['sync'], ['dedupe'], ['gc'], ['validate']]),
+    (['--dry-run', 'add', 'A.swift', 'gc'], ['--dry-run'], [['add', 'A.swift'], ['gc']]),
+    # An option's value is never a command, in either spelling
+    (['add', '--group', 'sync', 'A.swift', 'validate'], [], [['add', '--group', 'sync', 'A.swift'], ['validate']]),
+    (['add', '--group=sync', 'A.swift', 'gc'], [], [['add', '--group=sync', 'A.swift'], ['gc']]),
+    (['--project', 'gc', 'sync'], ['--project', 'gc'], [['sync']]),
+    # After --, names are arguments until +
+    (['add', '--', 'gc', 'sync', '+', 'validate'], [], [['add', '--', 'gc', 'sync'], ['validate']]),
+    (['add', 'A.swift', '+', 'gc'], [], [['add', 'A.swift'], ['gc']]),
+    # Greedy commands take everything up to +
+    (['logs', 'gc', 'sync', '+', 'validate'], [], [['logs', 'gc', 'sync'], ['validate']]),
+])
+def test_split_chain(argv, head, chain):
+    assert split_chain(argv) == (head, chain)
+
+
+@pytest.fixture
+def project_path(tmp_path, minimal_text):
+    (tmp_path / 'Nestling.xcodeproj').mkdir()
+    path = tmp_path / 'Nestling.xcodeproj' / 'project.pbxproj'
+    path.write_text(minimal_text, encoding='utf-8')
+    return str(path)
+
+
+def test_a_file_named_like_a_command_is_added(project_path):
+    assert main(['--project', project_path, '--no-cache', 'add', '--', 'gc', '+', 'validate']) == 0
+    project = PBXProject.load(project_path, use_cache=False)
+    assert [obj['path'] for _, obj in project.iter_section('PBXFileReference') if obj['path'] == 'gc'] == ['gc']
+
+
+def test_unknown_command_after_separator(project_path, capsys):
+    with pytest.raises(SystemExit) as exit:
+        main(['--project', project_path, 'validate', '+', 'frobnicate'])
+    assert exit.value.code == 2
+    assert "unknown command 'frobnicate'" in capsys.readouterr().err
+
+
+def test_packages_manifest_lives_in_the_library():
+    from nestling_xcode.packages import PACKAGES
+    assert {package['name'] for package in PACKAGES} >= {'Sentry', 'Supabase'}
@@ -0,0 +1,52 @@
+from nestling_xcode import PBXProject
+from nestling_xcode.dedupe import find_duplicates, format_report, remove_duplicates
+
+# A second reference to Sources/App.swift with its own build file in the same phase
+COPY = {
+    'PBXBuildFile section': '\t\tB0000000000000000000C001 /* App.swift in Sources */ = {isa = PBXBuildFile; '
+                            'fileRef = F0000000000000000000C001 /* App.swift */; };\n',
+    'PBXFileReference section': '\t\tF0000000000000000000C001 /* App.swift */ = {isa = PBXFileReference; '
+                                'lastKnownFileType = sourcecode.swift; path = App.swift; sourceTree = "<group>"; };\n',
+}
+
+
+def with_copy(text):
+    for section, line in COPY.items():
+        text = text.replace(f'/* End {section} */', line + f'/* End {section} */')
+    text = text.replace('\t\t\t\tF0000000000000000000A001 /* App.swift */,\n',
+                        '\t\t\t\tF0000000000000000000A001 /* App.swift */,\n'
+                        '\t\t\t\tF0000000000000000000C001 /* App.swift */,\n')
+    return text.replace('\t\t\t\tB0000000000000000000A001 /* App.swift in Sources */,\n',
+                        '\t\t\t\tB0000000000000000000A001 /* App.swift in Sources */,\n'
+                        '\t\t\t\tB0000000000000000000C001 /* App.swift in Sources */,\n')
+
+
+def test_the_fixture_has_no_duplicates(minimal_text):
+    assert find_duplicates(PBXProject.parse(minimal_text)) == []
+
+
+def test_copies_of_a_file_and_its_build_file_are_found(minimal_text):
+    duplicates = find_duplicates(PBXProject.parse(with_copy(minimal_text)))
+    assert [(dup.kind, dup.key, dup.kept, dup.removed) for dup in duplicates] == [
+        ('PBXFileReference', 'Sources/App.swift', 'F0000000000000000000A001', ['F0000000000000000000C001']),
+        ('PBXBuildFile', 'App.swift in Nestling/Sources', 'B0000000000000000000A001', ['B0000000000000000000C001']),
+    ]
+    assert format_report(duplicates)[0] == ("file reference  Sources/App.swift: keep F0000000000000000000A001, "
+                                            "drop F0000000000000000000C001")
+
+
+def test_removing_duplicates_restores_the_original(minimal_text):
+    project = PBXProject.parse(with_copy(minimal_text))
+    remove_duplicates(project)
+    assert project.dumps() == minimal_text
+    assert find_duplicates(project) == []
+
+
+def test_repeated_list_entries_are_collapsed(minimal_text):
+    line = '\t\t\t\tF0000000000000000000A002 /* Row.swift */,\n'
+    project = PBXProject.parse(minimal_text.replace(line, line * 3))
+    duplicates = find_duplicates(project)
+    assert [(dup.kind, dup.kept, len(dup.removed)) for dup in duplicates] == [
+        ('PBXGroup', 'G0000000000000000000A002', 2)]
+    remove_duplicates(project, duplicates)
+    assert project.dumps() == minimal_text
@@ -0,0 +1,67 @@
+from nestling_xcode import PBXProject
+from nestling_xcode.files import add_files
+
+SOURCES = 'G0000000000000000000A001'
+
+
+def sources_phase(project):
+    return project['S0000000000000000000A001']['files']
+
+
+def test_same_name_in_another_directory_is_added(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    add_files(project, ['Models/Row.swift'], group=SOURCES)
+    added = add_files(project, ['Views/Foo/Row.swift'], group=SOURCES)
+    assert [path for path, _, _ in added] == ['Views/Foo/Row.swift']
+    ref = project[added[0][1]]
+    assert (ref['name'], ref['path']) == ('Row.swift', 'Views/Foo/Row.swift')
+    assert added[0][2] in sources_phase(project)
+
+
+def add_widget_target(project):
+    """Add a second target with an empty Sources phase and return the phase ID."""
+    phase = project.add('S0000000000000000000B001', {
+        'isa': 'PBXSourcesBuildPhase', 'buildActionMask': '2147483647', 'files': [],
+        'runOnlyForDeploymentPostprocessing': '0'}, 'Sources')
+    target = project.add('T0000000000000000000B001', {
+        'isa': 'PBXNativeTarget', 'buildPhases': [phase], 'name': 'NestlingWidgets',
+        'productName': 'NestlingWidgets'}, 'NestlingWidgets')
+    project.edit(project.root_object)['targets'].append(target)
+    return phase
+
+
+def test_files_the_group_already_lists_are_skipped(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    assert add_files(project, ['App.swift'], group=SOURCES) == []
+    first = add_files(project, ['Feed.swift', 'Feed.swift'], group=SOURCES)
+    assert len(first) == 1
+    assert add_files(project, ['Feed.swift'], group=SOURCES) == []
+
+
+def test_a_listed_file_is_added_to_another_target(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    widget_phase = add_widget_target(project)
+    children = list(project[SOURCES]['children'])
+    added = add_files(project, ['App.swift'], group=SOURCES, target='NestlingWidgets')
+    assert [(path, file_ref) for path, file_ref, _ in added] == \
+        [('App.swift', 'F0000000000000000000A001')]
+    assert project[SOURCES]['children'] == children
+    build_file = added[0][2]
+    assert project[widget_phase]['files'] == [build_file]
+    assert project[build_file]['fileRef'] == 'F0000000000000000000A001'
+    assert build_file not in sources_phase(project)
+    assert add_files(project, ['App.swift'], group=SOURCES, target='NestlingWidgets') == []
+    assert PBXProject.parse(project.dumps()).dumps() == project.dumps()
+
+
+def test_one_batch_adds_refs_children_and_build_files(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    added = add_files(project, ['A.swift', 'Info.plist', 'B.json'], group=SOURCES)
+    children = project[SOURCES]['children']
+    assert all(file_ref in children for _, file_ref, _ in added)
+    build_files = {path: build for path, _, build in added}
+    assert build_files['Info.plist'] is None
+    assert build_files['A.swift'] in sources_phase(project)
+    # No resources phase in the fixture, so the JSON file is referenced but not built
+    assert build_files['B.json'] is None
+    assert PBXProject.parse(project.dumps()).dumps() == project.dumps()
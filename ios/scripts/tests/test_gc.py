@@ -0,0 +1,39 @@
+from nestling_xcode import PBXProject
+from nestling_xcode.gc import collect_garbage, unreachable
+
+ORPHANS = (
+    '\t\tB0000000000000000000DEAD /* Old.swift in Sources */ = {isa = PBXBuildFile; '
+    'fileRef = F0000000000000000000DEAD /* Old.swift */; };\n'
+    '\t\tF0000000000000000000DEAD /* Old.swift */ = {isa = PBXFileReference; path = Old.swift; '
+    'sourceTree = "<group>"; };\n'
+)
+
+
+def with_orphans(text):
+    return text.replace('/* End PBXBuildFile section */', ORPHANS + '/* End PBXBuildFile section */')
+
+
+def test_everything_in_the_fixture_is_reachable(minimal_text):
+    assert unreachable(PBXProject.parse(minimal_text)) == []
+
+
+def test_orphans_are_unreachable_even_when_they_refer_to_each_other(minimal_text):
+    project = PBXProject.parse(with_orphans(minimal_text))
+    assert unreachable(project) == ['B0000000000000000000DEAD', 'F0000000000000000000DEAD']
+
+
+def test_collect_garbage_reports_bytes_and_restores_the_text(minimal_text):
+    project = PBXProject.parse(with_orphans(minimal_text))
+    removed, reclaimed = collect_garbage(project)
+    assert removed == {'PBXBuildFile': 1, 'PBXFileReference': 1}
+    assert reclaimed == len(ORPHANS.encode('utf-8'))
+    assert project.dumps() == minimal_text
+
+
+def test_gc_command_reports_bytes(tmp_path, minimal_text, capsys):
+    from nestling_xcode.cli import main
+    path = tmp_path / 'project.pbxproj'
+    path.write_text(with_orphans(minimal_text), encoding='utf-8')
+    assert main(['--project', str(path), 'gc']) == 0
+    assert f"2 unreachable object(s), {len(ORPHANS.encode('utf-8')):,} bytes reclaimed" in capsys.readouterr().out
+    assert path.read_text(encoding='utf-8') == minimal_text
@@ -0,0 +1,86 @@
+from nestling_xcode import PBXProject
+from nestling_xcode.groups import GroupTree
+
+SOURCES = 'G0000000000000000000A001'
+MODELS = 'G0000000000000000000A002'
+
+
+def add_group(project, parent, uuid, **fields):
+    group = project.add(uuid, dict({'isa': 'PBXGroup', 'children': [], 'sourceTree': '<group>'},
+                                   **fields), fields.get('name', fields.get('path')))
+    project.edit(parent)['children'].append(group)
+    return group
+
+
+def children_at(project, parent, path):
+    return [child for child in project[parent]['children'] if project[child].get('path') == path]
+
+
+def test_ensure_reuses_groups_by_path_and_by_name(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    cells = add_group(project, SOURCES, 'G0000000000000000000B001', name='Cells', path='Feed/Cells')
+    shared = add_group(project, SOURCES, 'G0000000000000000000B002', name='Shared')
+    utils = add_group(project, shared, 'G0000000000000000000B003', path='Utils')
+    count = project.count('PBXGroup')
+    tree = GroupTree(project)
+    assert tree.ensure('Sources') == SOURCES
+    assert tree.ensure('Sources/Models') == MODELS
+    # A named group is found by the directory its path resolves to ...
+    assert tree.ensure('Sources/Feed/Cells') == cells
+    # ... and a name-only group adds no directory of its own
+    assert tree.ensure('Sources/Utils') == utils
+    assert tree.find('Sources/Shared') is None
+    assert tree.created == ['Sources/Feed']
+    assert project.count('PBXGroup') == count + 1
+
+
+def test_missing_intermediate_groups_are_created_once(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    tree = GroupTree(project)
+    views = tree.ensure('Sources/Features/Feed/Views')
+    tree.ensure_all(['Sources/Features/Feed/Cells', 'Sources/Features/Settings',
+                     'Sources/Features/Feed/Views'])
+    assert tree.created == ['Sources/Features', 'Sources/Features/Feed',
+                            'Sources/Features/Feed/Views', 'Sources/Features/Feed/Cells',
+                            'Sources/Features/Settings']
+    [features] = children_at(project, SOURCES, 'Features')
+    [feed] = children_at(project, features, 'Feed')
+    assert children_at(project, feed, 'Views') == [views]
+    assert len(project[features]['children']) == 2
+    assert len(project[feed]['children']) == 2
+    assert project.resolved_paths()[views] == 'Sources/Features/Feed/Views'
+
+
+def test_group_ids_are_stable_across_runs(minimal_text):
+    directories = ['Sources/Features/Feed', 'Sources/Features/Settings', 'Sources/Models/Cache']
+    first = PBXProject.parse(minimal_text)
+    made = GroupTree(first).ensure_all(directories)
+    second = PBXProject.parse(minimal_text)
+    assert GroupTree(second).ensure_all(reversed(directories)) == made
+    # A later run over the saved project finds them instead of adding more
+    reloaded = PBXProject.parse(first.dumps())
+    tree = GroupTree(reloaded)
+    assert tree.ensure_all(directories) == made
+    assert tree.created == []
+
+
+def test_discard_leaves_the_tree_usable(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    tree = GroupTree(project)
+    feed = tree.ensure('Sources/Features/Feed')
+    features = tree.find('Sources/Features')
+    project.remove(feed)
+    project.remove(features)
+    project.edit(SOURCES)['children'].remove(features)
+    tree.discard(features)
+    assert tree.find('Sources/Features') is None
+    assert tree.find('Sources/Features/Feed') is None
+    assert features not in tree.directories and feed not in tree.directories
+    assert tree.find('Sources/Models') == MODELS
+
+    del tree.created[:]
+    again = tree.ensure('Sources/Features/Feed')
+    assert tree.created == ['Sources/Features', 'Sources/Features/Feed']
+    assert again in project
+    assert project.resolved_paths()[again] == 'Sources/Features/Feed'
+    assert len(children_at(project, SOURCES, 'Features')) == 1
@@ -0,0 +1,34 @@
+import re
+
+from nestling_xcode import PBXProject
+from nestling_xcode.ids import IdAllocator, object_id
+
+
+def test_ids_are_stable_and_depend_on_every_part():
+    uuid = object_id('PBXFileReference', 'G0000000000000000000A001', 'Feed.swift')
+    assert re.fullmatch('[0-9A-F]{24}', uuid)
+    assert uuid == object_id('PBXFileReference', 'G0000000000000000000A001', 'Feed.swift')
+    assert uuid != object_id('PBXFileReference', 'G0000000000000000000A002', 'Feed.swift')
+    assert uuid != object_id('PBXBuildFile', 'G0000000000000000000A001', 'Feed.swift')
+    assert uuid != object_id('PBXFileReference', 'G0000000000000000000A001', 'Feed.swift', salt=1)
+
+
+def test_allocator_salts_ids_already_taken():
+    allocate = IdAllocator()
+    first = allocate('PBXGroup', 'Views')
+    assert first == object_id('PBXGroup', 'Views')
+    assert allocate('PBXGroup', 'Views') == object_id('PBXGroup', 'Views', salt=1)
+
+
+def test_existing_needs_the_same_isa(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    uuid = object_id('PBXFileReference', 'Feed.swift')
+    project.add(uuid, {'isa': 'PBXFileReference', 'path': 'Feed.swift', 'sourceTree': '<group>'}, 'Feed.swift')
+    allocate = IdAllocator(project)
+    assert allocate.existing('PBXFileReference', 'Feed.swift') == uuid
+    assert allocate.existing('PBXFileReference', 'Sleep.swift') is None
+    # An unrelated object sitting on the hash is not a match, and a new ID avoids it
+    project.add(object_id('PBXGroup', 'Feed.swift'), {'isa': 'PBXFileReference', 'path': 'Other.swift',
+                                                      'sourceTree': '<group>'}, 'Other.swift')
+    assert allocate.existing('PBXGroup', 'Feed.swift') is None
+    assert allocate('PBXGroup', 'Feed.swift') == object_id('PBXGroup', 'Feed.swift', salt=1)
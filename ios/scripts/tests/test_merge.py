@@ -0,0 +1,67 @@
+from nestling_xcode import PBXProject
+from nestling_xcode.files import add_files
+from nestling_xcode.merge import merge, merge_lists
+from nestling_xcode.parser import parse
+
+SOURCES = 'G0000000000000000000A001'
+SOURCES_PHASE = 'S0000000000000000000A001'
+DEBUG = 'C0000000000000000000A001'
+
+
+def edited(text, change):
+    project = PBXProject.parse(text)
+    change(project)
+    return project.dumps()
+
+
+def test_merge_lists_keeps_both_sides_additions_in_place():
+    assert merge_lists(['a', 'b', 'c'], ['a', 'x', 'b', 'c'], ['a', 'b', 'y', 'c']) == ['a', 'x', 'b', 'y', 'c']
+    assert merge_lists(['a', 'b', 'c'], ['a', 'b', 'c'], ['a', 'c']) == ['a', 'c']
+    assert merge_lists(['a'], ['a'], ['z', 'a']) == ['z', 'a']
+    assert merge_lists([{}], [{}], [{}]) is None
+
+
+def test_files_added_on_both_branches_are_all_kept(minimal_text):
+    ours = edited(minimal_text, lambda project: add_files(project, ['Feed.swift'], group=SOURCES))
+    theirs = edited(minimal_text, lambda project: add_files(project, ['Sleep.swift'], group=SOURCES))
+    text, conflicts = merge(minimal_text, ours, theirs)
+    assert conflicts == []
+    project = PBXProject.parse(text)
+    paths = {project[child].get('path') for child in project[SOURCES]['children']}
+    assert {'App.swift', 'Feed.swift', 'Sleep.swift'} <= paths
+    assert len(project[SOURCES_PHASE]['files']) == 4
+    # Theirs' objects are inserted; none of ours' lines is rewritten
+    assert set(ours.splitlines()) <= set(text.splitlines())
+
+
+def test_edits_to_different_keys_merge(minimal_text):
+    ours = edited(minimal_text, lambda project: project.edit(DEBUG)['buildSettings'].update(SWIFT_VERSION='6.0'))
+    theirs = edited(minimal_text, lambda project: project.edit(DEBUG)['buildSettings'].update(ENABLE_TESTABILITY='YES'))
+    text, conflicts = merge(minimal_text, ours, theirs)
+    assert conflicts == []
+    assert parse(text)['objects'][DEBUG]['buildSettings'] == {'SWIFT_VERSION': '6.0', 'ENABLE_TESTABILITY': 'YES'}
+
+
+def test_the_same_key_changed_two_ways_is_a_marked_conflict(minimal_text):
+    ours = edited(minimal_text, lambda project: project.edit(DEBUG)['buildSettings'].update(SWIFT_VERSION='6.0'))
+    theirs = edited(minimal_text, lambda project: project.edit(DEBUG)['buildSettings'].update(SWIFT_VERSION='5.9'))
+    text, conflicts = merge(minimal_text, ours, theirs)
+    assert [(conflict.uuid, conflict.key, conflict.ours, conflict.theirs) for conflict in conflicts] == [
+        (DEBUG, 'buildSettings.SWIFT_VERSION', '6.0', '5.9')]
+    ours_at, split, theirs_at = text.index('<<<<<<< ours'), text.index('======='), text.index('>>>>>>> theirs')
+    assert ours_at < text.index('SWIFT_VERSION = 6.0;') < split < text.index('SWIFT_VERSION = 5.9;') < theirs_at
+
+
+def test_deleted_on_one_side_and_edited_on_the_other_keeps_the_edit(minimal_text):
+    ours = edited(minimal_text, lambda project: project.edit('F0000000000000000000A002').update(path='FeedRow.swift'))
+    theirs = edited(minimal_text, lambda project: project.remove('F0000000000000000000A002'))
+    text, conflicts = merge(minimal_text, ours, theirs)
+    assert [(conflict.uuid, conflict.theirs) for conflict in conflicts] == [('F0000000000000000000A002', None)]
+    assert 'path = FeedRow.swift;' in text and '<<<<<<< ours' in text
+
+
+def test_top_level_keys_take_the_changed_side(minimal_text):
+    theirs = minimal_text.replace('objectVersion = 56;', 'objectVersion = 77;')
+    text, conflicts = merge(minimal_text, minimal_text, theirs)
+    assert conflicts == []
+    assert text == theirs
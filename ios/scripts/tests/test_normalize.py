@@ -0,0 +1,40 @@
+from nestling_xcode import PBXProject
+from nestling_xcode.normalize import normalize, normalize_text, sort_keys
+
+SOURCES = 'G0000000000000000000A001'
+ROW = '\t\tF0000000000000000000A002 /* Row.swift */ = {isa = PBXFileReference; ' \
+      'lastKnownFileType = sourcecode.swift; path = Row.swift; sourceTree = "<group>"; };\n'
+
+
+def test_the_fixture_is_already_canonical(minimal_text):
+    assert normalize(PBXProject.parse(minimal_text)) == (0, 0, 0)
+    assert normalize_text(minimal_text) == minimal_text
+
+
+def test_sort_keys_puts_isa_first_and_reports_no_change_as_none():
+    assert list(sort_keys({'path': 'a', 'isa': 'X', 'b': {'z': 1, 'a': 2}})) == ['isa', 'b', 'path']
+    assert sort_keys({'isa': 'X', 'a': [{'b': 1, 'a': 2}]}) == {'isa': 'X', 'a': [{'a': 2, 'b': 1}]}
+    assert sort_keys({'isa': 'X', 'a': ['2', '1']}) is None
+
+
+def test_out_of_order_sections_keys_and_children_are_restored(minimal_text):
+    # Row.swift moved to the end of its section, Sources' keys and children reversed
+    text = minimal_text.replace(ROW, '').replace('/* End PBXFileReference section */',
+                                                 ROW + '/* End PBXFileReference section */')
+    project = PBXProject.parse(text)
+    sources = project.edit(SOURCES)
+    reversed_group = {key: sources[key] for key in reversed(list(sources))}
+    reversed_group['children'] = list(reversed(sources['children']))
+    sources.clear()
+    sources.update(reversed_group)
+    assert normalize(project) == (1, 1, 1)
+    assert project[SOURCES]['children'] == ['F0000000000000000000A001', 'G0000000000000000000A002']
+    assert project.dumps(full=True) == minimal_text
+    assert normalize(project) == (0, 0, 0)
+
+
+def test_children_can_be_left_alone(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    project.edit(SOURCES)['children'].reverse()
+    assert normalize(project, children=False).groups == 0
+    assert project[SOURCES]['children'][0] == 'G0000000000000000000A002'
@@ -0,0 +1,102 @@
+import pytest
+
+from nestling_xcode import PBXProject
+from nestling_xcode.packages import sync_packages
+from nestling_xcode.validate import validate
+
+TARGET = 'T0000000000000000000A001'
+FRAMEWORKS = 'K0000000000000000000A001'
+
+SENTRY = {'name': 'Sentry', 'url': 'https://github.com/getsentry/sentry-cocoa.git',
+          'version': '8.0.0', 'products': ['Sentry']}
+SUPABASE = {'name': 'Supabase', 'url': 'https://github.com/supabase/supabase-swift.git',
+            'version': '2.0.0', 'products': ['Supabase']}
+
+
+@pytest.fixture
+def project(minimal_text):
+    """The fixture project with an empty Frameworks phase on the app target."""
+    project = PBXProject.parse(minimal_text)
+    phase = project.add(FRAMEWORKS, {
+        'isa': 'PBXFrameworksBuildPhase', 'buildActionMask': '2147483647', 'files': [],
+        'runOnlyForDeploymentPostprocessing': '0'}, 'Frameworks')
+    project.edit(TARGET)['buildPhases'].append(phase)
+    return project
+
+
+def actions(changes):
+    return [(change.action, change.kind) for change in changes]
+
+
+def product(project, name):
+    [dep] = [dep for dep in project[TARGET]['packageProductDependencies']
+             if project[dep]['productName'] == name]
+    return dep
+
+
+def linked(project):
+    return {project[build]['productRef'] for build in project[FRAMEWORKS]['files']}
+
+
+def test_a_new_package_is_added_and_linked(project):
+    changes = sync_packages(project, [SENTRY])
+    assert actions(changes) == [('add', 'package'), ('add', 'product')]
+    [ref] = project.project_object['packageReferences']
+    assert project[ref]['requirement'] == {'kind': 'upToNextMajorVersion', 'minimumVersion': '8.0.0'}
+    dep = product(project, 'Sentry')
+    assert project[dep]['package'] == ref
+    assert linked(project) == {dep}
+    assert validate(project.dumps()) == []
+    assert sync_packages(project, [SENTRY]) == []
+
+
+def test_a_changed_version_updates_the_requirement(project):
+    sync_packages(project, [SENTRY])
+    changes = sync_packages(project, [dict(SENTRY, version='8.30.0')])
+    assert actions(changes) == [('update', 'package')]
+    [ref] = project.project_object['packageReferences']
+    assert project[ref]['requirement']['minimumVersion'] == '8.30.0'
+
+
+def test_a_product_follows_its_package_to_a_new_url(project):
+    sync_packages(project, [SENTRY])
+    dep = product(project, 'Sentry')
+    fork = dict(SENTRY, url='https://github.com/nestling/sentry-cocoa')
+    changes = sync_packages(project, [fork], prune=True)
+    assert actions(changes) == [('add', 'package'), ('update', 'product'), ('remove', 'package')]
+    [ref] = project.project_object['packageReferences']
+    assert project[ref]['repositoryURL'] == fork['url']
+    assert product(project, 'Sentry') == dep
+    assert project[dep]['package'] == ref
+    assert linked(project) == {dep}
+    assert validate(project.dumps()) == []
+
+
+def test_prune_removes_what_the_manifest_dropped(project):
+    sync_packages(project, [SENTRY, SUPABASE])
+    dropped = product(project, 'Supabase')
+    assert actions(sync_packages(project, [SENTRY], prune=True, dry_run=True)) == \
+        [('remove', 'product'), ('remove', 'package')]
+    assert len(project.project_object['packageReferences']) == 2
+
+    sync_packages(project, [SENTRY], prune=True)
+    assert dropped not in project
+    assert [project[dep]['productName'] for dep in project[TARGET]['packageProductDependencies']] == ['Sentry']
+    assert linked(project) == {product(project, 'Sentry')}
+    assert len(project.project_object['packageReferences']) == 1
+    assert 'supabase' not in project.dumps().lower()
+    assert validate(project.dumps()) == []
+
+
+def test_a_missing_build_file_is_added_back(project):
+    sync_packages(project, [SENTRY])
+    [build] = project[FRAMEWORKS]['files']
+    project.remove(build)
+    project.edit(FRAMEWORKS)['files'] = []
+
+    assert actions(sync_packages(project, [SENTRY], dry_run=True)) == [('add', 'product')]
+    assert project[FRAMEWORKS]['files'] == []
+    changes = sync_packages(project, [SENTRY])
+    assert [change.description for change in changes] == ["Sentry to Nestling's Frameworks phase"]
+    assert linked(project) == {product(project, 'Sentry')}
+    assert sync_packages(project, [SENTRY]) == []
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from nestling_xcode import PBXProject
+from nestling_xcode.parser import Annotated, PBXParseError, SourceMap, parse
+
+IOS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+NESTLING_PROJECT = os.path.join(IOS_DIR, 'Nuzzle', 'Nestling.xcodeproj', 'project.pbxproj')
+
+
+def test_values_keep_their_comments(minimal_text):
+    data = parse(minimal_text)
+    assert isinstance(data['rootObject'], Annotated)
+    assert data['rootObject'].comment == 'Project object'
+    build_file = data['objects']['B0000000000000000000A001']
+    assert build_file['fileRef'] == 'F0000000000000000000A001'
+    assert build_file['fileRef'].comment == 'App.swift'
+
+
+def test_quoted_strings_are_unescaped_and_trailing_commas_allowed():
+    data = parse('{ a = "x\\ty\\"z"; b = (1, 2,); c = {}; d = "$(TARGET_NAME)"; }')
+    assert data == {'a': 'x\ty"z', 'b': ['1', '2'], 'c': {}, 'd': '$(TARGET_NAME)'}
+
+
+@pytest.mark.parametrize('text, message, line, column', [
+    ('{\n a = (b, ;\n}', "Unexpected ';'", 2, 10),
+    ('{ a = "b; }', "Unexpected character '\"'", 1, 7),
+])
+def test_errors_point_at_the_offending_token(text, message, line, column):
+    with pytest.raises(PBXParseError) as error:
+        parse(text)
+    assert str(error.value).startswith(message)
+    assert (error.value.line, error.value.column) == (line, column)
+
+
+def test_source_map_covers_each_object_and_section(minimal_text):
+    source_map = SourceMap()
+    data = parse(minimal_text, source_map)
+    assert set(source_map.objects) == set(data['objects'])
+    start, end = source_map.objects['F0000000000000000000A001']
+    assert minimal_text[start:end].strip().startswith('F0000000000000000000A001 /* App.swift */ = {')
+    start, end = source_map.sections['PBXGroup']
+    assert minimal_text[start:end].startswith('/* Begin PBXGroup section */')
+    assert minimal_text[start:end].rstrip().endswith('/* End PBXGroup section */')
+
+
+def test_fixture_round_trips_exactly(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    assert project.dumps() == minimal_text
+    assert project.dumps(full=True) == minimal_text
+
+
+@pytest.mark.skipif(not os.path.exists(NESTLING_PROJECT), reason="needs the iOS project")
+def test_nestling_project_round_trips():
+    with open(NESTLING_PROJECT, encoding='utf-8') as f:
+        text = f.read()
+    project = PBXProject.parse(text)
+    assert project.dumps() == text
+    # A full rewrite may reorder, but it must describe the same graph
+    assert parse(project.dumps(full=True)) == parse(text)
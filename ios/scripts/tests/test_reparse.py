@@ -0,0 +1,89 @@
+import pytest
+
+from nestling_xcode import PBXProject
+from nestling_xcode.parser import SourceMap, parse, reparse
+
+NEW_FILE = ('\t\tF0000000000000000000A003 /* Cell.swift */ = {isa = PBXFileReference; '
+            'lastKnownFileType = sourcecode.swift; path = Cell.swift; sourceTree = "<group>"; };\n')
+
+
+def full(text):
+    source_map = SourceMap()
+    return parse(text, source_map), source_map
+
+
+def add_file(text, row_line):
+    build_line = next(l for l in text.splitlines(True) if l.startswith('\t\tB0000000000000000000A002'))
+    build_file = build_line.replace('B0000000000000000000A002', 'B0000000000000000000A003') \
+        .replace('F0000000000000000000A002 /* Row', 'F0000000000000000000A003 /* Cell').replace('Row', 'Cell')
+    return (text.replace(build_line, build_line + build_file)
+                .replace(row_line, row_line + NEW_FILE)
+                .replace('\t\t\t\tF0000000000000000000A002 /* Row.swift */,\n',
+                         '\t\t\t\tF0000000000000000000A002 /* Row.swift */,\n'
+                         '\t\t\t\tF0000000000000000000A003 /* Cell.swift */,\n')
+                .replace('\t\t\t\tB0000000000000000000A002 /* Row.swift in Sources */,\n',
+                         '\t\t\t\tB0000000000000000000A002 /* Row.swift in Sources */,\n'
+                         '\t\t\t\tB0000000000000000000A003 /* Cell.swift in Sources */,\n'))
+
+
+def edits(text):
+    row_line = next(l for l in text.splitlines(True) if l.startswith('\t\tF0000000000000000000A002'))
+    return {
+        'edit inside an object': text.replace('path = Models;', 'path = Model;'),
+        'insert an object': text.replace(row_line, row_line + NEW_FILE),
+        'remove an object': text.replace(row_line, ''),
+        'edit objects in two sections': text.replace('path = App.swift', 'path = Main.swift')
+                                         .replace('SWIFT_VERSION = 5.0', 'SWIFT_VERSION = 6.0'),
+        'add a file the way Xcode does': add_file(text, row_line),
+        'rename a child list entry': text.replace('\t\t\t\tG0000000000000000000A002 /* Models */,\n', ''),
+    }
+
+
+@pytest.mark.parametrize('name', [
+    'edit inside an object', 'insert an object', 'remove an object', 'edit objects in two sections',
+    'add a file the way Xcode does', 'rename a child list entry',
+])
+def test_matches_full_parse(minimal_text, name):
+    old_data, old_map = full(minimal_text)
+    text = edits(minimal_text)[name]
+    result = reparse(minimal_text, old_data, old_map, text)
+    assert result is not None
+    data, source_map = result
+    expected_data, expected_map = full(text)
+    assert data == expected_data
+    assert list(data['objects']) == list(expected_data['objects'])
+    assert source_map.objects == expected_map.objects
+    assert source_map.sections == expected_map.sections
+    assert source_map.objects_end == expected_map.objects_end
+    assert PBXProject(data, text=text, source_map=source_map).dumps(full=True) == text
+
+
+@pytest.mark.parametrize('old, new', [
+    ('objectVersion = 56;', 'objectVersion = 60;'),                          # outside the object table
+    ('/* End PBXBuildFile section */\n', ''),                                  # a section marker
+    ('/* End PBXGroup section */\n', '/* End PBXGroup section */\n\n'),        # between two sections
+    ('path = Models;', 'path = Models'),                                       # does not parse
+])
+def test_falls_back(minimal_text, old, new):
+    old_data, old_map = full(minimal_text)
+    assert reparse(minimal_text, old_data, old_map, minimal_text.replace(old, new, 1)) is None
+
+
+def test_reload_keeps_untouched_objects(tmp_path, minimal_text):
+    path = tmp_path / 'project.pbxproj'
+    path.write_text(minimal_text, encoding='utf-8')
+    project = PBXProject.load(str(path))
+    path.write_text(minimal_text.replace('path = Models;', 'path = Model;'), encoding='utf-8')
+    reloaded = project.reload()
+    assert reloaded['G0000000000000000000A002']['path'] == 'Model'
+    assert reloaded['F0000000000000000000A001'] is project['F0000000000000000000A001']
+
+
+def test_reload_of_a_half_written_file_raises(tmp_path, minimal_text):
+    path = tmp_path / 'project.pbxproj'
+    path.write_text(minimal_text, encoding='utf-8')
+    project = PBXProject.load(str(path))
+    path.write_text(minimal_text[:len(minimal_text) // 2], encoding='utf-8')
+    # watch() catches ValueError and keeps the previous model
+    with pytest.raises(ValueError):
+        project.reload()
@@ -0,0 +1,75 @@
+import difflib
+
+import pytest
+
+from nestling_xcode import PBXProject
+from nestling_xcode.parser import parse
+from nestling_xcode.serializer import quote
+
+
+@pytest.mark.parametrize('value, text', [
+    ('App.swift', 'App.swift'),
+    ('$(TARGET_NAME)', '"$(TARGET_NAME)"'),
+    ('', '""'),
+    ('<group>', '"<group>"'),
+    ('a___b', '"a___b"'),
+    ('say "hi"\n', '"say \\"hi\\"\\n"'),
+])
+def test_quote_only_when_needed(value, text):
+    assert quote(value) == text
+
+
+def changed_lines(before, after):
+    return [line for line in difflib.ndiff(before.splitlines(), after.splitlines()) if line[:1] in '+-']
+
+
+def test_editing_an_object_rewrites_only_its_line(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    project.edit('F0000000000000000000A002')['path'] = 'FeedRow.swift'
+    text = project.dumps()
+    assert changed_lines(minimal_text, text) == [
+        '- \t\tF0000000000000000000A002 /* Row.swift */ = {isa = PBXFileReference; '
+        'lastKnownFileType = sourcecode.swift; path = Row.swift; sourceTree = "<group>"; };',
+        '+ \t\tF0000000000000000000A002 /* Row.swift */ = {isa = PBXFileReference; '
+        'lastKnownFileType = sourcecode.swift; path = FeedRow.swift; sourceTree = "<group>"; };',
+    ]
+    assert parse(text) == parse(project.dumps(full=True))
+
+
+def test_added_objects_go_at_the_end_of_their_section(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    project.add('F0000000000000000000A003', {'isa': 'PBXFileReference', 'path': 'Feed.swift',
+                                             'sourceTree': '<group>'}, 'Feed.swift')
+    text = project.dumps()
+    added = ('\t\tF0000000000000000000A003 /* Feed.swift */ = {isa = PBXFileReference; path = Feed.swift; '
+             'sourceTree = "<group>"; };\n')
+    assert text == minimal_text.replace('/* End PBXFileReference section */',
+                                        added + '/* End PBXFileReference section */')
+
+
+def test_a_new_section_is_placed_in_isa_order(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    project.add('R0000000000000000000A001', {'isa': 'PBXResourcesBuildPhase', 'buildActionMask': '2147483647',
+                                             'files': [], 'runOnlyForDeploymentPostprocessing': '0'}, 'Resources')
+    text = project.dumps()
+    assert text.index('/* End PBXProject section */') < text.index('/* Begin PBXResourcesBuildPhase section */') \
+        < text.index('/* Begin PBXSourcesBuildPhase section */')
+    assert parse(text) == parse(project.dumps(full=True))
+
+
+def test_removing_the_last_object_drops_its_section(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    project.remove('T0000000000000000000A001')
+    text = project.dumps()
+    assert 'PBXNativeTarget section' not in text
+    assert '\n\n\n' not in text
+    assert parse(text) == parse(project.dumps(full=True))
+
+
+def test_diff_shows_only_touched_lines(minimal_text):
+    project = PBXProject.parse(minimal_text)
+    project.edit('C0000000000000000000A001')['buildSettings']['SWIFT_VERSION'] = '6.0'
+    diff = project.diff()
+    assert '-\t\t\t\tSWIFT_VERSION = 5.0;' in diff
+    assert '+\t\t\t\tSWIFT_VERSION = 6.0;' in diff
+    assert 'PBXFileReference' not in diff
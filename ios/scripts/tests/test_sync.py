@@ -0,0 +1,67 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from nestling_xcode import PBXProject
+from nestling_xcode.sync import SYNC_ROOTS, Inventory, project_root, sync
+
+ROOTS = (('Sources', 'Nestling'),)
+IOS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+IOS_PROJECT_DIR = os.path.join(IOS_DIR, 'Nuzzle')
+
+
+@pytest.fixture
+def checkout(tmp_path, minimal_text):
+    """The fixture project with Sources/App.swift on disk but Sources/Models/Row.swift missing."""
+    (tmp_path / 'Nestling.xcodeproj').mkdir()
+    (tmp_path / 'Nestling.xcodeproj' / 'project.pbxproj').write_text(minimal_text, encoding='utf-8')
+    (tmp_path / 'Sources' / 'Models').mkdir(parents=True)
+    (tmp_path / 'Sources' / 'App.swift').write_text('')
+    return tmp_path
+
+
+def run_sync(checkout, **kwargs):
+    project = PBXProject.load(str(checkout / 'Nestling.xcodeproj' / 'project.pbxproj'))
+    return project, sync(project, Inventory(project_root(project)), roots=ROOTS, **kwargs)
+
+
+def test_missing_files_are_removed(checkout):
+    project, result = run_sync(checkout, keep=())
+    assert result.removed == ['Sources/Models/Row.swift']
+    assert 'F0000000000000000000A002' not in project
+    assert 'B0000000000000000000A002' not in project
+
+
+def test_kept_files_survive_being_missing(checkout):
+    project, result = run_sync(checkout, keep=('Sources/Models/Row.swift',))
+    assert result.removed == []
+    assert 'F0000000000000000000A002' in project
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason="needs git")
+def test_gitignored_files_survive_being_missing(checkout):
+    subprocess.run(['git', 'init', '-q'], cwd=checkout, check=True)
+    (checkout / '.gitignore').write_text('Sources/Models/Row.swift\n')
+    project, result = run_sync(checkout, keep=())
+    assert result.removed == []
+    assert 'F0000000000000000000A002' in project
+
+
+def test_new_files_are_added_to_the_target(checkout):
+    (checkout / 'Sources' / 'Models' / 'Row.swift').write_text('')
+    (checkout / 'Sources' / 'Models' / 'Feed.swift').write_text('')
+    project, result = run_sync(checkout)
+    assert result.added == ['Sources/Models/Feed.swift']
+    assert result.removed == []
+
+
+@pytest.mark.skipif(not os.path.isdir(IOS_PROJECT_DIR), reason="needs the iOS project")
+def test_every_source_directory_in_the_ios_project_is_synced():
+    synced = {directory for directory, _ in SYNC_ROOTS}
+    on_disk = {name for name in os.listdir(IOS_PROJECT_DIR)
+               if os.path.isdir(os.path.join(IOS_PROJECT_DIR, name)) and not name.endswith('.xcodeproj')
+               and any(path.endswith('.swift') for _, _, files in os.walk(os.path.join(IOS_PROJECT_DIR, name))
+                       for path in files)}
+    assert on_disk <= synced
@@ -0,0 +1,69 @@
+from nestling_xcode.validate import validate
+
+
+def errors(text):
+    return [issue.message for issue in validate(text) if issue.severity == 'error']
+
+
+def test_fixture_is_valid(minimal_text):
+    assert validate(minimal_text) == []
+
+
+def test_quoted_references_resolve(minimal_text):
+    text = minimal_text.replace(
+        'buildConfigurationList = L0000000000000000000A001',
+        'buildConfigurationList = "L0000000000000000000A001"',
+    ).replace(
+        '\t\t\t\tT0000000000000000000A001 /* Nestling */,',
+        '\t\t\t\t"T0000000000000000000A001" /* Nestling */,',
+    ).replace(
+        'rootObject = P0000000000000000000A001',
+        'rootObject = "P0000000000000000000A001"',
+    )
+    assert errors(text) == []
+
+
+def test_quoted_isa_is_checked(minimal_text):
+    text = minimal_text.replace('isa = PBXGroup;\n\t\t\tchildren', 'isa = "PBXGroup";\n\t\t\tnochildren', 1)
+    assert errors(text) == ['PBXGroup G0000000000000000000A000 is missing children']
+
+
+def test_dangling_reference(minimal_text):
+    text = minimal_text.replace('fileRef = F0000000000000000000A002', 'fileRef = F0000000000000000000DEAD')
+    assert errors(text) == ['fileRef refers to undefined object F0000000000000000000DEAD']
+
+
+def test_duplicate_object_definition(minimal_text):
+    line = next(l for l in minimal_text.splitlines(True) if l.lstrip().startswith('F0000000000000000000A001'))
+    text = minimal_text.replace(line, line + line)
+    issues = validate(text)
+    assert [issue.message for issue in issues] == [
+        'duplicate object definition F0000000000000000000A001 (first defined on line 15)',
+    ]
+    assert issues[0].line == 16
+
+
+def test_duplicate_key_is_a_warning(minimal_text):
+    text = minimal_text.replace('name = Products;', 'name = Products;\n\t\t\tname = Products;')
+    assert [(issue.severity, issue.message) for issue in validate(text)] == [
+        ('warning', 'duplicate key name in G0000000000000000000A0FF'),
+    ]
+
+
+def test_unbalanced_braces_stop_the_scan(minimal_text):
+    text = minimal_text.replace('\t\t\tsourceTree = "<group>";\n\t\t};', '\t\t\tsourceTree = "<group>";\n', 1)
+    issues = validate(text)
+    assert len(issues) == 1
+    assert issues[0].severity == 'error'
+
+
+def test_missing_semicolon_reports_position():
+    text = '{\n\tarchiveVersion = 1\n}\n'
+    issue, = validate(text)
+    assert (issue.line, issue.column, issue.message) == (2, 20, "expected ';' after value")
+
+
+def test_line_comment_runs_to_the_end_of_the_line(minimal_text):
+    # ``//* Debug */ = {`` is all comment, so the object has no '='
+    text = minimal_text.replace('C0000000000000000000A002 /* Debug */ = {', 'C0000000000000000000A002 //* Debug */ = {')
+    assert errors(text) == ["expected '=' after C0000000000000000000A002"]
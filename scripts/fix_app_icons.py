@@ -3,29 +3,65 @@
 Fix App Icons for iOS
 - Scales up the icon content to fill the entire square
 - Cuts off the pre-rendered rounded corners
-- Generates all required sizes for iOS
+- Generates every size the project's *.appiconset/Contents.json files ask for
+  (app, widgets, intents), rendering each distinct pixel size once
+
+Sizes render in a process pool from a halving pyramid of the master
+(1024 -> 512 -> 256 -> ...), each from the nearest level at least twice the
+target, so small sizes never resample the full image. --quality also
+resizes directly with Lanczos and keeps the pyramid result only while it
+stays within MAX_ERROR / MEAN_ERROR of it. --optimize then shrinks the
+PNGs with scripts/optimize_pngs.py and fails when an asset catalog is over
+its size budget. --compare finally checks every size against the golden
+icons with scripts/icon_regression.py.
+
+Outputs whose source hash and parameters are unchanged since the last run
+(recorded in scripts/.icon-manifest.json) are skipped. When two slots of a
+set need the same pixels (40pt@3x and 60pt@2x are both 120 px),
+Contents.json points both at one PNG.
+
+Works from 1024, 2048 or 4096 px masters. Requires Pillow and NumPy:
+    pip3 install pillow numpy
+
+Usage:
+    python3 scripts/fix_app_icons.py [--force] [--quality] [--optimize] [--compare]
+                                      [--jobs N] [source.png]
 """
 
 from PIL import Image
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
 import os
+import shutil
+import sys
 
 # Paths
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SOURCE_ICON = os.path.join(PROJECT_ROOT, "Resources/Branding/NestlingAppIcon-1024.png")
-OUTPUT_DIR = os.path.join(PROJECT_ROOT, "ios/Nuzzle/Nestling/Assets.xcassets/AppIcon.appiconset")
-
-# Required icon sizes for iOS
-ICON_SIZES = {
-    "AppIcon-20@2x.png": 40,
-    "AppIcon-20@3x.png": 60,
-    "AppIcon-29@2x.png": 58,
-    "AppIcon-29@3x.png": 87,
-    "AppIcon-40@2x.png": 80,
-    "AppIcon-40@3x.png": 120,
-    "AppIcon-60@2x.png": 120,
-    "AppIcon-60@3x.png": 180,
-    "AppIcon-1024.png": 1024,
-}
+ICONS_ROOT = os.path.join(PROJECT_ROOT, "ios")
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, "scripts", ".icon-manifest.json")
+
+# Scale factor - we need to scale up enough to push the rounded corners outside
+# iOS corner radius is about 22.37% on modern devices
+# We need to scale by about 1.15-1.2x to cut off the rounded corners
+SCALE_FACTOR = 1.18
+
+# Bump when the rendering changes so cached outputs are regenerated
+RENDER_VERSION = 3
+
+# Pyramid resizing: the final Lanczos step starts from a level at least this
+# many times the target, so the box-filtered halvings above it cannot alias
+PYRAMID_HEADROOM = 2
+
+# Quality mode: worst and average channel difference (0-255) allowed against
+# a direct Lanczos resize before falling back to it
+MAX_ERROR = 8
+MEAN_ERROR = 1.0
+
+# Directories that never hold source asset catalogs
+SKIP_DIRS = {'build', 'DerivedData', 'Pods', 'node_modules', '.git', '.build'}
 
 
 def get_background_color_at_edge(img, position='top'):
@@ -77,12 +113,7 @@ def scale_and_crop_icon(source_path, output_path, final_size=1024):
     print(f"    Top: RGB{edge_colors['top'][:3]}")
     print(f"    Bottom: RGB{edge_colors['bottom'][:3]}")
     
-    # Scale factor - we need to scale up enough to push the rounded corners outside
-    # iOS corner radius is about 22.37% on modern devices
-    # We need to scale by about 1.15-1.2x to cut off the rounded corners
-    scale_factor = 1.18
-    
-    new_size = int(width * scale_factor)
+    new_size = int(width * SCALE_FACTOR)
     
     # Scale up the image
     scaled = img.resize((new_size, new_size), Image.LANCZOS)
@@ -94,21 +125,11 @@ def scale_and_crop_icon(source_path, output_path, final_size=1024):
     
     # Now we need to fill any remaining transparent pixels at the edges
     # Create a background with interpolated edge colors
-    background = Image.new('RGBA', (width, height))
-    bg_pixels = background.load()
-    
-    for y in range(height):
-        for x in range(width):
-            # Bilinear interpolation of edge colors
-            tx = x / (width - 1) if width > 1 else 0
-            ty = y / (height - 1) if height > 1 else 0
-            
-            # Interpolate corners
-            top_color = interpolate_color(edge_colors['top_left'][:3], edge_colors['top_right'][:3], tx)
-            bottom_color = interpolate_color(edge_colors['bottom_left'][:3], edge_colors['bottom_right'][:3], tx)
-            final_color = interpolate_color(top_color, bottom_color, ty)
-            
-            bg_pixels[x, y] = (*final_color, 255)
+    background = Image.fromarray(corner_gradient(
+        (width, height),
+        edge_colors['top_left'], edge_colors['top_right'],
+        edge_colors['bottom_left'], edge_colors['bottom_right'],
+    ))
     
     # Composite the cropped icon onto the background
     background.paste(cropped, (0, 0), cropped)
@@ -124,54 +145,352 @@ def scale_and_crop_icon(source_path, output_path, final_size=1024):
     return result
 
 
-def interpolate_color(c1, c2, t):
-    """Linearly interpolate between two RGB colors."""
-    return tuple(int(c1[i] + (c2[i] - c1[i]) * t) for i in range(3))
+def corner_gradient(size, top_left, top_right, bottom_left, bottom_right):
+    """Bilinear gradient between four corner colors, truncated to int at each step, as opaque RGBA uint8."""
+    width, height = size
+    tx = np.arange(width, dtype=np.float64) / (width - 1) if width > 1 else np.zeros(width)
+    ty = np.arange(height, dtype=np.float64) / (height - 1) if height > 1 else np.zeros(height)
+    
+    tl, tr, bl, br = (np.array(color[:3], dtype=np.int64) for color in (top_left, top_right, bottom_left, bottom_right))
+    # Colors are non-negative, so the int cast (truncation) is a floor
+    top = (tl + (tr - tl) * tx[:, None]).astype(np.int64)
+    bottom = (bl + (br - bl) * tx[:, None]).astype(np.int64)
+    # A column depends only on its (top, bottom) edge colors, of which there
+    # are at most a few hundred distinct pairs; compute each one once
+    edges, column_edges = np.unique(np.hstack([top, bottom]), axis=0, return_inverse=True)
+    top, delta = edges[:, :3], edges[:, 3:] - edges[:, :3]
+    
+    # height x distinct columns, one opaque RGBA pixel packed per uint32
+    columns = np.empty((height, len(edges), 4), dtype=np.uint8)
+    columns[..., :3] = top + delta * ty[:, None, None]
+    columns[..., 3] = 255
+    columns = columns.view(np.uint32)[..., 0]
+    # Consecutive rows are often identical; build each distinct row once
+    starts = np.flatnonzero(np.r_[True, (columns[1:] != columns[:-1]).any(axis=1)])
+    rows = np.take(columns[starts], column_edges.reshape(-1), axis=1)
+    pixels = np.repeat(rows, np.diff(np.r_[starts, height]), axis=0)
+    return pixels.view(np.uint8).reshape(height, width, 4)
+
+
+def find_icon_sets(root=ICONS_ROOT):
+    """Every *.appiconset under ``root``, skipping build products."""
+    found = []
+    for directory, subdirs, _ in os.walk(root):
+        subdirs[:] = sorted(name for name in subdirs if name not in SKIP_DIRS and not name.startswith('.'))
+        for name in subdirs:
+            if name.endswith('.appiconset'):
+                found.append(os.path.join(directory, name))
+        subdirs[:] = [name for name in subdirs if not name.endswith('.appiconset')]
+    return found
+
+
+def slot_pixels(image):
+    """Pixel size for a Contents.json image entry ("60x60" at "3x" -> 180)."""
+    points = float(image['size'].split('x')[0])
+    scale = float(image.get('scale', '1x').rstrip('x'))
+    return int(round(points * scale))
+
+
+def default_filename(icon_set, image):
+    stem = os.path.basename(icon_set)[:-len('.appiconset')]
+    size = image['size'].split('x')[0]
+    scale = image.get('scale', '1x')
+    return f"{stem}-{size}.png" if scale == '1x' else f"{stem}-{size}@{scale}.png"
+
+
+def plan_icon_set(icon_set):
+    """
+    Read an icon set's Contents.json and decide which file each pixel size goes to.
+
+    Returns ``(contents, files)``: the (possibly updated) Contents.json data and
+    ``{pixels: filename}`` with one file per distinct size. Slots that need the
+    same pixels are pointed at the same file. Dark and tinted appearance slots
+    are left alone; they need their own artwork.
+    """
+    with open(os.path.join(icon_set, 'Contents.json')) as f:
+        contents = json.load(f)
+    files = {}
+    for image in contents.get('images', []):
+        if 'size' not in image or image.get('appearances'):
+            continue
+        pixels = slot_pixels(image)
+        filename = files.setdefault(pixels, image.get('filename') or default_filename(icon_set, image))
+        image['filename'] = filename
+    return contents, files
+
+
+def update_contents(icon_set, contents, outputs):
+    """
+    Write ``contents`` (from plan_icon_set) to the set's Contents.json and
+    delete the files it repointed. Returns the deleted filenames.
+
+    A file is deleted only when its slot now names another file and no slot
+    still names it, so files of sizeless and appearance slots stay.
+    """
+    contents_path = os.path.join(icon_set, 'Contents.json')
+    with open(contents_path) as f:
+        text = f.read()
+    current = json.loads(text)
+    if current != contents:
+        with open(contents_path, 'w') as f:
+            f.write(format_contents_json(contents, text))
+        print(f"  Updated: {os.path.relpath(contents_path, PROJECT_ROOT)}")
+    referenced = {image.get('filename') for image in contents.get('images', [])}
+    removed = []
+    for before, after in zip(current.get('images', []), contents.get('images', [])):
+        filename = before.get('filename')
+        if not filename or filename == after.get('filename') or filename in referenced:
+            continue
+        path = os.path.join(icon_set, filename)
+        if os.path.exists(path):
+            os.remove(path)
+            outputs.pop(os.path.relpath(path, PROJECT_ROOT), None)
+            removed.append(filename)
+            print(f"  Removed duplicate: {filename}")
+    return removed
+
+
+def format_contents_json(contents, previous=None):
+    """
+    Contents.json text in the layout of the file it replaces.
+
+    Xcode writes ``"key" : value`` with two-space indents; a file last
+    written by a script may use ``"key": value``. Keeping whichever the
+    file already has means only the changed entries show up in a diff.
+    """
+    colon = ': ' if previous is not None and '" : ' not in previous and '": ' in previous else ' : '
+    return json.dumps(contents, indent=2, separators=(',', colon)) + '\n'
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get('outputs', {}) if manifest.get('version') == RENDER_VERSION else {}
 
 
-def main():
+def save_manifest(outputs, path=MANIFEST_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': RENDER_VERSION, 'outputs': outputs}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_current(outputs, output_path, key):
+    """True when ``output_path`` was produced from ``key`` and has not been touched since."""
+    entry = outputs.get(os.path.relpath(output_path, PROJECT_ROOT))
+    if entry is None or entry.get('key') != key:
+        return False
+    try:
+        stat = os.stat(output_path)
+    except FileNotFoundError:
+        return False
+    return entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns
+
+
+def record(outputs, output_path, key, optimized=False):
+    stat = os.stat(output_path)
+    outputs[os.path.relpath(output_path, PROJECT_ROOT)] = {
+        'key': key, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'optimized': optimized,
+    }
+
+
+def build_pyramid(image, smallest=16):
+    """Halving pyramid ``[image, image/2, image/4, ...]`` down to ``smallest`` px."""
+    levels = [image]
+    while min(levels[-1].size) // 2 >= smallest:
+        levels.append(levels[-1].reduce(2))
+    return levels
+
+
+def pyramid_level(pyramid, pixels, headroom=PYRAMID_HEADROOM):
+    """The smallest level at least ``pixels * headroom`` wide (the full image if none is)."""
+    for level in reversed(pyramid):
+        if level.size[0] >= pixels * headroom:
+            return level
+    return pyramid[0]
+
+
+def resize_error(image, reference):
+    """``(max, mean)`` absolute channel difference between two same-sized images."""
+    diff = np.abs(np.asarray(image, dtype=np.int16) - np.asarray(reference, dtype=np.int16))
+    return int(diff.max()), float(diff.mean())
+
+
+def pyramid_resize(pyramid, pixels, quality=False):
+    """
+    Resize to ``pixels`` square from the nearest larger pyramid level.
+    
+    Returns ``(image, error)``. In quality mode ``error`` is the ``(max, mean)``
+    difference from a direct Lanczos resize of the full image, and the direct
+    result is returned instead when the pyramid one is outside the bounds;
+    otherwise ``error`` is None.
+    """
+    level = pyramid_level(pyramid, pixels)
+    result = level.copy() if level.size[0] == pixels else level.resize((pixels, pixels), Image.LANCZOS)
+    if not quality or level is pyramid[0]:
+        return result, None
+    direct = pyramid[0].resize((pixels, pixels), Image.LANCZOS)
+    error = resize_error(result, direct)
+    if error[0] > MAX_ERROR or error[1] > MEAN_ERROR:
+        return direct, error
+    return result, error
+
+
+# Per-worker cache, so a pool process builds the master's pyramid once
+_pyramids = {}
+
+
+def master_pyramid(master_path):
+    stat = os.stat(master_path)
+    key = (master_path, stat.st_size, stat.st_mtime_ns)
+    if key not in _pyramids:
+        _pyramids.clear()
+        with Image.open(master_path) as master:
+            _pyramids[key] = build_pyramid(master.convert('RGB'))
+    return _pyramids[key]
+
+
+def render_size(master_path, pixels, output_path, quality=False):
+    """Pool worker: write ``master_path`` scaled to ``pixels`` square. Returns the quality-mode error."""
+    pyramid = master_pyramid(master_path)
+    if pyramid[0].size == (pixels, pixels):
+        shutil.copyfile(master_path, output_path)
+        return None
+    image, error = pyramid_resize(pyramid, pixels, quality)
+    image.save(output_path, 'PNG')
+    return error
+
+
+def main(source_icon=SOURCE_ICON, force=False, jobs=None, quality=False, optimize=False, compare=False):
     print("=" * 60)
     print("iOS App Icon Fixer - Scale & Crop Method")
     print("=" * 60)
     
-    if not os.path.exists(SOURCE_ICON):
-        print(f"ERROR: Source icon not found: {SOURCE_ICON}")
+    if not os.path.exists(source_icon):
+        print(f"ERROR: Source icon not found: {source_icon}")
+        return False
+    
+    icon_sets = find_icon_sets()
+    if not icon_sets:
+        print(f"ERROR: No *.appiconset found under {ICONS_ROOT}")
         return False
     
-    print(f"\nSource: {SOURCE_ICON}")
-    print(f"Output: {OUTPUT_DIR}\n")
+    source_hash = file_sha1(source_icon)
+    outputs = {} if force else load_manifest()
+    print(f"\nSource: {source_icon} (sha1 {source_hash[:12]})")
     
-    # Create the 1024x1024 icon by scaling and cropping
-    print("Step 1: Creating 1024x1024 icon (scale up & crop corners)...")
-    fixed_1024 = scale_and_crop_icon(SOURCE_ICON, os.path.join(OUTPUT_DIR, "AppIcon-1024.png"))
+    plans = []
+    for icon_set in icon_sets:
+        contents, files = plan_icon_set(icon_set)
+        plans.append((icon_set, contents, files))
+        print(f"Output: {os.path.relpath(icon_set, PROJECT_ROOT)} "
+              f"({len(files)} sizes: {', '.join(str(pixels) for pixels in sorted(files))})")
+    
+    if not any(files for _, _, files in plans):
+        print('ERROR: No icon set has a slot with a "size" to render; check the images in Contents.json')
+        return False
     
-    # Generate all other sizes
+    # Step 1: one master at the largest size any set needs
+    master_pixels = max(max(files) for _, _, files in plans if files)
+    master_set, _, master_files = next(plan for plan in plans if master_pixels in plan[2])
+    master_path = os.path.join(master_set, master_files[master_pixels])
+    master_key = f"{source_hash}:master:{master_pixels}:{SCALE_FACTOR}:{RENDER_VERSION}"
+    print(f"\nStep 1: Creating {master_pixels}x{master_pixels} icon (scale up & crop corners)...")
+    if is_current(outputs, master_path, master_key):
+        print(f"  Unchanged: {os.path.basename(master_path)}")
+    else:
+        scale_and_crop_icon(source_icon, master_path, final_size=master_pixels)
+        record(outputs, master_path, master_key)
+    
+    # Step 2: every other size, once per set, in parallel
     print("\nStep 2: Generating all required sizes...")
+    tasks = []
+    skipped = 0
+    for icon_set, _, files in plans:
+        for pixels, filename in sorted(files.items()):
+            output_path = os.path.join(icon_set, filename)
+            if output_path == master_path:
+                continue
+            key = f"{master_key}:{pixels}:{'quality' if quality else 'pyramid'}"
+            if is_current(outputs, output_path, key):
+                skipped += 1
+                continue
+            tasks.append((output_path, pixels, key))
     
-    for filename, size in ICON_SIZES.items():
-        if filename == "AppIcon-1024.png":
-            continue
-        
-        output_path = os.path.join(OUTPUT_DIR, filename)
-        resized = fixed_1024.resize((size, size), Image.LANCZOS)
-        resized.save(output_path, 'PNG')
-        print(f"  Saved: {filename} ({size}x{size})")
+    if tasks:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [(pool.submit(render_size, master_path, pixels, output_path, quality), output_path, pixels, key)
+                       for output_path, pixels, key in tasks]
+            for future, output_path, pixels, key in futures:
+                error = future.result()
+                record(outputs, output_path, key)
+                note = ""
+                if error is not None:
+                    fallback = error[0] > MAX_ERROR or error[1] > MEAN_ERROR
+                    note = f" [max error {error[0]}, mean {error[1]:.2f}{', used direct Lanczos' if fallback else ''}]"
+                print(f"  Saved: {os.path.relpath(output_path, ICONS_ROOT)} ({pixels}x{pixels}){note}")
+    print(f"  {len(tasks)} rendered, {skipped} unchanged")
+    
+    # Contents.json: slots that share a size now share a file
+    for icon_set, contents, _ in plans:
+        update_contents(icon_set, contents, outputs)
+    
+    if optimize:
+        # Lossless, so the manifest keys stay valid; only the recorded stats change
+        import optimize_pngs
+        pending = [os.path.join(PROJECT_ROOT, path) for path, entry in sorted(outputs.items())
+                   if not entry.get('optimized') and os.path.exists(os.path.join(PROJECT_ROOT, path))]
+        print(f"\nOptimizing {len(pending)} PNGs...")
+        results = optimize_pngs.optimize_files(pending, jobs)
+        for path, _, _ in results:
+            record(outputs, path, outputs[os.path.relpath(path, PROJECT_ROOT)]['key'], optimized=True)
+        optimize_pngs.print_results(results)
+    
+    save_manifest(outputs)
+    
+    if optimize:
+        catalogs = sorted({optimize_pngs.catalog_of(icon_set) for icon_set, _, _ in plans} - {None})
+        report = optimize_pngs.check_budgets(catalogs, optimize_pngs.load_budgets())
+        if report:
+            print("\nSize budgets:")
+            if not optimize_pngs.print_budgets(report):
+                return False
     
     # Verify the result
     print("\nStep 3: Verification...")
-    test_img = Image.open(os.path.join(OUTPUT_DIR, "AppIcon-1024.png"))
+    test_img = Image.open(master_path)
     print(f"  Image mode: {test_img.mode}")
     print(f"  Image size: {test_img.size}")
     
     # Check corners for transparency
+    last = test_img.size[0] - 1
     corners = [
         test_img.getpixel((0, 0)),
-        test_img.getpixel((1023, 0)),
-        test_img.getpixel((0, 1023)),
-        test_img.getpixel((1023, 1023)),
+        test_img.getpixel((last, 0)),
+        test_img.getpixel((0, last)),
+        test_img.getpixel((last, last)),
     ]
     print(f"  Corner pixels: {corners}")
     
+    if compare:
+        import icon_regression
+        print("\nStep 4: Comparing with golden icons...")
+        if not icon_regression.check_goldens([icon_set for icon_set, _, _ in plans]):
+            print("\nIcons differ from the goldens; if the change is intended, run")
+            print("  python3 scripts/icon_regression.py --update")
+            return False
+    
     print("\n" + "=" * 60)
     print("SUCCESS! All icons have been fixed.")
     print("=" * 60)
@@ -184,7 +503,17 @@ def main():
 
 
 if __name__ == "__main__":
-    success = main()
+    args = sys.argv[1:]
+    jobs = None
+    if '--jobs' in args:
+        index = args.index('--jobs')
+        jobs = int(args[index + 1])
+        del args[index:index + 2]
+    force = '--force' in args
+    quality = '--quality' in args
+    optimize = '--optimize' in args
+    compare = '--compare' in args
+    paths = [arg for arg in args if not arg.startswith('--')]
+    success = main(paths[0] if paths else SOURCE_ICON, force=force, jobs=jobs, quality=quality, optimize=optimize,
+                   compare=compare)
     exit(0 if success else 1)
-
-
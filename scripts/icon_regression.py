@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Golden-image regression check for the generated app icons
+- Compares every icon in each *.appiconset with its stored reference in
+  scripts/icon_goldens/<set>/<file>
+- Scores each size by SSIM (7x7 windows, per channel) and the largest
+  absolute channel difference, all as NumPy array operations
+- Fails when SSIM drops below --min-ssim or a pixel moves more than
+  --max-diff, and writes golden | output | heatmap PNGs for the failures
+
+Run it after changing scale_and_crop_icon() (SCALE_FACTOR, edge sampling,
+resampling) to see whether the icons moved, without installing the app.
+The committed goldens are the shipped AppIcon PNGs; record new references
+with --update only once a change is intended and reviewed.
+
+Requires Pillow and NumPy:
+    pip3 install pillow numpy
+
+Usage:
+    python3 scripts/icon_regression.py [--update] [--min-ssim 0.995] [--max-diff 24]
+                                       [--diff-dir build/icon-diffs]
+"""
+
+from PIL import Image
+import numpy as np
+import argparse
+import os
+import shutil
+import sys
+
+from fix_app_icons import PROJECT_ROOT, find_icon_sets, plan_icon_set
+
+GOLDENS_DIR = os.path.join(PROJECT_ROOT, "scripts", "icon_goldens")
+DIFF_DIR = os.path.join(PROJECT_ROOT, "build", "icon-diffs")
+
+MIN_SSIM = 0.995
+MAX_DIFF = 24
+
+# SSIM constants from Wang et al. for 8-bit data
+SSIM_WINDOW = 7
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+
+def box_mean(x, size):
+    """Mean of every ``size`` x ``size`` window of ``x`` (height x width x channels), from an integral image."""
+    total = np.pad(x.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0), (0, 0)))
+    windows = total[size:, size:] - total[:-size, size:] - total[size:, :-size] + total[:-size, :-size]
+    return windows / (size * size)
+
+
+def ssim_map(a, b, window=SSIM_WINDOW):
+    """Per-window, per-channel SSIM of two same-sized uint8 images."""
+    a = np.atleast_3d(a).astype(np.float64)
+    b = np.atleast_3d(b).astype(np.float64)
+    window = min(window, a.shape[0], a.shape[1])
+    mean_a, mean_b = box_mean(a, window), box_mean(b, window)
+    # Sample (not population) variances, as in the reference implementation
+    correction = window * window / max(window * window - 1, 1)
+    var_a = (box_mean(a * a, window) - mean_a * mean_a) * correction
+    var_b = (box_mean(b * b, window) - mean_b * mean_b) * correction
+    covariance = (box_mean(a * b, window) - mean_a * mean_b) * correction
+    return ((2 * mean_a * mean_b + SSIM_C1) * (2 * covariance + SSIM_C2)
+            / ((mean_a * mean_a + mean_b * mean_b + SSIM_C1) * (var_a + var_b + SSIM_C2)))
+
+
+def heatmap(golden, output):
+    """golden | output | difference heatmap (black -> red -> yellow) side by side, as an RGB array."""
+    diff = np.abs(golden.astype(np.int16) - output.astype(np.int16)).max(axis=2)
+    level = diff * (255.0 / max(int(diff.max()), 1))
+    heat = np.stack([np.minimum(2 * level, 255), np.clip(2 * level - 255, 0, 255), np.zeros_like(level)], axis=2)
+    # Dim the golden underneath so the hot spots can be placed on the icon
+    heat = np.maximum(heat, golden.mean(axis=2, keepdims=True) * 0.25)
+    return np.hstack([golden, output, heat.astype(np.uint8)])
+
+
+def compare(golden_path, output_path):
+    """``(ssim, max_diff, golden, output)`` for two icons of the same size."""
+    with Image.open(golden_path) as golden_image, Image.open(output_path) as output_image:
+        golden = np.asarray(golden_image.convert('RGB'))
+        output = np.asarray(output_image.convert('RGB'))
+    if golden.shape != output.shape:
+        return 0.0, 255, golden, output
+    score = float(ssim_map(golden, output).mean())
+    max_diff = int(np.abs(golden.astype(np.int16) - output.astype(np.int16)).max())
+    return score, max_diff, golden, output
+
+
+def icon_files(icon_sets=None):
+    """``(icon set, filename)`` for every generated icon."""
+    for icon_set in icon_sets or find_icon_sets():
+        _, files = plan_icon_set(icon_set)
+        for pixels, filename in sorted(files.items()):
+            yield icon_set, filename
+
+
+def golden_path(icon_set, filename):
+    return os.path.join(GOLDENS_DIR, os.path.basename(icon_set), filename)
+
+
+def update_goldens(icon_sets=None):
+    count = 0
+    for icon_set, filename in icon_files(icon_sets):
+        source = os.path.join(icon_set, filename)
+        if os.path.exists(source):
+            target = golden_path(icon_set, filename)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            count += 1
+    print(f"  Recorded {count} golden icons in {os.path.relpath(GOLDENS_DIR, PROJECT_ROOT)}")
+    return count
+
+
+def check_goldens(icon_sets=None, min_ssim=MIN_SSIM, max_diff=MAX_DIFF, diff_dir=DIFF_DIR):
+    """Compare every icon with its golden. Returns True when all pass."""
+    failures = 0
+    for icon_set, filename in icon_files(icon_sets):
+        output_path = os.path.join(icon_set, filename)
+        reference = golden_path(icon_set, filename)
+        name = f"{os.path.basename(icon_set)}/{filename}"
+        if not os.path.exists(reference):
+            print(f"  ❌ {name}: no golden (record one with --update)")
+            failures += 1
+            continue
+        if not os.path.exists(output_path):
+            print(f"  ❌ {name}: missing")
+            failures += 1
+            continue
+        score, diff, golden, output = compare(reference, output_path)
+        if score >= min_ssim and diff <= max_diff:
+            print(f"  ✅ {name}: SSIM {score:.4f}, max diff {diff}")
+            continue
+        failures += 1
+        detail = f"SSIM {score:.4f}, max diff {diff}"
+        if golden.shape == output.shape:
+            os.makedirs(diff_dir, exist_ok=True)
+            diff_path = os.path.join(diff_dir, f"{os.path.basename(icon_set)}-{filename}")
+            Image.fromarray(heatmap(golden, output)).save(diff_path)
+            detail += f"; heatmap {os.path.relpath(diff_path, PROJECT_ROOT)}"
+        else:
+            detail = f"{output.shape[1]}x{output.shape[0]} px, golden is {golden.shape[1]}x{golden.shape[0]}"
+        print(f"  ❌ {name}: {detail}")
+    return failures == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the generated app icons with stored references")
+    parser.add_argument('--update', action='store_true', help="store the current icons as the references")
+    parser.add_argument('--min-ssim', type=float, default=MIN_SSIM, help="lowest passing SSIM (default: %(default)s)")
+    parser.add_argument('--max-diff', type=int, default=MAX_DIFF,
+                        help="largest passing channel difference, 0-255 (default: %(default)s)")
+    parser.add_argument('--diff-dir', default=DIFF_DIR, help="where failure heatmaps are written")
+    args = parser.parse_args(argv)
+
+    if args.update:
+        return 0 if update_goldens() else 1
+    print("Comparing icons with goldens...")
+    return 0 if check_goldens(min_ssim=args.min_ssim, max_diff=args.max_diff, diff_dir=args.diff_dir) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
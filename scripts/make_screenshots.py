@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+App Store screenshots from raw simulator captures (see SCREENSHOT_SPECS.md)
+- Emits every device size in DEVICE_SIZES for every locale in ios/*.lproj
+- Scales each capture to fit, centres it and pads with the brand background
+- Flattens to RGB (App Store Connect rejects screenshots with alpha)
+
+Captures are read from <input>/<locale>/ (en/, es/, ...); PNGs directly in
+<input> stand in for any locale without its own folder. Output goes to
+<output>/<locale>/<device>/<name>.png, and outputs newer than their
+capture are skipped unless --force is given.
+
+Captures are handed to a process pool one path at a time and each worker
+decodes one image, renders its sizes and lets it go before taking the
+next, so memory stays flat however many captures there are.
+
+Requires Pillow:
+    pip3 install pillow
+
+Usage:
+    python3 scripts/make_screenshots.py <input> [<output>] [--devices iphone-6.9,iphone-6.7]
+                                        [--locales en,es] [--background F8FAFB] [--jobs N] [--force]
+"""
+
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCALES_ROOT = os.path.join(PROJECT_ROOT, "ios")
+DEFAULT_OUTPUT = os.path.join(PROJECT_ROOT, "build", "screenshots")
+
+# Portrait pixel sizes App Store Connect accepts, per display class;
+# landscape captures get the same sizes turned sideways
+DEVICE_SIZES = {
+    'iphone-6.9': (1320, 2868),
+    'iphone-6.7': (1290, 2796),     # SCREENSHOT_SPECS.md: iPhone 15 Pro Max
+    'iphone-6.5': (1284, 2778),
+    'iphone-5.5': (1242, 2208),
+    'ipad-13': (2064, 2752),
+}
+
+# backgroundLight from DESIGN_SYSTEM.md
+BRAND_BACKGROUND = (248, 250, 251)
+
+CAPTURE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# .lproj folders that are not shipped languages
+NON_LOCALES = {'Base', 'psuedo', 'pseudo'}
+
+
+def find_locales(root=LOCALES_ROOT):
+    """Languages the app ships, from the ``*.lproj`` folders directly under ``root``."""
+    return sorted(name[:-len('.lproj')] for name in os.listdir(root)
+                  if name.endswith('.lproj') and name[:-len('.lproj')] not in NON_LOCALES)
+
+
+def parse_color(value):
+    value = value.lstrip('#')
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _captures(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(CAPTURE_EXTENSIONS))
+
+
+def iter_captures(input_dir, locales):
+    """Yield ``(locale, capture path)``: each locale's own captures, else the shared ones."""
+    shared = _captures(input_dir)
+    for locale in locales:
+        captures = _captures(os.path.join(input_dir, locale))
+        if not captures and shared:
+            print(f"  {locale}: no {locale}/ folder, using the shared captures")
+        for path in captures or shared:
+            yield locale, path
+
+
+def fit_and_pad(image, size, background=BRAND_BACKGROUND):
+    """Scale ``image`` to fit inside ``size``, centre it on ``background`` and return it as RGB."""
+    width, height = size
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        flat = Image.new('RGB', image.size, background)
+        flat.paste(image, (0, 0), image)
+        image = flat
+    else:
+        image = image.convert('RGB')
+    scale = min(width / image.width, height / image.height)
+    fitted = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    if fitted != image.size:
+        image = image.resize(fitted, Image.LANCZOS)
+    if fitted == size:
+        return image
+    canvas = Image.new('RGB', size, background)
+    canvas.paste(image, ((width - fitted[0]) // 2, (height - fitted[1]) // 2))
+    return canvas
+
+
+def render_capture(path, targets, background=BRAND_BACKGROUND, force=False):
+    """
+    Pool worker: write ``path`` at each ``(device, size, output_path)`` in ``targets``.
+
+    Returns ``[(device, output_path)]`` for what was written. The capture is
+    only decoded when at least one output is missing or older than it.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    pending = [(device, size, output_path) for device, size, output_path in targets
+               if force or not os.path.exists(output_path) or os.stat(output_path).st_mtime_ns < mtime]
+    if not pending:
+        return []
+    written = []
+    with Image.open(path) as capture:
+        capture.load()
+        landscape = capture.width > capture.height
+        for device, (width, height), output_path in pending:
+            size = (height, width) if landscape else (width, height)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            fit_and_pad(capture, size, background).save(output_path, 'PNG')
+            written.append((device, output_path))
+    return written
+
+
+def _report(path, future, output):
+    written = future.result()
+    for device, output_path in written:
+        print(f"  {os.path.basename(path)} → {os.path.relpath(output_path, output)}")
+    return len(written)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render App Store screenshots for every device size and locale")
+    parser.add_argument('input', help="directory of raw captures, with one folder per locale")
+    parser.add_argument('output', nargs='?', default=DEFAULT_OUTPUT, help="output directory (default: build/screenshots)")
+    parser.add_argument('--devices', help=f"comma-separated device classes (default: {','.join(DEVICE_SIZES)})")
+    parser.add_argument('--locales', help="comma-separated locales (default: the ios/*.lproj languages)")
+    parser.add_argument('--background', default='%02X%02X%02X' % BRAND_BACKGROUND, help="padding colour as hex")
+    parser.add_argument('--jobs', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="re-render outputs that are up to date")
+    args = parser.parse_args(argv)
+
+    devices = args.devices.split(',') if args.devices else list(DEVICE_SIZES)
+    for device in devices:
+        if device not in DEVICE_SIZES:
+            parser.error(f"unknown device {device!r} (known: {', '.join(DEVICE_SIZES)})")
+    locales = args.locales.split(',') if args.locales else find_locales()
+    background = parse_color(args.background)
+
+    print("=" * 60)
+    print("App Store Screenshots")
+    print("=" * 60)
+    print(f"\nLocales: {', '.join(locales)}")
+    print(f"Devices: {', '.join(f'{device} ({DEVICE_SIZES[device][0]}x{DEVICE_SIZES[device][1]})' for device in devices)}\n")
+
+    def tasks():
+        for locale, path in iter_captures(args.input, locales):
+            stem = os.path.splitext(os.path.basename(path))[0]
+            yield path, [(device, DEVICE_SIZES[device], os.path.join(args.output, locale, device, f"{stem}.png"))
+                         for device in devices]
+
+    captures = written = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        # One capture in flight per worker (plus one queued), so the pool never holds the whole batch
+        pending = []
+        for path, targets in tasks():
+            captures += 1
+            pending.append((path, pool.submit(render_capture, path, targets, background, args.force)))
+            if len(pending) > 2 * (args.jobs or os.cpu_count() or 1):
+                written += _report(*pending.pop(0), args.output)
+        for path, future in pending:
+            written += _report(path, future, args.output)
+
+    if not captures:
+        print(f"ERROR: No captures found in {args.input}")
+        return 1
+    print(f"\n✅ {captures} captures, {written} screenshots written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
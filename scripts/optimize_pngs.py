@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Losslessly shrink the PNGs in the iOS asset catalogs.
+Every image is re-encoded with each PNG row filter (None, Sub, Up, Average,
+Paeth and a per-row adaptive choice) and zlib strategy at level 6; the best
+two are tried again at level 9, and the smallest result wins. Before
+encoding, images are reduced where that loses nothing: an alpha channel
+that is fully opaque is dropped, grey RGB becomes greyscale, and images
+with at most 256 colours become palette PNGs (at 1, 2, 4 or 8 bits). Text, time and EXIF chunks are
+stripped; colour chunks (sRGB, gAMA, cHRM, iCCP) are kept. Each result is
+decoded and compared with the original pixels before it replaces a file,
+and a file is never made larger.
+
+Files are optimized in a process pool. Afterwards each catalog's total PNG
+size is checked against scripts/asset_budgets.json; going over a budget
+makes the run fail.
+
+Requires Pillow and NumPy:
+    pip3 install pillow numpy
+
+Usage:
+    python3 scripts/optimize_pngs.py [--check] [--jobs N] [--budgets FILE] [path ...]
+with paths being catalogs, directories or PNG files (default: every
+*.xcassets under ios/).
+"""
+
+from PIL import Image
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import io
+import json
+import os
+import struct
+import sys
+import zlib
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOGS_ROOT = os.path.join(PROJECT_ROOT, "ios")
+BUDGETS_PATH = os.path.join(PROJECT_ROOT, "scripts", "asset_budgets.json")
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Chunks that change how pixels look; everything else ancillary is dropped
+COLOR_CHUNKS = (b'sRGB', b'gAMA', b'cHRM', b'iCCP')
+
+ADAPTIVE = 5
+FILTERS = (0, 1, 2, 3, 4, ADAPTIVE)
+LEVELS = (6, 9)
+STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+# (filter, strategy) pairs from the first level carried on to the higher ones
+FINALISTS = 2
+
+SKIP_DIRS = {'build', 'DerivedData', 'Pods', 'node_modules', '.git', '.build'}
+
+
+def iter_chunks(data):
+    """Yield ``(kind, payload)`` for each chunk of PNG bytes."""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(data):
+        length, kind = struct.unpack_from('>I4s', data, offset)
+        yield kind, data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+        if kind == b'IEND':
+            break
+
+
+def chunk(kind, payload):
+    return struct.pack('>I', len(payload)) + kind + payload + struct.pack('>I', zlib.crc32(kind + payload))
+
+
+def filter_rows(rows, bpp):
+    """All five PNG filters of ``rows`` (uint8, height x stride) as a (5, height, stride) array."""
+    x = rows.astype(np.int16)
+    left = np.zeros_like(x)
+    left[:, bpp:] = x[:, :-bpp]
+    up = np.zeros_like(x)
+    up[1:] = x[:-1]
+    up_left = np.zeros_like(x)
+    up_left[1:, bpp:] = x[:-1, :-bpp]
+    p = left + up - up_left
+    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - up_left)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+    return (np.stack([x, x - left, x - up, x - (left + up) // 2, x - paeth]) & 0xFF).astype(np.uint8)
+
+
+def filtered_stream(filtered, kind):
+    """Raw IDAT payload (filter byte + row) using one filter, or the cheapest per row."""
+    height = filtered.shape[1]
+    if kind == ADAPTIVE:
+        # Minimum sum of absolute differences, the heuristic libpng uses
+        cost = np.abs(filtered.view(np.int8).astype(np.int32)).sum(axis=2)
+        choice = cost.argmin(axis=0)
+        rows = filtered[choice, np.arange(height)]
+    else:
+        choice = np.full(height, kind)
+        rows = filtered[kind]
+    return np.hstack([choice.astype(np.uint8)[:, None], rows]).tobytes()
+
+
+def pack_bits(indices, depth):
+    """Pack palette indices (height x width) at ``depth`` bits per pixel, rows padded to whole bytes."""
+    if depth == 8:
+        return indices
+    per_byte = 8 // depth
+    height, width = indices.shape
+    padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = indices
+    groups = padded.reshape(height, -1, per_byte)
+    shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * depth
+    return (groups << shifts).sum(axis=2, dtype=np.uint16).astype(np.uint8)
+
+
+def reduce_image(pixels):
+    """
+    Losslessly reduce RGBA ``pixels`` (height x width x 4).
+
+    Returns ``(color_type, depth, rows, bpp, extra_chunks)`` ready for filtering.
+    """
+    height, width, _ = pixels.shape
+    opaque = bool((pixels[..., 3] == 255).all())
+    grey = bool(((pixels[..., 0] == pixels[..., 1]) & (pixels[..., 1] == pixels[..., 2])).all())
+
+    packed = pixels.view(np.uint32).reshape(-1)
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) <= 256 and not grey:
+        palette = colors.view(np.uint8).reshape(-1, 4)
+        # Translucent entries first, so tRNS can stop at the last one
+        order = np.argsort(palette[:, 3] == 255, kind='stable')
+        palette = palette[order]
+        remap = np.empty_like(order)
+        remap[order] = np.arange(len(order))
+        indices = remap[indices].reshape(height, width).astype(np.uint8)
+        depth = next(bits for bits in (1, 2, 4, 8) if len(colors) <= 1 << bits)
+        extra = [chunk(b'PLTE', palette[:, :3].tobytes())]
+        translucent = int((palette[:, 3] < 255).sum())
+        if translucent:
+            extra.append(chunk(b'tRNS', palette[:translucent, 3].tobytes()))
+        return 3, depth, pack_bits(indices, depth), 1, extra
+
+    if grey:
+        channels = [0] if opaque else [0, 3]
+        color_type = 0 if opaque else 4
+    else:
+        channels = [0, 1, 2] if opaque else [0, 1, 2, 3]
+        color_type = 2 if opaque else 6
+    rows = np.ascontiguousarray(pixels[..., channels]).reshape(height, width * len(channels))
+    return color_type, 8, rows, len(channels), []
+
+
+def encode(pixels, keep_chunks=()):
+    """Smallest PNG encoding of RGBA ``pixels`` over every filter, level and strategy."""
+    height, width, _ = pixels.shape
+    color_type, depth, rows, bpp, extra = reduce_image(pixels)
+    filtered = filter_rows(rows, bpp)
+    # Every filter and strategy is tried at the fast level; level 9 costs
+    # about four times as much and only the best few are worth it
+    trials = []
+    for kind in FILTERS:
+        stream = filtered_stream(filtered, kind)
+        for strategy in STRATEGIES:
+            trials.append((_deflate(stream, LEVELS[0], strategy), stream, strategy))
+    trials.sort(key=lambda trial: len(trial[0]))
+    best = trials[0][0]
+    for _, stream, strategy in trials[:FINALISTS]:
+        for level in LEVELS[1:]:
+            data = _deflate(stream, level, strategy)
+            if len(data) < len(best):
+                best = data
+    header = struct.pack('>IIBBBBB', width, height, depth, color_type, 0, 0, 0)
+    return b''.join([PNG_SIGNATURE, chunk(b'IHDR', header), *keep_chunks, *extra,
+                     chunk(b'IDAT', best), chunk(b'IEND', b'')])
+
+
+def _deflate(stream, level, strategy):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(stream) + compressor.flush()
+
+
+def optimize_file(path, write=True):
+    """Pool worker: re-encode one PNG. Returns ``(path, bytes_before, bytes_after)``."""
+    with open(path, 'rb') as f:
+        original = f.read()
+    chunks = list(iter_chunks(original))
+    if chunks[0][0] != b'IHDR' or chunks[0][1][8] == 16:
+        return path, len(original), len(original)    # Pillow would read 16-bit channels as 8-bit
+    with Image.open(io.BytesIO(original)) as image:
+        if image.mode not in ('1', 'L', 'LA', 'P', 'PA', 'RGB', 'RGBA'):
+            return path, len(original), len(original)
+        pixels = np.ascontiguousarray(np.asarray(image.convert('RGBA')))
+    keep = [chunk(kind, payload) for kind, payload in chunks if kind in COLOR_CHUNKS]
+    data = encode(pixels, keep)
+    if len(data) >= len(original):
+        return path, len(original), len(original)
+    with Image.open(io.BytesIO(data)) as check:
+        if not np.array_equal(np.asarray(check.convert('RGBA')), pixels):
+            raise ValueError(f"{path}: re-encoded pixels differ from the original")
+    if write:
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return path, len(original), len(data)
+
+
+def optimize_files(paths, jobs=None, write=True):
+    """Optimize ``paths`` in a process pool. Returns the ``(path, before, after)`` results in order."""
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(optimize_file, paths, [write] * len(paths)))
+
+
+def find_catalogs(root=CATALOGS_ROOT):
+    found = []
+    for directory, subdirs, _ in os.walk(root):
+        subdirs[:] = sorted(name for name in subdirs if name not in SKIP_DIRS and not name.startswith('.'))
+        found.extend(os.path.join(directory, name) for name in subdirs if name.endswith('.xcassets'))
+        subdirs[:] = [name for name in subdirs if not name.endswith('.xcassets')]
+    return found
+
+
+def find_pngs(paths):
+    pngs = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isfile(path):
+            pngs.append(path)
+            continue
+        for directory, subdirs, files in os.walk(path):
+            subdirs.sort()
+            pngs.extend(os.path.join(directory, name) for name in sorted(files) if name.lower().endswith('.png'))
+    return pngs
+
+
+def catalog_of(path):
+    """The ``*.xcassets`` directory containing ``path``, or None."""
+    path = os.path.abspath(path)
+    while path != os.path.dirname(path):
+        if path.endswith('.xcassets'):
+            return path
+        path = os.path.dirname(path)
+    return None
+
+
+def load_budgets(path=BUDGETS_PATH):
+    """``{catalog path: max bytes}`` with paths made absolute."""
+    try:
+        with open(path) as f:
+            budgets = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {os.path.join(PROJECT_ROOT, catalog): limit for catalog, limit in budgets.items()}
+
+
+def check_budgets(catalogs, budgets, sizes=None):
+    """
+    Total each catalog's PNGs and compare with its budget.
+
+    ``sizes`` maps paths to sizes to use instead of the file on disk (for
+    --check runs that did not write). Returns ``[(catalog, total, budget)]``
+    for every catalog that has a budget.
+    """
+    sizes = sizes or {}
+    report = []
+    for catalog in catalogs:
+        budget = budgets.get(os.path.abspath(catalog))
+        if budget is None:
+            continue
+        total = sum(sizes.get(path, os.path.getsize(path)) for path in find_pngs([catalog]))
+        report.append((catalog, total, budget))
+    return report
+
+
+def print_results(results):
+    saved = 0
+    for path, before, after in results:
+        saved += before - after
+        if after < before:
+            print(f"  {os.path.relpath(path, PROJECT_ROOT)}: {before:,} → {after:,} bytes "
+                  f"(-{(before - after) / before:.1%})")
+    total = sum(before for _, before, _ in results)
+    print(f"  {len(results)} PNGs, {saved:,} of {total:,} bytes saved")
+
+
+def print_budgets(report):
+    """Print the budget table. Returns True when every catalog is within its budget."""
+    ok = True
+    for catalog, total, budget in report:
+        within = total <= budget
+        ok = ok and within
+        print(f"  {'✅' if within else '❌'} {os.path.relpath(catalog, PROJECT_ROOT)}: "
+              f"{total:,} / {budget:,} bytes ({total / budget:.0%} of budget)")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Losslessly shrink asset catalog PNGs")
+    parser.add_argument('paths', nargs='*', help="catalogs, directories or PNGs (default: every *.xcassets under ios/)")
+    parser.add_argument('--check', action='store_true', help="report savings and budgets without writing")
+    parser.add_argument('--jobs', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--budgets', default=BUDGETS_PATH, help="JSON of catalog path -> max bytes")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or find_catalogs()
+    pngs = find_pngs(paths)
+    print(f"🗜  Optimizing {len(pngs)} PNGs{' (check only)' if args.check else ''}...")
+    results = optimize_files(pngs, args.jobs, write=not args.check)
+    print_results(results)
+
+    catalogs = sorted({catalog for catalog in map(catalog_of, pngs) if catalog})
+    sizes = {path: after for path, _, after in results} if args.check else None
+    report = check_budgets(catalogs, load_budgets(args.budgets), sizes)
+    if report:
+        print("\nSize budgets:")
+        if not print_budgets(report):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
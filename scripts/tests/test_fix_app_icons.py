@@ -0,0 +1,132 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('PIL')
+
+import fix_app_icons  # noqa: E402
+
+
+def interpolate_color(c1, c2, t):
+    return tuple(int(c1[i] + (c2[i] - c1[i]) * t) for i in range(3))
+
+
+def per_pixel(size, top_left, top_right, bottom_left, bottom_right):
+    """The loop corner_gradient() replaced."""
+    width, height = size
+    pixels = np.empty((height, width, 4), dtype=np.uint8)
+    for y in range(height):
+        for x in range(width):
+            tx = x / (width - 1) if width > 1 else 0.0
+            ty = y / (height - 1) if height > 1 else 0.0
+            top = interpolate_color(top_left, top_right, tx)
+            bottom = interpolate_color(bottom_left, bottom_right, tx)
+            pixels[y, x] = interpolate_color(top, bottom, ty) + (255,)
+    return pixels
+
+
+@pytest.mark.parametrize('corners', [
+    ((16, 34, 74), (12, 30, 70), (100, 143, 151), (132, 126, 172)),
+    ((0, 0, 0), (255, 255, 255), (255, 0, 255), (0, 255, 0)),
+    ((7, 7, 7, 255),) * 4,
+])
+@pytest.mark.parametrize('size', [(1, 1), (2, 3), (61, 47)])
+def test_corner_gradient_matches_the_per_pixel_loop(corners, size):
+    assert np.array_equal(fix_app_icons.corner_gradient(size, *corners), per_pixel(size, *corners))
+
+
+CONTENTS = {'images': [{'filename': 'AppIcon-20@2x.png', 'idiom': 'iphone', 'scale': '2x', 'size': '20x20'}],
+            'info': {'author': 'xcode', 'version': 1}}
+
+XCODE_CONTENTS = """\
+{
+  "images" : [
+    {
+      "filename" : "AppIcon-20@2x.png",
+      "idiom" : "iphone",
+      "scale" : "2x",
+      "size" : "20x20"
+    }
+  ],
+  "info" : {
+    "author" : "xcode",
+    "version" : 1
+  }
+}
+"""
+
+
+def test_contents_json_defaults_to_xcode_layout():
+    assert fix_app_icons.format_contents_json(CONTENTS) == XCODE_CONTENTS
+
+
+def test_contents_json_keeps_the_layout_of_the_file_it_replaces():
+    assert fix_app_icons.format_contents_json(CONTENTS, XCODE_CONTENTS) == XCODE_CONTENTS
+    python_layout = XCODE_CONTENTS.replace('" : ', '": ')
+    assert fix_app_icons.format_contents_json(CONTENTS, python_layout) == python_layout
+
+
+def test_pyramid_halves_down_to_the_smallest_level():
+    from PIL import Image
+    pyramid = fix_app_icons.build_pyramid(Image.new('RGB', (1024, 1024)))
+    assert [level.size[0] for level in pyramid] == [1024, 512, 256, 128, 64, 32, 16]
+
+
+@pytest.mark.parametrize('pixels, level', [(40, 128), (120, 256), (180, 512), (512, 1024), (1024, 1024)])
+def test_pyramid_level_keeps_twice_the_target(pixels, level):
+    from PIL import Image
+    pyramid = fix_app_icons.build_pyramid(Image.new('RGB', (1024, 1024)))
+    assert fix_app_icons.pyramid_level(pyramid, pixels).size[0] == level
+
+
+def test_quality_mode_stays_within_bounds_of_direct_lanczos():
+    from PIL import Image
+    size = 256
+    ramp = np.linspace(0, 255, size, dtype=np.uint8)
+    master = Image.fromarray(np.stack([np.tile(ramp, (size, 1))] * 3, axis=2))
+    image, (max_error, mean_error) = fix_app_icons.pyramid_resize(fix_app_icons.build_pyramid(master), 40, quality=True)
+    assert image.size == (40, 40)
+    assert max_error <= fix_app_icons.MAX_ERROR and mean_error <= fix_app_icons.MEAN_ERROR
+
+
+def icon_set(tmp_path, images):
+    path = tmp_path / 'AppIcon.appiconset'
+    path.mkdir()
+    (path / 'Contents.json').write_text(fix_app_icons.format_contents_json({'images': images}))
+    for image in images:
+        if 'filename' in image:
+            (path / image['filename']).write_bytes(b'png')
+    return str(path)
+
+
+def test_only_repointed_files_are_removed(tmp_path):
+    path = icon_set(tmp_path, [
+        {'filename': 'a.png', 'idiom': 'iphone', 'scale': '2x', 'size': '20x20'},
+        {'filename': 'b.png', 'idiom': 'ipad', 'scale': '1x', 'size': '40x40'},
+        {'filename': 'dark.png', 'idiom': 'universal', 'platform': 'ios', 'size': '1024x1024',
+         'appearances': [{'appearance': 'luminosity', 'value': 'dark'}]},
+        {'filename': 'sizeless.png', 'idiom': 'universal', 'platform': 'watchos'},
+    ])
+    contents, files = fix_app_icons.plan_icon_set(path)
+    assert files == {40: 'a.png'}
+    assert fix_app_icons.update_contents(path, contents, {}) == ['b.png']
+    with open(f'{path}/Contents.json') as f:
+        names = [image['filename'] for image in json.load(f)['images']]
+    assert names == ['a.png', 'a.png', 'dark.png', 'sizeless.png']
+    assert sorted(os.listdir(path)) == ['Contents.json', 'a.png', 'dark.png', 'sizeless.png']
+    # Nothing left to repoint, so a second pass removes nothing
+    contents, _ = fix_app_icons.plan_icon_set(path)
+    assert fix_app_icons.update_contents(path, contents, {}) == []
+
+
+@pytest.mark.parametrize('images', [[], [{'filename': 'dark.png', 'idiom': 'universal', 'size': '1024x1024',
+                                          'appearances': [{'appearance': 'luminosity', 'value': 'dark'}]}]])
+def test_no_sized_slot_is_a_clear_error(tmp_path, monkeypatch, capsys, images):
+    path = icon_set(tmp_path, images)
+    source = tmp_path / 'source.png'
+    source.write_bytes(b'png')
+    monkeypatch.setattr(fix_app_icons, 'find_icon_sets', lambda: [path])
+    assert fix_app_icons.main(str(source), force=True) is False
+    assert 'No icon set has a slot with a "size"' in capsys.readouterr().out
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('PIL')
+
+import icon_regression  # noqa: E402
+
+
+def gradient(size=32):
+    ramp = np.linspace(0, 255, size, dtype=np.float64)
+    return np.stack([np.add.outer(ramp, ramp) / 2, np.tile(ramp, (size, 1)), np.tile(ramp[:, None], (1, size))],
+                    axis=2).astype(np.uint8)
+
+
+def test_identical_images_score_one():
+    image = gradient()
+    assert float(icon_regression.ssim_map(image, image).mean()) == pytest.approx(1.0)
+
+
+def test_noise_lowers_ssim():
+    image = gradient()
+    noisy = np.clip(image.astype(np.int16) + np.random.default_rng(0).integers(-40, 40, image.shape), 0, 255)
+    score = float(icon_regression.ssim_map(image, noisy.astype(np.uint8)).mean())
+    assert score < icon_regression.MIN_SSIM
+
+
+def test_heatmap_is_side_by_side():
+    image = gradient()
+    assert icon_regression.heatmap(image, image).shape == (32, 96, 3)
+
+
+def test_goldens_are_committed_for_every_icon():
+    missing = [f"{os.path.basename(icon_set)}/{filename}" for icon_set, filename in icon_regression.icon_files()
+               if not os.path.exists(icon_regression.golden_path(icon_set, filename))]
+    assert missing == []
+
+
+def test_checked_in_icons_match_goldens(tmp_path):
+    assert icon_regression.check_goldens(diff_dir=str(tmp_path))
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+import make_screenshots  # noqa: E402
+
+
+def test_fit_and_pad_centres_on_the_background():
+    image = make_screenshots.fit_and_pad(Image.new('RGB', (100, 100), (255, 0, 0)), (100, 300))
+    assert image.size == (100, 300)
+    assert image.getpixel((50, 0)) == make_screenshots.BRAND_BACKGROUND
+    assert image.getpixel((50, 150)) == (255, 0, 0)
+    assert image.getpixel((50, 299)) == make_screenshots.BRAND_BACKGROUND
+
+
+def test_fit_and_pad_flattens_alpha():
+    image = make_screenshots.fit_and_pad(Image.new('RGBA', (10, 20), (0, 0, 0, 0)), (10, 20), (1, 2, 3))
+    assert image.mode == 'RGB'
+    assert image.getpixel((5, 5)) == (1, 2, 3)
+
+
+def test_locales_without_a_folder_use_the_shared_captures(tmp_path):
+    (tmp_path / 'en').mkdir()
+    Image.new('RGB', (4, 8)).save(tmp_path / 'en' / 'home.png')
+    Image.new('RGB', (4, 8)).save(tmp_path / 'shared.png')
+    found = [(locale, os.path.basename(path)) for locale, path in make_screenshots.iter_captures(str(tmp_path), ['en', 'es'])]
+    assert found == [('en', 'home.png'), ('es', 'shared.png')]
+
+
+def test_render_capture_turns_sizes_for_landscape_and_skips_fresh_outputs(tmp_path):
+    capture = tmp_path / 'wide.png'
+    Image.new('RGB', (80, 40)).save(capture)
+    output = str(tmp_path / 'out' / 'wide.png')
+    targets = [('phone', (30, 60), output)]
+    assert make_screenshots.render_capture(str(capture), targets) == [('phone', output)]
+    with Image.open(output) as image:
+        assert image.size == (60, 30)
+    assert make_screenshots.render_capture(str(capture), targets) == []
+    assert make_screenshots.render_capture(str(capture), targets, force=True) == [('phone', output)]
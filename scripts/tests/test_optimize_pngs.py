@@ -0,0 +1,78 @@
+import io
+import struct
+import zlib
+
+import pytest
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+import optimize_pngs  # noqa: E402
+
+
+def decode(data):
+    with Image.open(io.BytesIO(data)) as image:
+        return image.mode, np.asarray(image.convert('RGBA'))
+
+
+def noise(height, width, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 4), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('colors, depth', [(2, 1), (4, 2), (16, 4), (200, 8)])
+def test_few_colours_become_a_palette_of_the_smallest_depth(colors, depth):
+    palette = noise(colors, 1)[:, 0]
+    palette[:, 3] = np.where(np.arange(colors) % 3 == 0, 128, 255)
+    pixels = palette[np.random.default_rng(1).integers(0, colors, (13, 11))]
+    data = optimize_pngs.encode(pixels)
+    assert data[24:26] == bytes([depth, 3])
+    mode, decoded = decode(data)
+    assert mode == 'P'
+    assert np.array_equal(decoded, pixels)
+
+
+def test_opaque_grey_drops_colour_and_alpha():
+    grey = np.random.default_rng(2).integers(0, 256, (20, 30), dtype=np.uint8)
+    pixels = np.dstack([grey, grey, grey, np.full_like(grey, 255)])
+    mode, decoded = decode(optimize_pngs.encode(pixels))
+    assert mode == 'L'
+    assert np.array_equal(decoded, pixels)
+
+
+@pytest.mark.parametrize('opaque', [True, False])
+def test_full_colour_round_trips(opaque):
+    pixels = noise(17, 23)
+    if opaque:
+        pixels[..., 3] = 255
+    mode, decoded = decode(optimize_pngs.encode(pixels))
+    assert mode == ('RGB' if opaque else 'RGBA')
+    assert np.array_equal(decoded, pixels)
+
+
+@pytest.mark.parametrize('kind', optimize_pngs.FILTERS)
+def test_every_filter_decodes(kind):
+    pixels = noise(9, 14)
+    stream = optimize_pngs.filtered_stream(optimize_pngs.filter_rows(pixels.reshape(9, -1), 4), kind)
+    header = struct.pack('>IIBBBBB', 14, 9, 8, 6, 0, 0, 0)
+    data = b''.join([optimize_pngs.PNG_SIGNATURE, optimize_pngs.chunk(b'IHDR', header),
+                     optimize_pngs.chunk(b'IDAT', zlib.compress(stream)), optimize_pngs.chunk(b'IEND', b'')])
+    assert np.array_equal(decode(data)[1], pixels)
+
+
+def test_optimize_file_keeps_colour_chunks_and_never_grows(tmp_path):
+    path = tmp_path / 'icon.png'
+    ramp = np.arange(32, dtype=np.uint8) * 8
+    pixels = np.dstack([np.add.outer(ramp, ramp), np.tile(ramp, (32, 1)), np.tile(ramp[:, None], (1, 32)),
+                        np.full((32, 32), 255, dtype=np.uint8)])
+    saved = io.BytesIO()
+    Image.fromarray(pixels[..., :3]).save(saved, 'PNG', compress_level=0)
+    data = saved.getvalue()
+    extra = optimize_pngs.chunk(b'gAMA', struct.pack('>I', 45455)) + optimize_pngs.chunk(b'tEXt', b'Software\0test')
+    path.write_bytes(data[:33] + extra + data[33:])
+    _, before, after = optimize_pngs.optimize_file(str(path))
+    assert after < before
+    kinds = [kind for kind, _ in optimize_pngs.iter_chunks(path.read_bytes())]
+    assert b'gAMA' in kinds and b'tEXt' not in kinds
+    assert np.array_equal(decode(path.read_bytes())[1], pixels)
+    _, again, unchanged = optimize_pngs.optimize_file(str(path))
+    assert again == unchanged == after